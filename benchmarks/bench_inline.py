@@ -0,0 +1,70 @@
+"""
+Compare per-paragraph throughput of the single-scan inline tokenizer
+(text_to_textnodes) against the old six-stage splitter pipeline.
+
+Usage: python3 benchmarks/bench_inline.py [--links N ...] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from textnode import (  # noqa: E402
+    TextNode,
+    TextType,
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_textnodes,
+)
+
+
+def stacked_text_to_textnodes(text):
+    """The original pipeline: four delimiter passes, then images, then links."""
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+
+def make_paragraph(links):
+    """A paragraph with the given number of links plus some emphasis, code and images."""
+    parts = []
+    for i in range(links):
+        parts.append(f"Sentence {i} has **bold** and `code` with a [link {i}](https://example.com/{i})")
+        if i % 5 == 0:
+            parts.append(f"and an ![image {i}](/images/{i}.png)")
+    return " ".join(parts) + "."
+
+
+def bench(func, text, repeat):
+    runs = max(1, repeat)
+    number = max(1, 2000 // max(1, len(text) // 100))
+    best = min(timeit.repeat(lambda: func(text), number=number, repeat=runs))
+    return best / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--links", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'links':>6} {'chars':>8} {'stacked us':>12} {'scan us':>10} {'speedup':>8}")
+    for links in args.links:
+        text = make_paragraph(links)
+        if stacked_text_to_textnodes(text) != text_to_textnodes(text):
+            raise SystemExit(f"outputs differ for a paragraph with {links} links")
+        stacked = bench(stacked_text_to_textnodes, text, args.repeat)
+        scan = bench(text_to_textnodes, text, args.repeat)
+        print(f"{links:>6} {len(text):>8} {stacked * 1e6:>12.1f} {scan * 1e6:>10.1f} {stacked / scan:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
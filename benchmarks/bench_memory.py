@@ -0,0 +1,78 @@
+"""
+Measure bytes per node for TextNode, LeafNode and ParentNode, comparing
+the slotted classes with equivalent __dict__-backed classes (the layout
+the node classes used before they were slotted).
+
+Usage: python3 benchmarks/bench_memory.py [--count N]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from htmlnode import LeafNode, ParentNode  # noqa: E402
+from textnode import TextNode, TextType  # noqa: E402
+
+
+class DictTextNode:
+    def __init__(self, text, text_type, url=None, children=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+        self.children = children
+
+
+class DictHTMLNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+class DictLeafNode(DictHTMLNode):
+    def __init__(self, tag, value, props=None):
+        super().__init__(tag, value, None, props)
+
+
+class DictParentNode(DictHTMLNode):
+    def __init__(self, tag, children, props=None):
+        super().__init__(tag, None, children, props)
+
+
+def bytes_per_node(factory, count):
+    """Allocated bytes per instance, excluding the shared field values."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Subtract the list holding the nodes
+    list_bytes = sys.getsizeof(nodes)
+    return (after - before - list_bytes) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200000)
+    args = parser.parse_args()
+
+    children = []
+    cases = [
+        ("TextNode", lambda: DictTextNode("text", TextType.TEXT), lambda: TextNode("text", TextType.TEXT)),
+        ("LeafNode", lambda: DictLeafNode("b", "text"), lambda: LeafNode("b", "text")),
+        ("ParentNode", lambda: DictParentNode("p", children), lambda: ParentNode("p", children)),
+    ]
+
+    print(f"{'class':<12} {'dict bytes':>11} {'slots bytes':>12} {'saved':>7}")
+    for name, dict_factory, slots_factory in cases:
+        dict_bytes = bytes_per_node(dict_factory, args.count)
+        slots_bytes = bytes_per_node(slots_factory, args.count)
+        saved = 1 - slots_bytes / dict_bytes
+        print(f"{name:<12} {dict_bytes:>11.1f} {slots_bytes:>12.1f} {saved:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
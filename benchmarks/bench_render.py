@@ -0,0 +1,61 @@
+"""
+Compare the stack-based ParentNode renderer with the old recursive one on
+synthetic trees of increasing depth.
+
+Usage: python3 benchmarks/bench_render.py [--depths N ...] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from htmlnode import LeafNode, ParentNode  # noqa: E402
+
+
+def recursive_to_html(node):
+    """The original ParentNode.to_html: one Python frame per nesting level."""
+    if not isinstance(node, ParentNode):
+        return node.to_html()
+    children_html = ""
+    for child in node.children:
+        children_html += recursive_to_html(child)
+    return f"<{node.tag}{node.props_to_html()}>{children_html}</{node.tag}>"
+
+
+def make_tree(depth):
+    """Alternating blockquote/ul/li nesting, with a little text at every level."""
+    tags = ("blockquote", "ul", "li")
+    node = LeafNode("b", "deepest")
+    for level in range(depth):
+        node = ParentNode(tags[level % 3], [LeafNode(None, f"level {level} "), node])
+    return node
+
+
+def bench(func, tree, repeat):
+    number = 5
+    return min(timeit.repeat(lambda: func(tree), number=number, repeat=repeat)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--depths", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'depth':>8} {'recursive ms':>14} {'stack ms':>10}")
+    for depth in args.depths:
+        tree = make_tree(depth)
+        stack = bench(ParentNode.to_html, tree, args.repeat)
+        try:
+            if recursive_to_html(tree) != tree.to_html():
+                raise SystemExit(f"outputs differ at depth {depth}")
+            recursive = f"{bench(recursive_to_html, tree, args.repeat) * 1e3:.3f}"
+        except RecursionError:
+            recursive = "RecursionError"
+        print(f"{depth:>8} {recursive:>14} {stack * 1e3:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
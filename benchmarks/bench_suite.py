@@ -0,0 +1,149 @@
+"""
+Time every stage of the pipeline on a synthetic corpus and compare the
+results against a stored JSON baseline.
+
+Usage: python3 benchmarks/bench_suite.py [corpus options] [--repeat N]
+       [--output results.json] [--baseline benchmarks/baseline.json]
+       [--threshold 0.25]
+
+Exits with status 1 when any stage is slower than the baseline by more
+than the threshold (a fraction: 0.25 means 25% slower).
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from corpus import add_corpus_arguments, config_from_args, generate_corpus  # noqa: E402
+from textnode import (  # noqa: E402
+    BlockType,
+    block_to_block_type,
+    generate_pages_recursive,
+    markdown_to_blocks,
+    markdown_to_html_node,
+    text_to_textnodes,
+)
+
+RESULTS_FORMAT = 1
+STAGES = (
+    "markdown_to_blocks",
+    "block_to_block_type",
+    "text_to_textnodes",
+    "markdown_to_html_node",
+    "to_html",
+    "generate_pages_recursive",
+)
+
+
+def best_of(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def run_stages(root, sources, repeat):
+    """Time each stage over the whole corpus; returns {stage: seconds}."""
+    documents = []
+    for path in sources:
+        with open(path, 'r', encoding='utf-8') as f:
+            documents.append(f.read())
+    blocks = [block for document in documents for block in markdown_to_blocks(document)]
+    paragraphs = [
+        " ".join(block.split("\n"))
+        for block in blocks
+        if block_to_block_type(block) == BlockType.PARAGRAPH
+    ]
+    nodes = [markdown_to_html_node(document) for document in documents]
+
+    def build():
+        dest = tempfile.mkdtemp(dir=root)
+        with redirect_stdout(io.StringIO()):
+            generate_pages_recursive(
+                os.path.join(root, "content"),
+                os.path.join(root, "template.html"),
+                dest,
+                force=True,
+            )
+
+    stages = {
+        "markdown_to_blocks": lambda: [markdown_to_blocks(document) for document in documents],
+        "block_to_block_type": lambda: [block_to_block_type(block) for block in blocks],
+        "text_to_textnodes": lambda: [text_to_textnodes(paragraph) for paragraph in paragraphs],
+        "markdown_to_html_node": lambda: [markdown_to_html_node(document) for document in documents],
+        "to_html": lambda: [node.to_html() for node in nodes],
+        "generate_pages_recursive": build,
+    }
+    return {stage: best_of(stages[stage], repeat) for stage in STAGES}
+
+
+def compare(results, baseline, threshold):
+    """Return (stage, baseline seconds, seconds, ratio, regressed) rows."""
+    rows = []
+    for stage in STAGES:
+        before = baseline["stages"].get(stage)
+        after = results["stages"][stage]
+        if not before:
+            rows.append((stage, None, after, None, False))
+            continue
+        ratio = after / before
+        rows.append((stage, before, after, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_corpus_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a stored results file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown before a stage counts as a regression (default: 0.25)")
+    args = parser.parse_args()
+    config = config_from_args(args)
+
+    with tempfile.TemporaryDirectory() as root:
+        sources = generate_corpus(root, config)
+        stages = run_stages(root, sources, args.repeat)
+
+    results = {
+        "format": RESULTS_FORMAT,
+        "python": platform.python_version(),
+        "corpus": config.to_dict(),
+        "repeat": args.repeat,
+        "stages": stages,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if not args.baseline:
+        print(f"{'stage':<26} {'ms':>10}")
+        for stage in STAGES:
+            print(f"{stage:<26} {stages[stage] * 1e3:>10.2f}")
+        return
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get("corpus") != results["corpus"]:
+        print("Warning: baseline was recorded with a different corpus; ratios are not meaningful")
+
+    regressions = 0
+    print(f"{'stage':<26} {'baseline ms':>12} {'ms':>10} {'ratio':>7}")
+    for stage, before, after, ratio, regressed in compare(results, baseline, args.threshold):
+        before_ms = f"{before * 1e3:.2f}" if before else "-"
+        ratio_text = f"{ratio:.2f}" if ratio else "-"
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{stage:<26} {before_ms:>12} {after * 1e3:>10.2f} {ratio_text:>7}{flag}")
+        regressions += regressed
+    if regressions:
+        raise SystemExit(f"{regressions} stage(s) regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Generate a synthetic content tree shaped like content/blog/*/index.md.
+
+Usage: python3 benchmarks/corpus.py DEST [--pages N] [--paragraph-words N]
+       [--link-density F] [--image-density F] [--list-ratio F]
+       [--code-ratio F] [--seed N]
+"""
+import argparse
+import os
+import random
+
+WORDS = (
+    "the ring was forged in the fires of mount doom and carried by a hobbit "
+    "through the shire past bree over weathertop down to rivendell where the "
+    "council met under the watchful eye of elrond while gandalf spoke of saruman"
+).split()
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+
+class CorpusConfig:
+    """The knobs that shape a generated corpus; stored with benchmark results."""
+
+    def __init__(self, pages=200, paragraph_words=80, link_density=0.04,
+                 image_density=0.01, list_ratio=0.2, code_ratio=0.1, seed=0):
+        self.pages = pages
+        self.paragraph_words = paragraph_words
+        # Per-word chances of a word becoming a link or being followed by an image
+        self.link_density = link_density
+        self.image_density = image_density
+        # Fractions of body blocks that are lists and code blocks
+        self.list_ratio = list_ratio
+        self.code_ratio = code_ratio
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def __repr__(self):
+        return f"CorpusConfig({self.to_dict()})"
+
+
+def make_paragraph(rng, config):
+    words = []
+    for i in range(config.paragraph_words):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < config.link_density:
+            word = f"[{word}](/blog/{word}-{i})"
+        elif roll < config.link_density * 2:
+            word = f"**{word}**"
+        elif roll < config.link_density * 3:
+            word = f"_{word}_"
+        elif roll < config.link_density * 4:
+            word = f"`{word}`"
+        words.append(word)
+        if rng.random() < config.image_density:
+            words.append(f"![{word}](/images/{rng.choice(WORDS)}.png)")
+    return " ".join(words)
+
+
+def make_list(rng, config):
+    ordered = rng.random() < 0.5
+    items = []
+    for i in range(rng.randint(2, 6)):
+        marker = f"{i + 1}." if ordered else "-"
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12)))
+        items.append(f"{marker} **{rng.choice(WORDS)}**: {words}")
+    return "\n".join(items)
+
+
+def make_code(rng, config):
+    lines = [f'print("{rng.choice(WORDS)}")' for _ in range(rng.randint(2, 8))]
+    return "```\n" + "\n".join(lines) + "\n```"
+
+
+def make_page(rng, config, index):
+    blocks = [f"# Post {index}: {rng.choice(WORDS).title()}", "[< Back Home](/)"]
+    for section in range(rng.randint(2, 5)):
+        blocks.append(f"## Section {section}")
+        for _ in range(rng.randint(2, 5)):
+            roll = rng.random()
+            if roll < config.code_ratio:
+                blocks.append(make_code(rng, config))
+            elif roll < config.code_ratio + config.list_ratio:
+                blocks.append(make_list(rng, config))
+            elif roll < config.code_ratio + config.list_ratio + 0.05:
+                blocks.append("> " + make_paragraph(rng, config))
+            else:
+                blocks.append(make_paragraph(rng, config))
+    return "\n\n".join(blocks) + "\n"
+
+
+def generate_pages(config):
+    """Yield (relative path, markdown) for every page of the corpus."""
+    rng = random.Random(config.seed)
+    links = []
+    for index in range(config.pages):
+        links.append(f"- [Post {index}](/blog/post-{index})")
+        yield f"blog/post-{index}/index.md", make_page(rng, config, index)
+    yield "index.md", "# Synthetic Blog\n\n" + "\n".join(links) + "\n"
+
+
+def generate_corpus(dest, config):
+    """
+    Write the corpus into dest as content/, static/ and template.html, the
+    same layout main.py builds from. Returns the list of markdown sources.
+    """
+    content_dir = os.path.join(dest, "content")
+    sources = []
+    for rel_path, markdown in generate_pages(config):
+        path = os.path.join(content_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(markdown)
+        sources.append(path)
+
+    static_dir = os.path.join(dest, "static")
+    os.makedirs(static_dir, exist_ok=True)
+    with open(os.path.join(static_dir, "index.css"), 'w', encoding='utf-8') as f:
+        f.write("body { font-family: serif; }\n")
+    with open(os.path.join(dest, "template.html"), 'w', encoding='utf-8') as f:
+        f.write(TEMPLATE)
+    return sources
+
+
+def add_corpus_arguments(parser):
+    defaults = CorpusConfig()
+    parser.add_argument("--pages", type=int, default=defaults.pages)
+    parser.add_argument("--paragraph-words", type=int, default=defaults.paragraph_words)
+    parser.add_argument("--link-density", type=float, default=defaults.link_density)
+    parser.add_argument("--image-density", type=float, default=defaults.image_density)
+    parser.add_argument("--list-ratio", type=float, default=defaults.list_ratio)
+    parser.add_argument("--code-ratio", type=float, default=defaults.code_ratio)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_args(args):
+    return CorpusConfig(
+        pages=args.pages,
+        paragraph_words=args.paragraph_words,
+        link_density=args.link_density,
+        image_density=args.image_density,
+        list_ratio=args.list_ratio,
+        code_ratio=args.code_ratio,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dest")
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+    sources = generate_corpus(args.dest, config_from_args(args))
+    print(f"Wrote {len(sources)} pages to {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,5 +4,5 @@
 # This script builds the site with the "boottracker" basepath for production deployment
 
 echo "Building boottracker site for production..."
-python3 main.py "/boottracker/"
+python3 main.py "/boottracker/" "$@"
 echo "Production build complete!"
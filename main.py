@@ -1,63 +1,361 @@
+import argparse
 import os
-import shutil
 import sys
-from src.textnode import generate_pages_recursive
+import time
+from src.assets import HEADERS_FILENAME, write_headers_file
+from src.blockcache import BlockCache
+from src.daemon import DEFAULT_SOCKET, BuildDaemon, run_daemon, send_request
+from src.devserver import (DEFAULT_INTERVAL as DEFAULT_LIVE_INTERVAL, DEFAULT_MAX_BYTES as DEFAULT_PAGE_CACHE_BYTES,
+                           DEFAULT_PORT, DevSite, serve)
+from src.livesite import LiveSite, watch
+from src.manifest import remove_stale_output
+from src.parsecache import DEFAULT_MAX_BYTES, PARSE_CACHE_DIR, ParseCache
+from src.pipeline import DEFAULT_IO_THREADS, DEFAULT_QUEUE_SIZE
+from src.precompress import DEFAULT_THREADS as DEFAULT_GZIP_THREADS, Precompressor
+from src.sharding import MergeError, Shard, find_shard_dirs, load_page_weights, merge_shards, shard_dir
+from src.staging import StagedOutput
+from src.staticsync import LINK_MODES, sync_static_files
+from src.textnode import PageBuildError, generate_pages_for_targets
+from src.timings import NULL_TIMER, BuildTimings
 
 
-def delete_public_directory(public_dir):
-    """Delete everything in the public directory."""
-    if os.path.exists(public_dir):
-        print(f"Deleting contents of {public_dir}")
-        shutil.rmtree(public_dir)
+def copy_static_files(static_dir, public_dir, checksum=False, link_mode="copy", precompress=None,
+                      fingerprint=False):
+    """Sync static files into the public directory, transferring only what changed."""
+    if not os.path.exists(static_dir):
+        print(f"Warning: Static directory does not exist: {static_dir}")
+        return None
     
-    # Create fresh public directory
-    os.makedirs(public_dir, exist_ok=True)
-    print(f"Created clean public directory: {public_dir}")
+    print(f"Syncing static files from {static_dir} to {public_dir}")
+    stats = sync_static_files(static_dir, public_dir, checksum, link_mode, precompress, fingerprint)
+    print(stats.summary())
+    return stats
 
 
-def copy_static_files(static_dir, public_dir):
-    """Copy all static files from static to public directory."""
-    if not os.path.exists(static_dir):
-        print(f"Warning: Static directory does not exist: {static_dir}")
+def run_cache_command(action, cache):
+    """Handle "main.py cache clear|stats"."""
+    if action == "clear":
+        cache.clear()
+        print(f"Cleared parse cache {cache.path}")
         return
-    
-    print(f"Copying static files from {static_dir} to {public_dir}")
-    
-    for item in os.listdir(static_dir):
-        source_path = os.path.join(static_dir, item)
-        dest_path = os.path.join(public_dir, item)
-        
-        if os.path.isdir(source_path):
-            # Copy directory recursively
-            shutil.copytree(source_path, dest_path)
-            print(f"Copied directory: {source_path} -> {dest_path}")
-        else:
-            # Copy file
-            shutil.copy2(source_path, dest_path)
-            print(f"Copied file: {source_path} -> {dest_path}")
+    stats = cache.stats()
+    print(f"Parse cache: {stats['path']}")
+    print(f"Entries: {stats['entries']}")
+    print(f"Size: {stats['bytes'] / (1024 * 1024):.1f} MB of {stats['max_bytes'] / (1024 * 1024):.0f} MB")
+
+
+def run_rollback_command(public_dir):
+    """Handle "main.py rollback": swap the previous build back in."""
+    staged = StagedOutput(public_dir)
+    try:
+        staged.rollback()
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Swapped {public_dir} with {staged.previous_dir}; run rollback again to undo")
+
+
+def run_request_command(socket_path, request):
+    """Handle "main.py request ...": print the daemon's answer, failing if it reports an error."""
+    try:
+        response = send_request(socket_path, request)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"Error: no daemon is listening on {socket_path}; start one with main.py daemon", file=sys.stderr)
+        sys.exit(1)
+    if "error" in response:
+        print(f"Error: {response['error']}", file=sys.stderr)
+        sys.exit(1)
+    if "changes" in response:
+        for change in response["changes"]:
+            print(change)
+        print(f"Built in {response['ms']:.1f} ms")
+    else:
+        for key, value in response.items():
+            if key != "ok":
+                print(f"{key}: {value}")
+    if not response["ok"]:
+        sys.exit(1)
+
+
+def run_merge_command(shard_dirs, public_dir, link_mode, content_dir):
+    """Handle "main.py merge": combine shard builds into public_dir."""
+    if not shard_dirs:
+        shard_dirs = find_shard_dirs(public_dir)
+    staged = StagedOutput(public_dir)
+    build_dir = staged.prepare(clean=True)
+    print(f"Merging {', '.join(shard_dirs) or 'no shards'} into {build_dir}")
+    try:
+        pages, static = merge_shards(shard_dirs, build_dir, link_mode, content_dir)
+    except MergeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        print(f"{public_dir} was left as it was", file=sys.stderr)
+        sys.exit(1)
+    print(f"Merged {pages} pages and {static} static files")
+    print(published_message(staged, staged.publish()))
+
+
+def published_message(staged, kept_previous):
+    """The line reporting a publish, naming the rollback copy only if there is one."""
+    if kept_previous:
+        return f"Published {staged.public_dir} (previous build kept in {staged.previous_dir})"
+    return f"Published {staged.public_dir}"
+
+
+def parse_shard(value):
+    """Parse a --shard i/n value into a Shard."""
+    try:
+        return Shard.parse(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_target(value):
+    """Parse a --target BASEPATH=DIR value into (dir, basepath)."""
+    basepath, sep, dest_dir = value.partition("=")
+    if not sep or not basepath or not dest_dir:
+        raise argparse.ArgumentTypeError(f"expected BASEPATH=DIR, got {value!r}")
+    return dest_dir, basepath
+
+
+COMMANDS = ("build", "watch", "daemon", "request", "serve", "merge", "cache", "rollback")
+
+
+def parse_args(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # "python3 main.py [basepath]" keeps meaning a plain build
+    if not argv or argv[0] not in COMMANDS + ("-h", "--help"):
+        argv.insert(0, "build")
+
+    cache_options = argparse.ArgumentParser(add_help=False)
+    cache_options.add_argument("--cache-dir", default=PARSE_CACHE_DIR, metavar="DIR",
+                               help=f"where rendered pages are cached between builds (default: {PARSE_CACHE_DIR})")
+    cache_options.add_argument("--cache-mb", type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024), metavar="MB",
+                               help="size cap for the parse cache (default: %(default).0f)")
+
+    build_options = argparse.ArgumentParser(add_help=False, parents=[cache_options])
+    build_options.add_argument("basepath", nargs="?", default="/",
+                               help='base path the site is served from (default: "/")')
+    build_options.add_argument("--target", type=parse_target, action="append", default=[],
+                               metavar="BASEPATH=DIR",
+                               help="also build the site for BASEPATH into DIR, reusing each page's render "
+                                    "(repeatable; build only)")
+    build_options.add_argument("--shard", type=parse_shard, metavar="I/N",
+                               help="build only the I-th of N slices of the pages, split by a stable hash of "
+                                    "their paths, into docs.shard-I-of-N (see merge)")
+    build_options.add_argument("--shard-timings", metavar="REPORT",
+                               help="with --shard, split pages by their build time in an earlier --timings "
+                                    "REPORT instead; every shard must get the same report")
+    build_options.add_argument("--clean", action="store_true",
+                               help="build into an empty staging directory, rebuilding every page")
+    build_options.add_argument("-j", "--jobs", type=int, default=1, metavar="N",
+                               help="render pages in N worker processes (0 = one per CPU, default: 1)")
+    build_options.add_argument("--io-threads", type=int, default=DEFAULT_IO_THREADS, metavar="N",
+                               help="with -j 1, read and write pages in N threads pipelined with rendering, "
+                                    "for slow or network disks; pages are then held whole in memory "
+                                    "(default: 0, which streams each page to disk in turn)")
+    build_options.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, metavar="PAGES",
+                               help="most pages buffered between pipeline stages (default: %(default)s)")
+    build_options.add_argument("--fingerprint", action="store_true",
+                               help="write static files as name.<contenthash>.ext, point pages at those names "
+                                    f"and list them as immutable in {HEADERS_FILENAME}")
+    build_options.add_argument("--no-gzip", action="store_true",
+                               help="don't write precompressed .gz siblings of HTML, CSS and other text outputs")
+    build_options.add_argument("--gzip-threads", type=int, default=DEFAULT_GZIP_THREADS, metavar="N",
+                               help="compress outputs in N threads alongside page generation "
+                                    "(default: %(default)s)")
+    build_options.add_argument("--checksum", action="store_true",
+                               help="compare static files by content hash instead of size and mtime")
+    build_options.add_argument("--link", choices=LINK_MODES, default="copy",
+                               help="how to transfer changed static files (default: copy)")
+    build_options.add_argument("--block-cache-mb", type=float, default=64, metavar="MB",
+                               help="memory budget for cached rendered blocks, 0 to disable (default: 64)")
+    build_options.add_argument("--no-cache", action="store_true",
+                               help="don't read or write the on-disk parse cache")
+    build_options.add_argument("--timings", metavar="REPORT",
+                               help="write per-stage and per-page build timings to REPORT as JSON")
+
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("build", parents=[build_options], help="build the site (default)")
+    watch_parser = commands.add_parser("watch", parents=[build_options],
+                                       help="build, then rebuild only what changes")
+    watch_parser.add_argument("--interval", type=float, default=0.1, metavar="SECONDS",
+                              help="how often to rescan when inotify is unavailable (default: 0.1)")
+    daemon_parser = commands.add_parser("daemon", parents=[build_options],
+                                        help="build, then keep the site in memory and rebuild on request")
+    daemon_parser.add_argument("--socket", default=DEFAULT_SOCKET, metavar="PATH",
+                               help="Unix socket to listen on (default: %(default)s)")
+    request_parser = commands.add_parser("request", help="send a request to a running daemon")
+    request_parser.add_argument("request", nargs="+", metavar="REQUEST",
+                                help='"build", "build PATH" or "stats"')
+    request_parser.add_argument("--socket", default=DEFAULT_SOCKET, metavar="PATH",
+                                help="Unix socket the daemon listens on (default: %(default)s)")
+    serve_parser = commands.add_parser("serve", parents=[cache_options],
+                                       help="serve pages straight from content, rendering each on first request")
+    serve_parser.add_argument("basepath", nargs="?", default="/",
+                              help='base path to serve the site under (default: "/")')
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on (default: %(default)s)")
+    serve_parser.add_argument("--bind", default="127.0.0.1", metavar="ADDRESS",
+                              help="address to listen on (default: %(default)s)")
+    serve_parser.add_argument("--page-cache-mb", type=float, default=DEFAULT_PAGE_CACHE_BYTES / (1024 * 1024),
+                              metavar="MB", help="memory budget for rendered pages (default: %(default).0f)")
+    serve_parser.add_argument("--block-cache-mb", type=float, default=64, metavar="MB",
+                              help="memory budget for cached rendered blocks, 0 to disable (default: 64)")
+    serve_parser.add_argument("--no-cache", action="store_true",
+                              help="don't read or write the on-disk parse cache")
+    serve_parser.add_argument("--no-live-reload", action="store_true",
+                              help="don't push edits to open pages")
+    serve_parser.add_argument("--interval", type=float, default=DEFAULT_LIVE_INTERVAL, metavar="SECONDS",
+                              help="how often open pages' sources are checked for edits (default: %(default)s)")
+    merge_parser = commands.add_parser("merge", help="combine --shard builds into docs")
+    merge_parser.add_argument("shard_dirs", nargs="*", metavar="SHARD_DIR",
+                              help="shard output directories (default: every docs.shard-I-of-N)")
+    merge_parser.add_argument("--link", choices=LINK_MODES, default="copy",
+                              help="how to transfer files out of the shards (default: copy)")
+    cache_parser = commands.add_parser("cache", parents=[cache_options], help="manage the parse cache")
+    cache_parser.add_argument("action", choices=("clear", "stats"))
+    commands.add_parser("rollback", help="swap the previous build back in (run again to undo)")
+    args = parser.parse_args(argv)
+    if args.command in ("build", "watch", "daemon"):
+        dest_dirs = [os.path.normpath(dest_dir) for dest_dir, _ in args.target]
+        if len(set(dest_dirs + ["docs"])) != len(dest_dirs) + 1:
+            parser.error("each --target needs its own directory, other than docs")
+        # Rebuilds after the first build only update docs
+        if args.target and args.command != "build":
+            parser.error(f"--target only applies to build, not {args.command}")
+        if args.shard is not None:
+            if args.command != "build":
+                parser.error("--shard only applies to build")
+            if args.target:
+                parser.error("--shard can't be combined with --target")
+        elif args.shard_timings:
+            parser.error("--shard-timings needs --shard")
+    return args
 
 
 def main():
-    # Get basepath from CLI argument, default to "/"
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
+    args = parse_args()
+    public_dir = "docs"
+    if args.command == "rollback":
+        run_rollback_command(public_dir)
+        return
+    if args.command == "request":
+        run_request_command(args.socket, " ".join(args.request))
+        return
+    if args.command == "merge":
+        run_merge_command(args.shard_dirs, public_dir, args.link, "content")
+        return
+    parse_cache = ParseCache(args.cache_dir, int(args.cache_mb * 1024 * 1024))
+    if args.command == "cache":
+        run_cache_command(args.action, parse_cache)
+        return
+    if args.no_cache:
+        parse_cache = None
+
+    basepath = args.basepath
+    # A zero budget turns the block cache off, as it does in -j workers
+    block_cache_bytes = int(args.block_cache_mb * 1024 * 1024)
+    block_cache = BlockCache(block_cache_bytes) if block_cache_bytes > 0 else None
+    if args.command == "serve":
+        site = DevSite("content", "static", "template.html", basepath, int(args.page_cache_mb * 1024 * 1024),
+                       block_cache, parse_cache, live_reload=not args.no_live_reload)
+        serve(site, args.bind, args.port, args.interval)
+        return
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
     
     # Define paths
-    public_dir = "docs"
     static_dir = "static"
     content_dir = "content"
     template_file = "template.html"
+
+    # A shard builds its slice of the pages into its own directory, for
+    # "main.py merge" to combine
+    shard = args.shard
+    if shard is not None:
+        public_dir = shard_dir(public_dir, shard.index, shard.count)
+        if args.shard_timings:
+            shard.weights = load_page_weights(args.shard_timings, content_dir)
     
-    # Step 1: Delete everything in docs directory
-    delete_public_directory(public_dir)
-    
-    # Step 2: Copy all static files from static to docs
-    copy_static_files(static_dir, public_dir)
+    # Step 1: Build into staging directories, which start out as the
+    # previous builds (or empty with --clean) so unchanged pages can be
+    # skipped. The live directories are untouched until the build succeeds.
+    # docs is the first target; each --target adds another.
+    targets = [(public_dir, basepath)] + args.target
+    outputs = [StagedOutput(dest_dir) for dest_dir, _ in targets]
+    build_dirs = [staged.prepare(args.clean) for staged in outputs]
+    for build_dir in build_dirs:
+        print(f"Building into {build_dir}")
+
+    timings = BuildTimings() if args.timings else NULL_TIMER
+    # Outputs are gzipped in the background as soon as each one is final
+    precompress = None if args.no_gzip else Precompressor(args.gzip_threads)
+    start = time.perf_counter()
+
+    # Step 2: Sync static files from static to the staging directories;
+    # fingerprinted names depend only on file contents, so every target
+    # gets the same asset map
+    assets = None
+    with timings.stage("static_copy"):
+        for build_dir in build_dirs:
+            static_stats = copy_static_files(static_dir, build_dir, args.checksum, args.link, precompress,
+                                             args.fingerprint)
+            if static_stats is not None:
+                assets = static_stats.assets
     
-    # Step 3: Generate pages recursively from content directory
-    generate_pages_recursive(content_dir, template_file, public_dir, basepath)
+    # Step 3: Generate pages recursively from content directory, rendering
+    # each page once for all targets
+    build_targets = [(build_dir, target_basepath) for build_dir, (_, target_basepath) in zip(build_dirs, targets)]
+    try:
+        generate_pages_for_targets(content_dir, template_file, build_targets, jobs=jobs, timings=timings,
+                                   block_cache=block_cache, parse_cache=parse_cache,
+                                   io_threads=args.io_threads, queue_size=max(1, args.queue_size),
+                                   precompress=precompress, assets=assets, shard=shard)
+    except PageBuildError as e:
+        if precompress is not None:
+            precompress.abort()
+        print(f"Error: {e}", file=sys.stderr)
+        left = ", ".join(dest_dir for dest_dir, _ in targets)
+        print(f"{left} {'was left as it was' if len(targets) == 1 else 'were left as they were'}", file=sys.stderr)
+        sys.exit(1)
+
+    if assets is not None:
+        for build_dir, (_, target_basepath) in zip(build_dirs, targets):
+            write_headers_file(build_dir, assets, target_basepath)
+        print(f"Wrote {HEADERS_FILENAME} marking {len(assets)} fingerprinted files immutable")
+    elif not os.path.exists(os.path.join(static_dir, HEADERS_FILENAME)):
+        # One left by an earlier fingerprinted build lists files that are gone
+        for build_dir in build_dirs:
+            remove_stale_output(build_dir, HEADERS_FILENAME)
+
+    # Step 4: Finish the gzip siblings still being written
+    if precompress is not None:
+        with timings.stage("precompress_wait"):
+            precompress_stats = precompress.close()
+        timings.add("precompress", precompress_stats.seconds)
+        print(precompress_stats.summary())
+
+    # Step 5: Swap the new builds in; the old ones are kept for "main.py rollback"
+    with timings.stage("publish"):
+        kept = [staged.publish() for staged in outputs]
+    for staged, kept_previous in zip(outputs, kept):
+        print(published_message(staged, kept_previous))
     
     print("Static site generation complete!")
 
+    if args.timings:
+        timings.add("total", time.perf_counter() - start)
+        timings.write(args.timings)
+        print(f"Wrote build timings to {args.timings}")
+
+    if args.command in ("watch", "daemon"):
+        site = LiveSite(content_dir, static_dir, template_file, public_dir, basepath, args.link, block_cache,
+                        parse_cache, precompress=not args.no_gzip, assets=assets)
+        site.load()
+        if args.command == "watch":
+            watch(site, args.interval)
+        else:
+            run_daemon(BuildDaemon(site), args.socket)
+
 
 if __name__ == "__main__":
     main()
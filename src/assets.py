@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+
+try:
+    from pagewriter import PageWriter
+except ImportError:
+    from .pagewriter import PageWriter
+
+
+# Hex digits of the content hash put into fingerprinted file names
+FINGERPRINT_LENGTH = 12
+HEADERS_FILENAME = "_headers"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def fingerprinted_name(rel_path, content_hash):
+    """Add the content hash to a file name: images/logo.png -> images/logo.<hash>.png."""
+    directory, name = os.path.split(rel_path)
+    stem, ext = os.path.splitext(name)
+    return os.path.join(directory, f"{stem}.{content_hash[:FINGERPRINT_LENGTH]}{ext}").replace(os.sep, '/')
+
+
+class AssetMap:
+    """
+    Root-relative URL of every fingerprinted static file ("/index.css")
+    mapped to the URL it is served from ("/index.0123456789ab.css").
+
+    A UrlResolver looks every root-relative link and image URL up here
+    before applying the basepath, so pages and the template point at the
+    fingerprinted files.
+    """
+
+    __slots__ = ("urls",)
+
+    def __init__(self, urls=None):
+        self.urls = dict(urls or {})
+
+    @classmethod
+    def from_outputs(cls, outputs):
+        """Build the map from {source rel path: fingerprinted rel path}."""
+        return cls({f"/{source}": f"/{output}" for source, output in outputs.items()})
+
+    def get(self, url):
+        return self.urls.get(url)
+
+    def __len__(self):
+        return len(self.urls)
+
+    def __eq__(self, other):
+        return isinstance(other, AssetMap) and self.urls == other.urls
+
+    def __repr__(self):
+        return f"AssetMap({len(self.urls)} assets)"
+
+    @property
+    def digest(self):
+        """Hash of the whole map; pages depend on it the way they do on the template."""
+        data = json.dumps(self.urls, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(data).hexdigest()
+
+
+def render_headers_file(assets, basepath="/"):
+    """
+    The _headers file (the format Netlify and Cloudflare Pages read) that
+    marks every fingerprinted path as immutable. A fingerprinted file's
+    contents never change under its name, so clients can cache it for a
+    year without revalidating.
+    """
+    lines = []
+    for url in sorted(assets.urls.values()):
+        lines.append(basepath.rstrip("/") + url)
+        lines.append(f"  Cache-Control: {IMMUTABLE_CACHE_CONTROL}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def write_headers_file(public_dir, assets, basepath="/"):
+    """Write public_dir/_headers; returns False if it was already up to date."""
+    output = PageWriter(os.path.join(public_dir, HEADERS_FILENAME))
+    try:
+        output.write(render_headers_file(assets, basepath))
+    except BaseException:
+        output.abort()
+        raise
+    return output.commit()
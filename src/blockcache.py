@@ -0,0 +1,103 @@
+import hashlib
+import sys
+from collections import OrderedDict
+
+
+# Default memory budget for cached fragments
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Rough per-entry cost on top of the fragment itself: the key tuple, its
+# digest and the ordered dict's bookkeeping
+ENTRY_OVERHEAD = 200
+
+
+def block_key(block, block_type, url_key=None):
+    """
+    Cache key for a block: its type plus a digest of its text, and the
+    resolver key (basepath) its URLs were resolved for, if any.
+    """
+    digest = hashlib.blake2b(block.encode('utf-8'), digest_size=16).digest()
+    if url_key is None:
+        return block_type, digest
+    return block_type, digest, url_key
+
+
+def fragment_size(html):
+    return sys.getsizeof(html) + ENTRY_OVERHEAD
+
+
+class BlockCache:
+    """
+    LRU cache of rendered HTML fragments, one per markdown block.
+
+    Fragments are stored before basepath rewriting, so one cache serves
+    every basepath. When the estimated size of the cached fragments goes
+    over max_bytes, the least recently used ones are evicted. size_of
+    estimates what an entry costs, so other rendered values can be cached
+    the same way (the dev server keeps whole pages in one); label is what
+    the summary calls them.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, size_of=fragment_size, label="Blocks"):
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.label = label
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        html = self.entries.get(key)
+        if html is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return html
+
+    def put(self, key, html):
+        cost = self.size_of(html)
+        if cost > self.max_bytes:
+            return
+        self.discard(key)
+        self.entries[key] = html
+        self.size += cost
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= self.size_of(evicted)
+            self.evictions += 1
+
+    def discard(self, key):
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= self.size_of(previous)
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def counters(self):
+        return (self.hits, self.misses, self.evictions)
+
+    def add_counters(self, counters):
+        """Fold in the counters of another process's cache."""
+        hits, misses, evictions = counters
+        self.hits += hits
+        self.misses += misses
+        self.evictions += evictions
+
+    def __repr__(self):
+        return (f"{type(self).__name__}(entries={len(self.entries)}, size={self.size}, "
+                f"max_bytes={self.max_bytes})")
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        return (
+            f"{self.label}: {self.hits} cached, {self.misses} rendered ({rate:.0%} hit rate), "
+            f"{self.evictions} evicted"
+        )
@@ -0,0 +1,159 @@
+import json
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+
+
+DEFAULT_SOCKET = ".boottracker.sock"
+REQUESTS = ("build", "build <path>", "stats")
+
+
+class BuildDaemon:
+    """
+    Answers build requests against a loaded LiveSite, which keeps every
+    page's parsed body, the compiled template and the hash of every
+    output in memory between requests.
+
+    "build" rescans the source trees by stat and rebuilds what changed;
+    "build <path>" looks at just that file (or a removed directory), so a
+    single-page rebuild costs one stat, one render and one write. "stats"
+    reports what is held and how requests went. Requests are handled one
+    at a time.
+    """
+
+    def __init__(self, site):
+        self.site = site
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.builds = 0
+        self.build_seconds = 0.0
+        self.last_build_ms = None
+
+    def handle(self, request):
+        """Answer one request line with a JSON-serializable dict."""
+        command, _, argument = request.strip().partition(" ")
+        argument = argument.strip()
+        with self.lock:
+            if command == "build":
+                return self.build(argument or None)
+            if command == "stats" and not argument:
+                return self.stats()
+        return {"ok": False, "error": f"unknown request {request.strip()!r}; expected one of: {', '.join(REQUESTS)}"}
+
+    def build(self, path=None):
+        changed_paths = None
+        if path is not None:
+            if not self.is_source(path):
+                return {"ok": False, "error": f"{path} is not under {self.site.content_dir} or "
+                                             f"{self.site.static_dir}, nor {self.site.template_path}"}
+            changed_paths = {path}
+        start = time.perf_counter()
+        changes = self.site.poll(changed_paths)
+        elapsed = time.perf_counter() - start
+        self.builds += 1
+        self.build_seconds += elapsed
+        self.last_build_ms = round(elapsed * 1000, 3)
+        failed = [change for change in changes if change.startswith("Failed")]
+        return {"ok": not failed, "changes": changes, "ms": self.last_build_ms}
+
+    def is_source(self, path):
+        path = os.path.normpath(path)
+        if path == os.path.normpath(self.site.template_path):
+            return True
+        for root in (self.site.content_dir, self.site.static_dir):
+            rel_path = os.path.relpath(path, root)
+            if rel_path != os.curdir and not rel_path.startswith(os.pardir):
+                return True
+        return False
+
+    def stats(self):
+        cache = self.site.block_cache
+        return {
+            "ok": True,
+            "pages": len(self.site.pages),
+            "static_files": len(self.site.static_files),
+            "output_hashes": len(self.site.output_hashes),
+            "builds": self.builds,
+            "build_seconds": round(self.build_seconds, 6),
+            "last_build_ms": self.last_build_ms,
+            "uptime_seconds": round(time.monotonic() - self.started, 3),
+            "block_cache": None if cache is None else {"entries": len(cache), "bytes": cache.size,
+                                                       "hits": cache.hits, "misses": cache.misses},
+        }
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """One JSON line answers each request line, for as long as the client stays connected."""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = line.decode('utf-8')
+            except UnicodeDecodeError:
+                response = {"ok": False, "error": "requests must be UTF-8"}
+            else:
+                if not request.strip():
+                    continue
+                response = self.server.build_daemon.handle(request)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b"\n")
+
+
+class DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, daemon):
+        remove_stale_socket(socket_path)
+        super().__init__(socket_path, DaemonRequestHandler)
+        self.socket_path = socket_path
+        self.build_daemon = daemon
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def remove_stale_socket(socket_path):
+    """Remove a socket left by a daemon that didn't exit cleanly; refuses to remove anything else."""
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{socket_path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.remove(socket_path)
+    else:
+        raise FileExistsError(f"a daemon is already listening on {socket_path}")
+    finally:
+        probe.close()
+
+
+def send_request(socket_path, request, timeout=None):
+    """Send one request to a running daemon and return its decoded response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall(request.strip().encode('utf-8') + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile('rb') as f:
+            return json.loads(f.readline())
+
+
+def run_daemon(daemon, socket_path=DEFAULT_SOCKET):
+    """Serve requests until interrupted."""
+    server = DaemonServer(socket_path, daemon)
+    print(f"Listening on {socket_path} for {', '.join(REQUESTS)} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    print(f"Stopped after {daemon.builds} builds")
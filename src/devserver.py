@@ -0,0 +1,539 @@
+import difflib
+import hashlib
+import json
+import mimetypes
+import os
+import queue
+import threading
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+try:
+    from blockcache import BlockCache
+    from livesite import stat_key
+    from textnode import BuildTarget, extract_title, iter_markdown_html, read_source, render_source
+    from urls import DEFERRED_RESOLVER
+except ImportError:
+    from .blockcache import BlockCache
+    from .livesite import stat_key
+    from .textnode import BuildTarget, extract_title, iter_markdown_html, read_source, render_source
+    from .urls import DEFERRED_RESOLVER
+
+
+DEFAULT_PORT = 8888
+# Default memory budget for rendered pages
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Rough per-entry cost on top of the page itself
+ENTRY_OVERHEAD = 300
+# Event stream pages subscribe to, relative to the basepath
+LIVE_RELOAD_PATH = "_livereload"
+# How often the sources of open pages are checked for changes
+DEFAULT_INTERVAL = 0.2
+# Comment sent on an idle event stream, so closed connections are noticed
+KEEPALIVE_SECONDS = 15
+
+# Added right after the page's content <div>, so the script finds it as
+# its previous sibling. Each message either reloads the page or lists
+# (start, end, blocks) replacements of the div's children, which are
+# applied last to first so earlier indices stay valid.
+LIVE_RELOAD_SCRIPT = """<script>
+(function () {
+  var content = document.currentScript.previousElementSibling;
+  var events = new EventSource(%(url)s + "?page=" + encodeURIComponent(location.pathname) + "&version=%(version)s");
+  events.onmessage = function (message) {
+    var change = JSON.parse(message.data);
+    if (change.reload) {
+      events.close();
+      location.reload();
+      return;
+    }
+    change.ops.slice().reverse().forEach(function (op) {
+      for (var i = op[1] - 1; i >= op[0]; i--) {
+        content.removeChild(content.children[i]);
+      }
+      var blocks = document.createElement("template");
+      blocks.innerHTML = op[2].join("");
+      content.insertBefore(blocks.content, content.children[op[0]] || null);
+    });
+  };
+})();
+</script>"""
+
+
+def diff_blocks(old_blocks, new_blocks):
+    """
+    The replacements that turn one page's top-level blocks into another's:
+    a list of (start, end, new blocks) meaning old_blocks[start:end] is
+    replaced by new blocks. Blocks are compared by their HTML, which is
+    what the page's block nodes render to.
+    """
+    matcher = difflib.SequenceMatcher(None, old_blocks, new_blocks, autojunk=False)
+    return [
+        (old_start, old_end, new_blocks[new_start:new_end])
+        for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header names etag (weak or strong) or is "*"."""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class RenderedPage:
+    """
+    One rendered page: the bytes sent and the source and template stamps
+    they came from. With live reload, also its title and top-level blocks (URLs resolved)
+    and a version naming them, which the page's script reports back.
+    """
+
+    __slots__ = ("stamp", "template_stamp", "body", "etag", "title", "blocks", "version")
+
+    def __init__(self, stamp, body, title=None, blocks=None, version=None, template_stamp=None):
+        self.stamp = stamp
+        self.template_stamp = template_stamp
+        self.body = body
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        self.title = title
+        self.blocks = blocks
+        self.version = version
+
+
+def page_version(title, blocks):
+    digest = hashlib.blake2b(title.encode('utf-8'), digest_size=16)
+    for block in blocks:
+        digest.update(b"\0")
+        digest.update(block.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def page_size(page):
+    return len(page.body) + ENTRY_OVERHEAD
+
+
+class PageCache(BlockCache):
+    """
+    BlockCache of RenderedPages, keyed by source path.
+
+    Each page remembers the (mtime_ns, size) of the source it was rendered
+    from, and a lookup with any other stamp is a miss that drops it, so an
+    edited page is rendered again on its next request.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(max_bytes, page_size, "Pages")
+
+    def get(self, key, stamp):
+        page = self.entries.get(key)
+        if page is not None and page.stamp != stamp:
+            self.discard(key)
+        return super().get(key)
+
+
+class DevSite:
+    """
+    The site served straight from its sources, without a build.
+
+    A request path is mapped to the markdown file a build would have
+    turned into it, which is rendered on first request through the same
+    code as a build, so the bytes match docs/. Nothing is scanned up
+    front: serving a 100k-page tree starts as fast as a 10-page one.
+    Rendered pages are kept in a PageCache, and a template change drops
+    them all.
+
+    With live_reload, every page also gets a script that subscribes to
+    LIVE_RELOAD_PATH, and pages are rendered block by block so a
+    LiveReload can send just the blocks an edit changed.
+    """
+
+    def __init__(self, content_dir, static_dir, template_path, basepath="/", max_bytes=DEFAULT_MAX_BYTES,
+                 block_cache=None, parse_cache=None, live_reload=False):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.basepath = basepath
+        self.pages = PageCache(max_bytes)
+        self.block_cache = block_cache
+        self.parse_cache = parse_cache
+        self.live_reload = live_reload
+        self.target = None
+        self.template_stamp = None
+        # Rendering is CPU-bound anyway; one lock keeps the caches consistent
+        self.lock = threading.Lock()
+
+    def locate(self, url_path):
+        """
+        Map a decoded request path to what answers it:
+        ("page", markdown path), ("static", file path),
+        ("redirect", location) or None for a 404.
+        """
+        if not url_path.startswith(self.basepath):
+            if url_path == self.basepath.rstrip("/"):
+                return "redirect", self.basepath
+            return None
+        rel_path = url_path[len(self.basepath):]
+        parts = rel_path.split("/")
+        # An empty segment ("//", or an encoded "/" after the basepath)
+        # would make rel_path absolute and escape the trees below
+        if "" in parts[:-1] or any(part in ("..", ".") or "\\" in part or "\0" in part for part in parts):
+            return None
+
+        if rel_path == "" or rel_path.endswith("/"):
+            source_path = self._file_under(self.content_dir, rel_path + "index.md")
+            return ("page", source_path) if source_path is not None else None
+        if rel_path.endswith(".html"):
+            # Pages take precedence, as they overwrite static files in a build
+            source_path = self._file_under(self.content_dir, rel_path[:-len(".html")] + ".md")
+            if source_path is not None:
+                return "page", source_path
+        static_path = self._file_under(self.static_dir, rel_path)
+        if static_path is not None:
+            return "static", static_path
+        if self._file_under(self.content_dir, rel_path + "/index.md") is not None:
+            return "redirect", f"{url_path}/"
+        return None
+
+    def _file_under(self, root, rel_path):
+        """root/rel_path if it is a file that, symlinks resolved, is still inside root."""
+        path = os.path.join(root, rel_path)
+        if not os.path.isfile(path):
+            return None
+        real_root = os.path.realpath(root)
+        if os.path.commonpath([real_root, os.path.realpath(path)]) != real_root:
+            return None
+        return path
+
+    def render(self, source_path):
+        """
+        The RenderedPage for a markdown file, from the cache while neither
+        it nor the template has changed.
+
+        Raises:
+            FileNotFoundError: if the source disappeared
+            ValueError: if the page can't be rendered (no h1 title, bad markdown)
+        """
+        with self.lock:
+            target = self._current_target()
+            stamp = stat_key(source_path)
+            if stamp is None:
+                raise FileNotFoundError(source_path)
+            page = self.pages.get(source_path, stamp)
+            if page is None:
+                if self.live_reload:
+                    page = self._render_live(target, source_path, stamp)
+                else:
+                    title, body = render_source(source_path, self.block_cache, self.parse_cache)
+                    body = target.render(title, body).encode('utf-8')
+                    page = RenderedPage(stamp, body, template_stamp=self.template_stamp)
+                self.pages.put(source_path, page)
+            return page
+
+    def _current_target(self):
+        stamp = stat_key(self.template_path)
+        if self.target is None or stamp != self.template_stamp:
+            with open(self.template_path, 'r', encoding='utf-8') as f:
+                self.target = BuildTarget(None, self.basepath, f.read())
+            self.template_stamp = stamp
+            self.pages.clear()
+        return self.target
+
+    def _render_live(self, target, source_path, stamp):
+        # Rendered block by block (through the block cache) rather than
+        # from the parse cache, which only has whole bodies
+        markdown, _, _ = read_source(source_path)
+        title = extract_title(markdown)
+        chunks = list(iter_markdown_html(markdown.split('\n'), self.block_cache, DEFERRED_RESOLVER))
+        blocks = [target.resolver.specialize(block) for block in chunks[1:-1]]
+        version = page_version(title, blocks)
+        script = LIVE_RELOAD_SCRIPT % {"url": json.dumps(self.basepath + LIVE_RELOAD_PATH), "version": version}
+        body = target.render(title, "".join(chunks) + script).encode('utf-8')
+        return RenderedPage(stamp, body, title, blocks, version, self.template_stamp)
+
+
+class Subscriber:
+    """One open page's event stream: the page as it last saw it, and its pending events."""
+
+    __slots__ = ("source_path", "page", "events")
+
+    def __init__(self, source_path, page):
+        self.source_path = source_path
+        self.page = page
+        self.events = queue.SimpleQueue()
+
+
+class LiveReload:
+    """
+    Pushes changes to the pages open in browsers.
+
+    Only the sources of subscribed pages (and the template) are checked,
+    by their stat, so the cost follows the number of open pages rather
+    than the size of the tree. A changed page is rendered again and
+    diffed, block by block, against what each subscriber last saw; the
+    subscriber gets just the replaced blocks. A template change, a new
+    title or a page that no longer renders sends a reload instead.
+    """
+
+    def __init__(self, site, interval=DEFAULT_INTERVAL):
+        self.site = site
+        self.interval = interval
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="livereload", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.closed.wait(self.interval):
+            for change in self.poll():
+                self.report(change)
+
+    def report(self, change):
+        print(change)
+
+    def close(self):
+        """Stop checking and end every event stream."""
+        self.closed.set()
+        with self.lock:
+            subscribers, self.subscribers = self.subscribers, []
+        for subscriber in subscribers:
+            subscriber.events.put(None)
+
+    def subscribe(self, source_path, version):
+        """
+        Start following a page. A client whose version is not the current
+        one missed a change while connecting and is told to reload.
+        """
+        try:
+            page = self.site.render(source_path)
+        except Exception:
+            page = None
+        subscriber = Subscriber(source_path, page)
+        if page is None or page.version != version:
+            subscriber.events.put({"reload": True})
+            return subscriber
+        with self.lock:
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+    def poll(self):
+        """
+        Check every subscribed page once and queue what changed.
+        Returns a list of human-readable descriptions of what was sent.
+        """
+        with self.lock:
+            subscribers = list(self.subscribers)
+        if not subscribers:
+            return []
+        # Each page is checked against the template it was rendered with:
+        # a render in between polls picks up a new template for the cache
+        # but not for the pages already open
+        changes = []
+        template_stamp = stat_key(self.site.template_path)
+        outdated = [subscriber for subscriber in subscribers
+                    if subscriber.page.template_stamp != template_stamp]
+        if outdated:
+            self._reload(outdated)
+            changes.append(f"Reloading {len(outdated)} pages for template change")
+            subscribers = [subscriber for subscriber in subscribers if subscriber not in outdated]
+
+        by_source = {}
+        for subscriber in subscribers:
+            by_source.setdefault(subscriber.source_path, []).append(subscriber)
+        for source_path, followers in sorted(by_source.items()):
+            stamp = stat_key(source_path)
+            stale = [subscriber for subscriber in followers if subscriber.page.stamp != stamp]
+            if not stale:
+                continue
+            try:
+                page = self.site.render(source_path)
+            except Exception as e:
+                self._reload(stale)
+                changes.append(f"Reloading {source_path}: {e}")
+                continue
+            for subscriber in stale:
+                if page.title != subscriber.page.title:
+                    self._reload([subscriber])
+                    changes.append(f"Reloading {source_path} for new title")
+                    continue
+                ops = diff_blocks(subscriber.page.blocks, page.blocks)
+                subscriber.page = page
+                if ops:
+                    subscriber.events.put({"ops": ops})
+                    changes.append(f"Sent {sum(len(op[2]) for op in ops)} changed blocks of {source_path}")
+        return changes
+
+    def _reload(self, subscribers):
+        for subscriber in subscribers:
+            self.unsubscribe(subscriber)
+            subscriber.events.put({"reload": True})
+
+
+class DevRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET and HEAD from a DevSite. Every response carries an ETag
+    and asks browsers to revalidate, so unchanged pages and files cost a
+    304. Static files are sent with sendfile, without passing through
+    Python.
+    """
+
+    server_version = "boottracker-dev"
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def respond(self, send_body):
+        site = self.server.site
+        url = urlsplit(self.path)
+        url_path = unquote(url.path)
+        if self.server.live_reload is not None and url_path == site.basepath + LIVE_RELOAD_PATH:
+            self.stream_changes(self.server.live_reload, parse_qs(url.query))
+            return
+        found = site.locate(url_path)
+        if found is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        kind, value = found
+        if kind == "redirect":
+            self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+            self.send_header("Location", value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif kind == "page":
+            self.send_page(site, value, send_body)
+        else:
+            self.send_static(value, send_body)
+
+    def send_page(self, site, source_path, send_body):
+        try:
+            page = site.render(source_path)
+        except FileNotFoundError:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        except Exception as e:
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, explain=f"{source_path}: {type(e).__name__}: {e}")
+            return
+        if self.send_validators(page.etag):
+            return
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(page.body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(page.body)
+
+    def send_static(self, path, send_body):
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        with f:
+            stat = os.fstat(f.fileno())
+            etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+            if self.send_validators(etag, stat.st_mtime):
+                return
+            content_type, _ = mimetypes.guess_type(path)
+            self.send_header("Content-Type", content_type or "application/octet-stream")
+            self.send_header("Content-Length", str(stat.st_size))
+            self.end_headers()
+            if send_body:
+                self.wfile.flush()
+                self.connection.sendfile(f)
+
+    def stream_changes(self, live_reload, params):
+        """Serve a page's event stream until it reloads or disconnects."""
+        # The script sends location.pathname, which is already
+        # percent-encoded, through encodeURIComponent
+        found = self.server.site.locate(unquote(params.get("page", [""])[0]))
+        if found is None or found[0] != "page":
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        # Subscribed before answering, so no change slips in between
+        subscriber = live_reload.subscribe(found[1], params.get("version", [""])[0])
+        try:
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            while True:
+                try:
+                    event = subscriber.events.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                    continue
+                if event is None:
+                    break
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+                if event.get("reload"):
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            live_reload.unsubscribe(subscriber)
+
+    def send_validators(self, etag, mtime=None):
+        """
+        Start the response: 304 (and True) if the client's copy is current,
+        otherwise a 200 status line with the validators, for the caller to
+        finish.
+        """
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return True
+        self.send_response(HTTPStatus.OK)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        if mtime is not None:
+            self.send_header("Last-Modified", formatdate(mtime, usegmt=True))
+        return False
+
+
+class DevServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, site, interval=DEFAULT_INTERVAL):
+        super().__init__(address, DevRequestHandler)
+        self.site = site
+        self.live_reload = None
+        if site.live_reload:
+            self.live_reload = LiveReload(site, interval)
+            self.live_reload.start()
+
+    def server_close(self):
+        if self.live_reload is not None:
+            self.live_reload.close()
+        super().server_close()
+
+
+def serve(site, host="127.0.0.1", port=DEFAULT_PORT, interval=DEFAULT_INTERVAL):
+    """Serve the site until interrupted, then report how the page cache did."""
+    server = DevServer((host, port), site, interval)
+    print(f"Serving {site.content_dir} and {site.static_dir} at http://{host}:{server.server_port}{site.basepath} "
+          "(Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    print(site.pages.summary())
+    if site.block_cache is not None:
+        print(site.block_cache.summary())
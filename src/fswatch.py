@@ -0,0 +1,144 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+
+
+# Event bits from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """
+    Fallback watcher: sleeps for the interval and then asks for a full
+    rescan by returning None from wait().
+    """
+
+    def __init__(self, roots, files=()):
+        pass
+
+    def wait(self, timeout):
+        select.select([], [], [], timeout)
+        return None
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Linux inotify watcher over whole directory trees and single files.
+
+    wait() blocks until something changes and returns the set of paths
+    that changed, or None when events were lost and the caller should
+    rescan everything.
+    """
+
+    def __init__(self, roots, files=()):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}
+        self.tree_watches = set()
+        # Single files are watched through their parent directory, and
+        # only events naming one of them are reported
+        self.files = {os.path.normpath(path) for path in files}
+        for root in roots:
+            if os.path.isdir(root):
+                self.add_tree(root)
+        for path in self.files:
+            self.add_directory(os.path.dirname(path) or ".")
+
+    def add_directory(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self.directories[wd] = directory
+        return wd
+
+    def add_tree(self, root):
+        """Watch root and every directory under it; return the files found."""
+        found = []
+        for directory, dirs, files in os.walk(root):
+            self.tree_watches.add(self.add_directory(directory))
+            found.extend(os.path.join(directory, file) for file in files)
+        return found
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        # Give a burst of events (an editor's save, a git checkout) a moment
+        # to arrive so it's handled as one batch
+        select.select([], [], [], 0.005)
+        return self.read_events()
+
+    def read_events(self):
+        changed = set()
+        try:
+            data = os.read(self.fd, 1 << 20)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                return None
+            directory = self.directories.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.directories[wd]
+                self.tree_watches.discard(wd)
+                continue
+            if not name:
+                continue
+
+            path = os.path.join(directory, os.fsdecode(name))
+            if wd not in self.tree_watches:
+                if os.path.normpath(path) in self.files:
+                    changed.add(path)
+                continue
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                changed.update(self.add_tree(path))
+            changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(roots, files=()):
+    """Return an inotify watcher on Linux, otherwise a polling one."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots, files)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(roots, files)
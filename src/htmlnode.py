@@ -1,4 +1,6 @@
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -8,6 +10,15 @@ class HTMLNode:
     def to_html(self):
         raise NotImplementedError("to_html method not implemented")
 
+    def iter_html(self):
+        """Yield the node's HTML in chunks; joining them gives to_html()."""
+        yield self.to_html()
+
+    def render_to(self, writer):
+        """Stream the node's HTML into a file-like object with a write() method."""
+        for chunk in self.iter_html():
+            writer.write(chunk)
+
     def props_to_html(self):
         if self.props is None:
             return ""
@@ -16,12 +27,49 @@ class HTMLNode:
             props_html += f' {prop}="{self.props[prop]}"'
         return props_html
 
+    def __eq__(self, other):
+        """Nodes are equal when they have the same type, fields and (recursively) children."""
+        if not isinstance(other, HTMLNode):
+            return NotImplemented
+        # Compare pairwise with an explicit stack so deep trees don't recurse
+        pairs = [(self, other)]
+        while pairs:
+            a, b = pairs.pop()
+            if type(a) is not type(b):
+                return False
+            if a.tag != b.tag or a.value != b.value or a.props != b.props:
+                return False
+            if a.children is None or b.children is None:
+                if a.children is not b.children:
+                    return False
+                continue
+            if len(a.children) != len(b.children):
+                return False
+            pairs.extend(zip(a.children, b.children))
+        return True
+
+    def __hash__(self):
+        # Hash a pre-order flattening of the tree; child counts make it unambiguous
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            children = node.children
+            props = frozenset(node.props.items()) if node.props is not None else None
+            count = len(children) if children is not None else None
+            parts.append((type(node).__name__, node.tag, node.value, props, count))
+            if children:
+                stack.extend(reversed(children))
+        return hash(tuple(parts))
+
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, children: {self.children}, {self.props})"
 
 
 # LeafNode: a child of HTMLNode that does not allow children, requires value and tag (tag can be None), props optional
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
@@ -42,6 +90,8 @@ class LeafNode(HTMLNode):
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
@@ -50,23 +100,44 @@ class ParentNode(HTMLNode):
             raise ValueError("invalid HTML: no tag")
         if self.children is None:
             raise ValueError("invalid HTML: no children")
-        
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
-        
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        """
+        Yield the subtree's HTML without recursion: an explicit stack of
+        (open tag, remaining children) pairs replaces the call stack, so
+        trees deeper than Python's recursion limit still render.
+        """
+        yield self._open_tag()
+        stack = [(self, iter(self.children))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if isinstance(child, ParentNode):
+                    yield child._open_tag()
+                    stack.append((child, iter(child.children)))
+                    break
+                yield child.to_html()
+            else:
+                stack.pop()
+                yield f"</{node.tag}>"
+
+    def _open_tag(self):
+        if self.tag is None:
+            raise ValueError("invalid HTML: no tag")
+        if self.children is None:
+            raise ValueError("invalid HTML: no children")
+        return f"<{self.tag}{self.props_to_html()}>"
 
     def __repr__(self):
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
 
 
-def text_node_to_html_node(text_node):
-    try:
-        from textnode import TextType
-    except ImportError:
-        from .textnode import TextType
-    
+def text_node_to_html_node(text_node, resolver=None):
+    """
+    Convert a TextNode to an HTMLNode. With a UrlResolver, link and image
+    URLs are resolved for the build's basepath as the node is built.
+    """
     if text_node.text_type == TextType.TEXT:
         return LeafNode(None, text_node.text)
     elif text_node.text_type == TextType.BOLD:
@@ -76,8 +147,21 @@ def text_node_to_html_node(text_node):
     elif text_node.text_type == TextType.CODE:
         return LeafNode("code", text_node.text)
     elif text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
+        url = resolver.resolve(text_node.url) if resolver is not None else text_node.url
+        if text_node.children:
+            children = [text_node_to_html_node(child, resolver) for child in text_node.children]
+            return ParentNode("a", children, {"href": url})
+        return LeafNode("a", text_node.text, {"href": url})
     elif text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        url = resolver.resolve(text_node.url) if resolver is not None else text_node.url
+        return LeafNode("img", "", {"src": url, "alt": text_node.text})
     else:
         raise ValueError(f"Invalid text type: {text_node.text_type}")
+
+
+# textnode imports this module's classes, so TextType is imported last,
+# once they exist
+try:
+    from textnode import TextType
+except ImportError:
+    from .textnode import TextType
@@ -0,0 +1,283 @@
+import hashlib
+import os
+import time
+
+try:
+    from assets import write_headers_file
+    from fswatch import make_watcher
+    from manifest import remove_stale_output
+    from precompress import Precompressor, remove_gzip_sibling
+    from staticsync import sync_static_files, transfer_file
+    from template import load_template
+    from textnode import _write_whole_page, render_source
+    from urls import UrlResolver
+except ImportError:
+    from .assets import write_headers_file
+    from .fswatch import make_watcher
+    from .manifest import remove_stale_output
+    from .precompress import Precompressor, remove_gzip_sibling
+    from .staticsync import sync_static_files, transfer_file
+    from .template import load_template
+    from .textnode import _write_whole_page, render_source
+    from .urls import UrlResolver
+
+
+def scan_tree(root, suffix=""):
+    """
+    Map the relative (forward-slash) path of every file under root that
+    ends with suffix to its (mtime_ns, size) pair.
+    """
+    found = {}
+    if not os.path.isdir(root):
+        return found
+    pending = [(root, "")]
+    while pending:
+        directory, prefix = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, f"{prefix}{entry.name}/"))
+                elif entry.name.endswith(suffix):
+                    stat = entry.stat()
+                    found[f"{prefix}{entry.name}"] = (stat.st_mtime_ns, stat.st_size)
+    return found
+
+
+def stat_key(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def page_output(source_key):
+    """Output path, relative to the destination directory, for a content path."""
+    directory, file = os.path.split(source_key)
+    return os.path.join(directory, file.replace('.md', '.html')).replace(os.sep, '/')
+
+
+class PageState:
+    """What a page was last rendered from, and its rendered title and body."""
+
+    __slots__ = ("stat", "title", "content")
+
+    def __init__(self, stat, title, content):
+        self.stat = stat
+        self.title = title
+        self.content = content
+
+
+class LiveSite:
+    """
+    In-memory state of a built site that can apply source changes cheaply.
+
+    Every page's parsed title and rendered body are kept, so a changed
+    markdown file only re-renders that page, and a changed template only
+    re-runs the template over the bodies it already has. Rendered blocks
+    are cached too, so within a changed page only the edited blocks are
+    parsed again. Static files are tracked by size and mtime and synced
+    one at a time. With precompress, every output it writes gets a fresh
+    gzip sibling, as in a full build.
+    With an AssetMap, static files are fingerprinted: a static change
+    re-syncs the tree, and when that changes the map every page is
+    rewritten to point at the new names.
+
+    The hash of every page it writes is kept too, so a change that
+    renders to the same bytes (a whitespace edit, a template change that
+    doesn't reach a page) doesn't even read the output back. Outputs are
+    assumed to change only through this site.
+
+    The build manifest is not rewritten on every change; the next full
+    build re-hashes sources and regenerates anything that differs.
+    """
+
+    def __init__(self, content_dir, static_dir, template_path, dest_dir, basepath="/", link_mode="copy",
+                 block_cache=None, parse_cache=None, precompress=False, assets=None):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.assets = assets
+        self.resolver = UrlResolver(basepath, assets)
+        self.link_mode = link_mode
+        self.template = None
+        self.template_stat = None
+        self.pages = {}
+        self.static_files = {}
+        self.block_cache = block_cache
+        self.parse_cache = parse_cache
+        self.precompress = precompress
+        self.output_hashes = {}
+
+    def load(self):
+        """Parse every page and snapshot the static tree; outputs are assumed current."""
+        self.template_stat = stat_key(self.template_path)
+        self.template = load_template(self.template_path, self.basepath, self.resolver)
+        for source_key, stat in sorted(scan_tree(self.content_dir, ".md").items()):
+            self.pages[source_key] = self.render_page(source_key, stat)
+        self.static_files = scan_tree(self.static_dir)
+
+    def render_page(self, source_key, stat):
+        title, content = render_source(os.path.join(self.content_dir, source_key), self.block_cache,
+                                       self.parse_cache)
+        # Kept basepath-independent, so a new asset map only needs a rewrite
+        return PageState(stat, title, content)
+
+    def write_page(self, source_key):
+        """Write a page's output; returns its path, or None if it already had these bytes."""
+        page = self.pages[source_key]
+        dest_path = os.path.join(self.dest_dir, page_output(source_key))
+        content = self.resolver.specialize(page.content)
+        html = self.template.render({'Title': page.title, 'Content': content})
+        digest = hashlib.blake2b(html.encode('utf-8'), digest_size=16).digest()
+        if self.output_hashes.get(dest_path) == digest:
+            return None
+        _write_whole_page(html, dest_path)
+        self.output_hashes[dest_path] = digest
+        return dest_path
+
+    def poll(self, changed_paths=None):
+        """
+        Check sources for changes and apply them.
+
+        changed_paths is the set of filesystem paths a watcher saw change;
+        only those are looked at. None means nothing is known and both
+        trees are rescanned.
+
+        Returns a list of human-readable descriptions of what was updated.
+        A page that fails to parse is reported and keeps its previous output.
+        """
+        if changed_paths is None:
+            content = scan_tree(self.content_dir, ".md")
+            static = scan_tree(self.static_dir)
+            template_stat = stat_key(self.template_path)
+        else:
+            content = dict(self.pages_stats())
+            static = dict(self.static_files)
+            template_stat = self.template_stat
+            for path in changed_paths:
+                if os.path.normpath(path) == os.path.normpath(self.template_path):
+                    template_stat = stat_key(self.template_path)
+                    continue
+                for root, tree, suffix in ((self.content_dir, content, ".md"), (self.static_dir, static, "")):
+                    rel_path = os.path.relpath(path, root).replace(os.sep, '/')
+                    if rel_path.startswith("../"):
+                        continue
+                    if os.path.isdir(path):
+                        # The watcher reports a new directory's files itself
+                        continue
+                    stat = stat_key(path)
+                    if stat is None:
+                        # A deleted or renamed directory takes everything under it
+                        prefix = f"{rel_path}/"
+                        for key in [k for k in tree if k == rel_path or k.startswith(prefix)]:
+                            del tree[key]
+                    elif rel_path.endswith(suffix):
+                        tree[rel_path] = stat
+        return self.apply(content, static, template_stat)
+
+    def pages_stats(self):
+        return ((source_key, page.stat) for source_key, page in self.pages.items())
+
+    def apply(self, content, static, template_stat):
+        """Bring outputs in line with the given content, static and template stats."""
+        changes = []
+        written = []
+
+        template_changed = template_stat != self.template_stat
+        rerender_reason = "template change"
+        if self.assets is not None and static != self.static_files:
+            # Fingerprinted names come from the whole static tree, so it is
+            # synced as one, before any page is written against the map
+            stats = sync_static_files(self.static_dir, self.dest_dir, link_mode=self.link_mode, fingerprint=True)
+            # The map's URLs are root-relative; the files are under dest_dir
+            written.extend(os.path.join(self.dest_dir, url.lstrip("/")) for url in stats.assets.urls.values())
+            changes.append(f"Synced static files ({stats.transferred} transferred, {stats.removed} removed)")
+            if stats.assets != self.assets:
+                self.assets = stats.assets
+                self.resolver = UrlResolver(self.basepath, self.assets)
+                write_headers_file(self.dest_dir, self.assets, self.basepath)
+                # Every page and the template may point at a renamed file
+                if not template_changed:
+                    rerender_reason = "asset change"
+                template_changed = True
+            self.static_files = static
+        if template_changed:
+            self.template_stat = template_stat
+            self.template = load_template(self.template_path, self.basepath, self.resolver)
+
+        for source_key, stat in sorted(content.items()):
+            page = self.pages.get(source_key)
+            if page is not None and page.stat == stat:
+                continue
+            try:
+                self.pages[source_key] = self.render_page(source_key, stat)
+            except (OSError, ValueError) as e:
+                changes.append(f"Failed to render {source_key}: {e}")
+                continue
+            if not template_changed:
+                written.append(self.write_page(source_key))
+            changes.append(f"Rebuilt page {source_key}")
+
+        for source_key in sorted(set(self.pages) - set(content)):
+            del self.pages[source_key]
+            self.output_hashes.pop(os.path.join(self.dest_dir, page_output(source_key)), None)
+            remove_stale_output(self.dest_dir, page_output(source_key))
+            changes.append(f"Removed page {source_key}")
+
+        if template_changed:
+            for source_key in sorted(self.pages):
+                written.append(self.write_page(source_key))
+            changes.append(f"Re-rendered {len(self.pages)} pages for {rerender_reason}")
+
+        for rel_path, stat in sorted(static.items()):
+            if self.static_files.get(rel_path) == stat:
+                continue
+            dest_path = os.path.join(self.dest_dir, rel_path)
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            transfer_file(os.path.join(self.static_dir, rel_path), dest_path, self.link_mode)
+            written.append(dest_path)
+            changes.append(f"Synced static file {rel_path}")
+        for rel_path in sorted(set(self.static_files) - set(static)):
+            remove_stale_output(self.dest_dir, rel_path)
+            changes.append(f"Removed static file {rel_path}")
+        self.static_files = static
+
+        written = [path for path in written if path is not None]
+        if self.precompress and written:
+            precompress = Precompressor()
+            for path in written:
+                precompress.submit(path)
+            precompress.close()
+        else:
+            for path in written:
+                remove_gzip_sibling(path)
+        return changes
+
+
+def watch(site, interval=0.1, watcher=None):
+    """
+    Apply and print source changes forever. Uses inotify where available,
+    so only changed paths are looked at; otherwise rescans every interval.
+    """
+    if watcher is None:
+        watcher = make_watcher([site.content_dir, site.static_dir], [site.template_path])
+    print(f"Watching {site.content_dir}, {site.static_dir} and {site.template_path} (Ctrl+C to stop)")
+    try:
+        while True:
+            changed_paths = watcher.wait(interval)
+            if changed_paths is not None and not changed_paths:
+                continue
+            start = time.perf_counter()
+            changes = site.poll(changed_paths)
+            if changes:
+                elapsed = (time.perf_counter() - start) * 1000
+                for change in changes:
+                    print(change)
+                print(f"Updated in {elapsed:.1f} ms")
+    except KeyboardInterrupt:
+        print("Stopped watching")
+    finally:
+        watcher.close()
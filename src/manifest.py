@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+
+try:
+    from precompress import gzip_path
+except ImportError:
+    from .precompress import gzip_path
+
+
+MANIFEST_FILENAME = ".boottracker-manifest.json"
+MANIFEST_FORMAT = 1
+
+
+def hash_file(path):
+    """Return the sha256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Persisted record of the inputs each generated page was built from.
+
+    The manifest lives next to the generated pages in the destination
+    directory. It stores the settings that affect every page (generator
+    version, template hash, basepath) and, per source file, the hash of
+    the markdown and the output path it was written to. It also lists the
+    static files synced into the directory, so files whose source was
+    deleted can be removed without touching anything else, and, when they
+    are fingerprinted, the name each static file was given. A sharded
+    build also records which shard it was and the whole tree it was cut
+    from, for merge to check against.
+    """
+
+    def __init__(self, path, settings=None, pages=None, static=None, assets=None, shard=None):
+        self.path = path
+        self.settings = settings or {}
+        self.pages = pages or {}
+        self.static = static or []
+        self.assets = assets or {}
+        self.shard = shard
+
+    @classmethod
+    def load(cls, path):
+        """Load a manifest, returning an empty one if it is missing or unreadable."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+
+        if data.get("format") != MANIFEST_FORMAT:
+            return cls(path)
+        return cls(path, data.get("settings"), data.get("pages"), data.get("static"), data.get("assets"),
+                   data.get("shard"))
+
+    def save(self):
+        """Write the manifest atomically so an interrupted build never leaves it truncated."""
+        data = {
+            "format": MANIFEST_FORMAT,
+            "settings": self.settings,
+            "pages": dict(sorted(self.pages.items())),
+            "static": sorted(self.static),
+            "assets": dict(sorted(self.assets.items())),
+        }
+        if self.shard is not None:
+            data["shard"] = self.shard
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        os.replace(tmp_path, self.path)
+
+    def is_page_current(self, source, source_hash, dest_path):
+        """Check whether a page was last built from the same source and its output still exists."""
+        entry = self.pages.get(source)
+        if entry is None or entry.get("source_hash") != source_hash:
+            return False
+        return os.path.exists(dest_path)
+
+
+class BuildStats:
+    """Counters reported at the end of a page generation run."""
+
+    def __init__(self):
+        self.rebuilt = 0
+        self.skipped = 0
+        self.removed = 0
+        # Rebuilt pages whose output came out identical and wasn't rewritten
+        self.unchanged = 0
+        # PipelineStats when the pages went through the I/O pipeline
+        self.pipeline = None
+        # Block cache lookups made while rendering the rebuilt pages
+        self.block_hits = 0
+        self.block_misses = 0
+
+    def __repr__(self):
+        return f"BuildStats(rebuilt={self.rebuilt}, skipped={self.skipped}, removed={self.removed})"
+
+    def summary(self):
+        return (
+            f"Pages: {self.rebuilt} rebuilt ({self.unchanged} unchanged), {self.skipped} skipped, "
+            f"{self.removed} removed"
+        )
+
+
+def remove_stale_output(dest_dir_path, output):
+    """
+    Remove a generated file whose source is gone, along with its gzip
+    sibling, then prune any directories left empty by the removal (never
+    the destination root).
+    """
+    dest_path = os.path.join(dest_dir_path, output)
+    for path in (dest_path, gzip_path(dest_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+    root = os.path.abspath(dest_dir_path)
+    parent = os.path.dirname(os.path.abspath(dest_path))
+    while parent != root and parent.startswith(root) and os.path.isdir(parent):
+        if os.listdir(parent):
+            break
+        os.rmdir(parent)
+        parent = os.path.dirname(parent)
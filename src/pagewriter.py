@@ -0,0 +1,69 @@
+import os
+
+
+class PageWriter:
+    """
+    File-like sink for one generated page that only touches the disk when
+    the page actually changed.
+
+    Written text is compared against the existing output as it streams in,
+    so an identical page is never written and keeps its mtime. At the
+    first difference the page switches to a temporary file next to the
+    output (starting with the bytes that matched so far), which commit()
+    moves into place with os.replace, so a web server reading the output
+    sees either the old page or the new one, never a partial one.
+    """
+
+    def __init__(self, dest_path):
+        self.dest_path = dest_path
+        self.tmp_path = os.path.join(os.path.dirname(dest_path), f".{os.path.basename(dest_path)}.tmp")
+        self.temp = None
+        self.matched = 0
+        try:
+            self.existing = open(dest_path, 'rb')
+        except (FileNotFoundError, IsADirectoryError):
+            self.existing = None
+            self._start_temp()
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        if self.temp is None:
+            if self.existing.read(len(data)) == data:
+                self.matched += len(data)
+                return
+            self._start_temp()
+        self.temp.write(data)
+
+    def _start_temp(self):
+        dest_dir = os.path.dirname(self.dest_path)
+        if dest_dir and not os.path.exists(dest_dir):
+            os.makedirs(dest_dir)
+        self.temp = open(self.tmp_path, 'wb')
+        if self.existing is not None:
+            # Carry over the prefix that matched before the first difference
+            self.existing.seek(0)
+            self.temp.write(self.existing.read(self.matched))
+            self.existing.close()
+            self.existing = None
+
+    def commit(self):
+        """Finish the page. Returns True if the output was (re)written."""
+        if self.temp is None:
+            if not self.existing.read(1):
+                self.existing.close()
+                return False
+            # The new page is a strict prefix of the old one
+            self._start_temp()
+        self.temp.close()
+        os.replace(self.tmp_path, self.dest_path)
+        return True
+
+    def abort(self):
+        """Drop the page, leaving any existing output untouched."""
+        if self.existing is not None:
+            self.existing.close()
+        if self.temp is not None:
+            self.temp.close()
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
@@ -0,0 +1,206 @@
+import os
+import shutil
+import tempfile
+import zlib
+
+
+PARSE_CACHE_DIR = ".boottracker-cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+ENTRY_SUFFIX = ".z"
+
+
+class ParseCacheWriter:
+    """
+    Streams one page's rendered body into a compressed temporary file,
+    which commit() atomically moves into place. Without a cache to count
+    into, the write isn't added to any counters.
+    """
+
+    def __init__(self, cache, entry_path, title):
+        self.cache = cache
+        self.entry_path = entry_path
+        self.compressor = zlib.compressobj(6)
+        self.failed = False
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), suffix=".tmp")
+        self.file = os.fdopen(fd, 'wb')
+        self.write(f"{title}\n")
+
+    def write(self, chunk):
+        if self.failed:
+            return
+        try:
+            self.file.write(self.compressor.compress(chunk.encode('utf-8')))
+        except OSError:
+            # A full disk or a concurrent "cache clear" only loses this entry
+            self.failed = True
+
+    def commit(self):
+        """Move the entry into place; returns False if it couldn't be written."""
+        if self.failed:
+            self.abort()
+            return False
+        try:
+            self.file.write(self.compressor.flush())
+            self.file.close()
+            # Another build may be writing the same entry; either copy is complete
+            os.replace(self.temp_path, self.entry_path)
+        except OSError:
+            self.abort()
+            return False
+        if self.cache is not None:
+            self.cache.writes += 1
+        return True
+
+    def abort(self):
+        try:
+            self.file.close()
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+
+class ParseCache:
+    """
+    On-disk cache of rendered page bodies, shared by every build that uses
+    the same cache directory.
+
+    Entries are keyed by the source file's sha256 and the generator
+    version, and hold the page title and body HTML with its root-relative
+    URLs still marked (see urls.DeferredResolver), so a template or
+    basepath change still hits. Each entry is written to a temporary file
+    and renamed into place, so concurrent builds never see a partial
+    entry. A damaged or missing entry is just a miss: the cache never
+    fails a build.
+    """
+
+    def __init__(self, path=PARSE_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, version=None):
+        if version is None:
+            try:
+                from textnode import GENERATOR_VERSION
+            except ImportError:
+                from .textnode import GENERATOR_VERSION
+            version = GENERATOR_VERSION
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @property
+    def version_dir(self):
+        return os.path.join(self.path, f"v{self.version}")
+
+    def entry_path(self, source_hash):
+        return os.path.join(self.version_dir, source_hash[:2], source_hash + ENTRY_SUFFIX)
+
+    def get(self, source_hash):
+        """Return the cached (title, body) for a source hash, or None."""
+        entry = self.lookup(source_hash)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def lookup(self, source_hash):
+        """
+        get() without touching the counters, so it can run on I/O threads;
+        the caller records the outcome with add_counters.
+        """
+        entry_path = self.entry_path(source_hash)
+        try:
+            with open(entry_path, 'rb') as f:
+                data = zlib.decompress(f.read()).decode('utf-8')
+            # Record the use for least-recently-used pruning
+            os.utime(entry_path)
+        except (OSError, zlib.error, UnicodeDecodeError):
+            return None
+        title, separator, body = data.partition("\n")
+        if not separator:
+            return None
+        return title, body
+
+    def writer(self, source_hash, title):
+        """Start writing an entry; returns None if the cache can't be written."""
+        try:
+            return ParseCacheWriter(self, self.entry_path(source_hash), title)
+        except OSError:
+            return None
+
+    def store(self, source_hash, title, body):
+        """
+        Write a whole entry at once without touching the counters, like
+        lookup(). Returns True if the entry was written.
+        """
+        try:
+            writer = ParseCacheWriter(None, self.entry_path(source_hash), title)
+        except OSError:
+            return False
+        writer.write(body)
+        return writer.commit()
+
+    def counters(self):
+        return (self.hits, self.misses, self.writes)
+
+    def add_counters(self, counters):
+        hits, misses, writes = counters
+        self.hits += hits
+        self.misses += misses
+        self.writes += writes
+
+    def iter_entries(self):
+        """Yield (path, size, mtime) for every entry of every version."""
+        for root, dirs, files in os.walk(self.path):
+            for file in files:
+                path = os.path.join(root, file)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def prune(self):
+        """
+        Drop entries from other generator versions, then the least recently
+        used entries until the cache fits in max_bytes. Returns the number
+        of files removed.
+        """
+        removed = 0
+        if os.path.isdir(self.path):
+            for name in os.listdir(self.path):
+                if name != f"v{self.version}":
+                    shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+                    removed += 1
+
+        entries = sorted(self.iter_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def stats(self):
+        entries = 0
+        size = 0
+        for path, entry_size, _ in self.iter_entries():
+            if path.endswith(ENTRY_SUFFIX):
+                entries += 1
+            size += entry_size
+        return {"path": self.path, "entries": entries, "bytes": size, "max_bytes": self.max_bytes}
+
+    def __repr__(self):
+        return f"ParseCache(path={self.path!r}, version={self.version!r}, max_bytes={self.max_bytes})"
+
+    def summary(self):
+        return f"Parse cache: {self.hits} hits, {self.misses} misses, {self.writes} written"
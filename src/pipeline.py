@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+
+# Default number of threads for file reads and writes. The pipeline
+# hands whole pages between stages, so it is off unless asked for and
+# builds stream each page from its blocks straight to disk instead
+DEFAULT_IO_THREADS = 0
+# Default bound on the pages buffered between two stages
+DEFAULT_QUEUE_SIZE = 16
+
+
+class MeasuredQueue:
+    """
+    Bounded asyncio queue between two pipeline stages that records how
+    full it runs and how long each side spends blocked on the other.
+
+    put_stall is the time the producer waited because the queue was full
+    (the consumer is the bottleneck); get_stall is the time the consumer
+    waited because it was empty (the producer is the bottleneck).
+    """
+
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.queue = asyncio.Queue(maxsize)
+        self.puts = 0
+        self.depth_total = 0
+        self.max_depth = 0
+        self.put_stall = 0.0
+        self.get_stall = 0.0
+
+    async def put(self, item):
+        if self.queue.full():
+            start = time.perf_counter()
+            await self.queue.put(item)
+            self.put_stall += time.perf_counter() - start
+        else:
+            self.queue.put_nowait(item)
+        depth = self.queue.qsize()
+        self.puts += 1
+        self.depth_total += depth
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    async def get(self):
+        if self.queue.empty():
+            start = time.perf_counter()
+            item = await self.queue.get()
+            self.get_stall += time.perf_counter() - start
+            return item
+        return self.queue.get_nowait()
+
+    async def get_result(self):
+        """
+        Get the next item from a queue of in-flight work (futures) and wait
+        for its result. The work is this queue's producer, so waiting for
+        it to finish counts as get stall too.
+        """
+        future = await self.get()
+        if future is None or future.done():
+            return None if future is None else future.result()
+        start = time.perf_counter()
+        try:
+            return await future
+        finally:
+            self.get_stall += time.perf_counter() - start
+
+    def stats(self):
+        return {
+            "capacity": self.queue.maxsize,
+            "items": self.puts,
+            "mean_depth": self.depth_total / self.puts if self.puts else 0.0,
+            "max_depth": self.max_depth,
+            "put_stall": self.put_stall,
+            "get_stall": self.get_stall,
+        }
+
+
+class PipelineStats:
+    """Queue statistics of one pipelined build, for tuning the bounds."""
+
+    def __init__(self, queues, io_threads):
+        self.io_threads = io_threads
+        self.queues = {queue.name: queue.stats() for queue in queues}
+
+    def __repr__(self):
+        return f"PipelineStats(io_threads={self.io_threads}, queues={sorted(self.queues)})"
+
+    def report(self):
+        return {"io_threads": self.io_threads, "queues": self.queues}
+
+    def summary(self):
+        parts = [
+            f"{name} queue {stats['mean_depth']:.1f}/{stats['capacity']} avg, "
+            f"{stats['put_stall']:.2f}s full, {stats['get_stall']:.2f}s empty"
+            for name, stats in self.queues.items()
+        ]
+        return f"Pipeline: {'; '.join(parts)}"
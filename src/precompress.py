@@ -0,0 +1,168 @@
+import os
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+
+GZIP_SUFFIX = ".gz"
+# Text outputs worth serving precompressed; images are compressed already
+COMPRESSIBLE_SUFFIXES = (".html", ".css", ".js", ".svg", ".json", ".xml", ".txt")
+# Window bits that make zlib write a gzip header and trailer
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+DEFAULT_LEVEL = 9
+DEFAULT_THREADS = 2
+CHUNK_SIZE = 1024 * 1024
+
+
+def is_compressible(path):
+    return path.endswith(COMPRESSIBLE_SUFFIXES)
+
+
+def gzip_path(path):
+    return path + GZIP_SUFFIX
+
+
+def remove_gzip_sibling(path):
+    """
+    Drop path's .gz sibling, if any. Outputs rewritten without a
+    Precompressor do this so a server can't keep serving the old bytes
+    compressed.
+    """
+    try:
+        os.remove(gzip_path(path))
+    except FileNotFoundError:
+        pass
+
+
+def is_gzip_current(path, compressed_path):
+    """
+    Check whether the .gz sibling was compressed from path as it is now.
+
+    Each sibling is given the modification time of the file it was
+    compressed from. Pages whose bytes are unchanged are never rewritten
+    and static files keep their source's mtime, so an unchanged file
+    still matches.
+    """
+    try:
+        return os.stat(compressed_path).st_mtime_ns == os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def gzip_sibling(path, level=DEFAULT_LEVEL):
+    """
+    Write path + ".gz" next to path, unless it is already current.
+
+    The sibling is staged under a temporary name and moved into place with
+    os.replace, like every other output, so a server never picks up a
+    partial file. The gzip header carries no name or timestamp, so the
+    same input always gives the same bytes.
+
+    Returns:
+        (bytes read, bytes written), or None if the sibling was current
+    """
+    compressed_path = gzip_path(path)
+    if is_gzip_current(path, compressed_path):
+        return None
+    source_stat = os.stat(path)
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(compressed_path)}.tmp")
+    compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+    size_in = size_out = 0
+    try:
+        with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            while chunk := src.read(CHUNK_SIZE):
+                size_in += len(chunk)
+                data = compressor.compress(chunk)
+                size_out += len(data)
+                dst.write(data)
+            data = compressor.flush()
+            size_out += len(data)
+            dst.write(data)
+        os.utime(tmp_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        os.replace(tmp_path, compressed_path)
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return size_in, size_out
+
+
+class PrecompressStats:
+    """Counters reported once every submitted file has been compressed."""
+
+    def __init__(self):
+        self.compressed = 0
+        self.unchanged = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        # Seconds spent compressing, summed over the threads
+        self.seconds = 0.0
+        # Seconds the build waited for compression after everything else was done
+        self.wait = 0.0
+
+    def __repr__(self):
+        return (
+            f"PrecompressStats(compressed={self.compressed}, unchanged={self.unchanged}, "
+            f"bytes_in={self.bytes_in}, bytes_out={self.bytes_out})"
+        )
+
+    @property
+    def ratio(self):
+        """Compressed size as a fraction of the original, over the files compressed."""
+        return self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+
+    def summary(self):
+        return (
+            f"Precompressed: {self.compressed} gzipped ({self.bytes_in} -> {self.bytes_out} bytes, "
+            f"{self.ratio:.1%} of original), {self.unchanged} unchanged, "
+            f"{self.seconds:.2f}s compressing, {self.wait:.2f}s waited"
+        )
+
+
+class Precompressor:
+    """
+    Writes gzip siblings for outputs in background threads while the rest
+    of the build carries on. zlib releases the GIL while it compresses, so
+    the threads run alongside page rendering.
+
+    Files are submitted as soon as they are final; files that aren't
+    compressible are ignored. close() waits for the rest and returns the
+    PrecompressStats.
+    """
+
+    def __init__(self, threads=DEFAULT_THREADS, level=DEFAULT_LEVEL):
+        self.level = level
+        self.executor = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="precompress")
+        self.futures = []
+
+    def submit(self, path):
+        if is_compressible(path):
+            self.futures.append(self.executor.submit(self._compress, path))
+
+    def _compress(self, path):
+        start = time.perf_counter()
+        result = gzip_sibling(path, self.level)
+        return result, time.perf_counter() - start
+
+    def close(self):
+        """Wait for every submitted file; raises the first error any of them hit."""
+        stats = PrecompressStats()
+        start = time.perf_counter()
+        try:
+            for future in self.futures:
+                result, seconds = future.result()
+                stats.seconds += seconds
+                if result is None:
+                    stats.unchanged += 1
+                else:
+                    stats.compressed += 1
+                    stats.bytes_in += result[0]
+                    stats.bytes_out += result[1]
+        finally:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        stats.wait = time.perf_counter() - start
+        return stats
+
+    def abort(self):
+        """Drop whatever hasn't started; used when the build fails."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,279 @@
+import hashlib
+import heapq
+import json
+import os
+import re
+import statistics
+
+try:
+    from assets import HEADERS_FILENAME
+    from manifest import BuildManifest, MANIFEST_FILENAME
+    from precompress import gzip_path
+    from staticsync import transfer_file
+except ImportError:
+    from .assets import HEADERS_FILENAME
+    from .manifest import BuildManifest, MANIFEST_FILENAME
+    from .precompress import gzip_path
+    from .staticsync import transfer_file
+
+
+SHARD_DIR_PATTERN = re.compile(r"\.shard-(\d+)-of-(\d+)$")
+# Names of the pages merge lists when some are missing
+MISSING_LISTED = 20
+
+
+def shard_dir(public_dir, index, count):
+    """Where shard index of count builds: docs -> docs.shard-2-of-4."""
+    return f"{public_dir}.shard-{index}-of-{count}"
+
+
+def path_hash(source_key):
+    """A hash of a source path that is the same on every machine and Python run."""
+    return int.from_bytes(hashlib.sha256(source_key.encode('utf-8')).digest()[:8], 'big')
+
+
+def iter_source_keys(dir_path_content):
+    """The relative (forward-slash) path of every markdown file under the content directory."""
+    for root, dirs, files in os.walk(dir_path_content):
+        for file in files:
+            if file.endswith('.md'):
+                yield os.path.relpath(os.path.join(root, file), dir_path_content).replace(os.sep, '/')
+
+
+def sources_digest(source_keys):
+    """Hash of the whole set of source paths, so shards can check they were cut from the same tree."""
+    digest = hashlib.sha256()
+    for source_key in sorted(source_keys):
+        digest.update(source_key.encode('utf-8'))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def load_page_weights(report_path, dir_path_content):
+    """
+    Per-page build seconds from a --timings report, keyed by source path
+    relative to the content directory.
+    """
+    with open(report_path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    return {
+        os.path.relpath(page["source"], dir_path_content).replace(os.sep, '/'): page["total"]
+        for page in report.get("pages", [])
+    }
+
+
+def balance(source_keys, count, weights):
+    """
+    Split pages over count shards so each gets about the same total
+    weight: heaviest pages first, each to the shard with the least so far
+    (ties to the lowest index). Pages without a weight count as the median
+    page. The same inputs give the same split on every machine.
+
+    Returns:
+        {source key: 0-based shard}
+    """
+    known = [weights[key] for key in source_keys if key in weights]
+    default = statistics.median(known) if known else 1.0
+    order = sorted(source_keys, key=lambda key: (-weights.get(key, default), path_hash(key), key))
+    loads = [(0.0, index) for index in range(count)]
+    assignment = {}
+    for key in order:
+        load, index = heapq.heappop(loads)
+        assignment[key] = index
+        heapq.heappush(loads, (load + weights.get(key, default), index))
+    return assignment
+
+
+class Shard:
+    """
+    One of count deterministic slices of the content tree; index is
+    1-based, as in --shard 2/4.
+
+    A page belongs to the shard its path hash picks, so every machine
+    agrees on the split without talking to the others, and adding a page
+    never moves the rest. With weights (each page's seconds from an
+    earlier build's timings), pages are balanced by build time instead;
+    every shard must then be given the same weights.
+    """
+
+    __slots__ = ("index", "count", "weights", "owned")
+
+    def __init__(self, index, count, weights=None):
+        if not 1 <= index <= count:
+            raise ValueError(f"shard {index}/{count} is out of range")
+        self.index = index
+        self.count = count
+        self.weights = weights
+        self.owned = None
+
+    @classmethod
+    def parse(cls, value):
+        """Parse "i/n"; raises ValueError."""
+        index, sep, count = value.partition("/")
+        if not sep or not index.isdigit() or not count.isdigit():
+            raise ValueError(f"expected i/n, got {value!r}")
+        return cls(int(index), int(count))
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
+
+    def __repr__(self):
+        return f"Shard({self.index}, {self.count}, balanced={self.weights is not None})"
+
+    def plan(self, source_keys):
+        """Settle which of the tree's pages are this shard's; returns its manifest record."""
+        if self.weights is not None:
+            assignment = balance(source_keys, self.count, self.weights)
+            self.owned = {key for key, index in assignment.items() if index == self.index - 1}
+        return {
+            "index": self.index,
+            "count": self.count,
+            "balanced": self.weights is not None,
+            "sources": len(source_keys),
+            "sources_digest": sources_digest(source_keys),
+        }
+
+    def owns(self, source_key):
+        if self.owned is not None:
+            return source_key in self.owned
+        return path_hash(source_key) % self.count == self.index - 1
+
+
+class MergeError(Exception):
+    """Shard outputs that can't be merged into one site; problems lists why."""
+
+    def __init__(self, problems):
+        self.problems = problems
+        super().__init__(f"{len(problems)} problem{'s' if len(problems) != 1 else ''} merging shards")
+
+    def __str__(self):
+        return "\n".join([super().__str__()] + [f"  {problem}" for problem in self.problems])
+
+
+def find_shard_dirs(public_dir):
+    """The docs.shard-i-of-n directories next to public_dir."""
+    parent = os.path.dirname(public_dir) or "."
+    prefix = os.path.basename(public_dir)
+    return sorted(
+        os.path.join(os.path.dirname(public_dir), name)
+        for name in os.listdir(parent)
+        if name.startswith(prefix) and SHARD_DIR_PATTERN.fullmatch(name[len(prefix):])
+        and os.path.isdir(os.path.join(parent, name))
+    )
+
+
+def check_shards(shard_dirs, dir_path_content=None):
+    """
+    Load every shard's manifest and check that together they are exactly
+    one build: the same settings, static files and source tree, every
+    shard index present once, and every page built by exactly one shard.
+
+    Returns:
+        The manifests, ordered by shard index
+
+    Raises:
+        MergeError: listing everything that is wrong
+    """
+    problems = []
+    manifests = []
+    for directory in shard_dirs:
+        manifest = BuildManifest.load(os.path.join(directory, MANIFEST_FILENAME))
+        if manifest.shard is None:
+            problems.append(f"{directory} is not a shard build (build it with --shard i/n)")
+        else:
+            manifests.append((directory, manifest))
+    if not manifests:
+        raise MergeError(problems or ["no shard directories given"])
+    manifests.sort(key=lambda item: item[1].shard["index"])
+
+    first_dir, first = manifests[0]
+    count = first.shard["count"]
+    seen = {}
+    for directory, manifest in manifests:
+        shard = manifest.shard
+        label = f"{directory} (shard {shard['index']}/{shard['count']})"
+        if shard["count"] != count:
+            problems.append(f"{label} is from a {shard['count']}-way split, {first_dir} from a {count}-way one")
+        if shard["index"] in seen:
+            problems.append(f"{label} and {seen[shard['index']]} are the same shard")
+        seen.setdefault(shard["index"], directory)
+        if shard["sources_digest"] != first.shard["sources_digest"]:
+            problems.append(f"{label} was built from a different content tree than {first_dir}")
+        if manifest.settings != first.settings:
+            problems.append(f"{label} was built with different settings than {first_dir}")
+        if manifest.static != first.static or manifest.assets != first.assets:
+            problems.append(f"{label} synced different static files than {first_dir}")
+    for index in range(1, count + 1):
+        if index not in seen:
+            problems.append(f"shard {index}/{count} is missing")
+
+    owners = {}
+    outputs = {}
+    for directory, manifest in manifests:
+        for source_key, entry in sorted(manifest.pages.items()):
+            if source_key in owners:
+                problems.append(f"{source_key} was built twice, by {owners[source_key]} and {directory}")
+                continue
+            owners[source_key] = directory
+            output = entry["output"]
+            if output in outputs:
+                problems.append(f"{output} was produced twice, from {outputs[output]} and {source_key}")
+            outputs[output] = source_key
+            if not os.path.isfile(os.path.join(directory, output)):
+                problems.append(f"{directory} lists {output} but doesn't have it")
+
+    if sources_digest(owners) != first.shard["sources_digest"]:
+        missing = first.shard["sources"] - len(owners)
+        if dir_path_content is not None and os.path.isdir(dir_path_content):
+            names = sorted(set(iter_source_keys(dir_path_content)) - set(owners))
+            listed = ", ".join(names[:MISSING_LISTED]) + (", ..." if len(names) > MISSING_LISTED else "")
+            problems.append(f"{max(missing, len(names))} pages were built by no shard: {listed}")
+        else:
+            problems.append(f"the shards' pages don't add up to the {first.shard['sources']}-page tree "
+                            f"they were cut from ({missing} missing)")
+    if problems:
+        raise MergeError(problems)
+    return [manifest for _, manifest in manifests]
+
+
+def merge_shards(shard_dirs, dest_dir, link_mode="copy", dir_path_content=None):
+    """
+    Combine shard output directories into dest_dir, after check_shards
+    has found them to be exactly one build. Pages (and their gzip
+    siblings) come from the shard that built them; static files, which
+    every shard syncs, come from the first. dest_dir gets a manifest for
+    the whole site, so the next unsharded build can be incremental.
+
+    Returns:
+        (pages merged, static files merged)
+
+    Raises:
+        MergeError: if the shards don't form one complete build
+    """
+    manifests = check_shards(shard_dirs, dir_path_content)
+    first = manifests[0]
+    first_dir = os.path.dirname(first.path)
+
+    def transfer(source_dir, output):
+        for rel_path in (output, gzip_path(output)):
+            source_path = os.path.join(source_dir, rel_path)
+            if os.path.exists(source_path):
+                dest_path = os.path.join(dest_dir, rel_path)
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                transfer_file(source_path, dest_path, link_mode)
+
+    for output in first.static:
+        transfer(first_dir, output)
+    # Written by fingerprinted builds rather than synced
+    if HEADERS_FILENAME not in first.static and os.path.exists(os.path.join(first_dir, HEADERS_FILENAME)):
+        transfer(first_dir, HEADERS_FILENAME)
+    pages = {}
+    for manifest in manifests:
+        for source_key, entry in manifest.pages.items():
+            transfer(os.path.dirname(manifest.path), entry["output"])
+            pages[source_key] = entry
+
+    merged = BuildManifest(os.path.join(dest_dir, MANIFEST_FILENAME), first.settings, pages, first.static,
+                           first.assets)
+    merged.save()
+    return len(pages), len(first.static)
@@ -0,0 +1,68 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from textnode import generate_pages_recursive
+
+
+class SiteTestCase(unittest.TestCase):
+    """
+    Base for tests that build a site in a temporary directory. The paths
+    of the content and static trees, the template and the output dir are
+    set up, but nothing exists until a test writes it.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.template = os.path.join(self.root, "template.html")
+        self.dest = os.path.join(self.root, "docs")
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def edit(self, path, text):
+        """Write, then move the mtime on so the change shows even on coarse-mtime filesystems."""
+        self.write(path, text)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    def read(self, *parts):
+        """The text of a file under the output dir (or at an absolute path)."""
+        with open(os.path.join(self.dest, *parts), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def quietly(self):
+        return redirect_stdout(io.StringIO())
+
+    def build(self, dest=None, basepath="/", **kwargs):
+        """Generate the pages into dest (the output dir by default) and return the build stats."""
+        with self.quietly():
+            return generate_pages_recursive(self.content, self.template, dest or self.dest, basepath,
+                                            **kwargs)
+
+    def files(self, dest=None):
+        """Sorted '/'-separated paths of the files under dest, skipping dotfiles like the manifest."""
+        dest = dest or self.dest
+        return sorted(
+            os.path.relpath(os.path.join(root, file), dest).replace(os.sep, '/')
+            for root, dirs, files in os.walk(dest)
+            for file in files if not file.startswith(".")
+        )
+
+    def outputs(self, dest=None, suffix=".html"):
+        """The bytes of each file under dest ending with suffix, by path."""
+        dest = dest or self.dest
+        outputs = {}
+        for name in self.files(dest):
+            if name.endswith(suffix):
+                with open(os.path.join(dest, name), 'rb') as f:
+                    outputs[name] = f.read()
+        return outputs
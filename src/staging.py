@@ -0,0 +1,146 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+
+# From <fcntl.h> and <linux/fs.h>
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+
+STAGING_SUFFIX = ".next"
+PREVIOUS_SUFFIX = ".prev"
+TRASH_PREFIX = ".boottracker-trash-"
+
+
+def _load_renameat2():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        return libc.renameat2
+    except (OSError, AttributeError):
+        return None
+
+
+_renameat2 = _load_renameat2()
+
+
+def exchange_paths(first, second):
+    """
+    Swap two directories. With renameat2(RENAME_EXCHANGE) this is a single
+    atomic step, so both paths exist at every moment; where the kernel or
+    filesystem can't exchange, it falls back to three renames, which
+    leave first missing for an instant.
+    """
+    if _renameat2 is not None:
+        result = _renameat2(AT_FDCWD, os.fsencode(first), AT_FDCWD, os.fsencode(second), RENAME_EXCHANGE)
+        if result == 0:
+            return
+        error = ctypes.get_errno()
+        if error not in (errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP):
+            raise OSError(error, os.strerror(error), first, None, second)
+
+    parent = os.path.dirname(os.path.abspath(first))
+    holding = tempfile.mkdtemp(prefix=TRASH_PREFIX, dir=parent)
+    swap_path = os.path.join(holding, "swap")
+    os.rename(first, swap_path)
+    os.rename(second, first)
+    os.rename(swap_path, second)
+    os.rmdir(holding)
+
+
+def remove_tree_in_background(path):
+    """
+    Move a directory out of the way and delete it in a detached process,
+    so a large tree doesn't add to the build's wall-clock time. Returns
+    the Popen (or None if there was nothing to remove).
+    """
+    if not os.path.lexists(path):
+        return None
+    parent = os.path.dirname(os.path.abspath(path))
+    trash = tempfile.mkdtemp(prefix=TRASH_PREFIX, dir=parent)
+    os.rename(path, os.path.join(trash, "tree"))
+    return _spawn_remover(trash)
+
+
+def _spawn_remover(trash):
+    return subprocess.Popen(
+        [sys.executable, "-c", "import shutil, sys; shutil.rmtree(sys.argv[1], ignore_errors=True)", trash],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+class StagedOutput:
+    """
+    Output directory built in a staging tree that is swapped in as
+    public_dir only once the build succeeds, so the live site is never
+    missing or half built. The tree it replaces is kept as
+    public_dir + ".prev" for an instant rollback, and the rollback copy
+    before that is deleted in the background.
+
+    The staging tree starts as a hard-linked clone of the live tree, so
+    builds stay incremental without copying any file data. Every output
+    is written to a temporary file and renamed into place, so files
+    shared by hard links are never modified in place. A failed build's
+    staging tree is thrown away by the next build, which clones the live
+    tree again: the pages it wrote are newer than the manifest beside
+    them, so nothing in it can be trusted to be current.
+    """
+
+    def __init__(self, public_dir):
+        self.public_dir = public_dir
+        self.staging_dir = public_dir + STAGING_SUFFIX
+        self.previous_dir = public_dir + PREVIOUS_SUFFIX
+        self.removers = []
+
+    def prepare(self, clean=False):
+        """Set up the staging directory and return its path."""
+        self._remove_leftover_trash()
+        # Left by a build that failed part way
+        self._discard(self.staging_dir)
+        if not clean and os.path.isdir(self.public_dir):
+            shutil.copytree(self.public_dir, self.staging_dir, symlinks=True, copy_function=os.link)
+        os.makedirs(self.staging_dir, exist_ok=True)
+        return self.staging_dir
+
+    def publish(self):
+        """
+        Swap the finished staging tree in; the live tree becomes the
+        rollback copy. Returns False when there was no live tree to keep.
+        """
+        if os.path.isdir(self.public_dir):
+            exchange_paths(self.public_dir, self.staging_dir)
+            if os.path.lexists(self.previous_dir):
+                self._discard(self.previous_dir)
+            os.rename(self.staging_dir, self.previous_dir)
+            return True
+        os.rename(self.staging_dir, self.public_dir)
+        return False
+
+    def rollback(self):
+        """Swap the previous build back in. Running it again undoes the rollback."""
+        if not os.path.isdir(self.previous_dir):
+            raise FileNotFoundError(f"No previous build to roll back to: {self.previous_dir}")
+        exchange_paths(self.public_dir, self.previous_dir)
+
+    def wait(self):
+        """Wait for background deletions; only tests and tools that need a tidy tree call this."""
+        for remover in self.removers:
+            remover.wait()
+        self.removers = []
+
+    def _discard(self, path):
+        remover = remove_tree_in_background(path)
+        if remover is not None:
+            self.removers.append(remover)
+
+    def _remove_leftover_trash(self):
+        # Trees whose removal was interrupted, e.g. by a reboot
+        parent = os.path.dirname(os.path.abspath(self.public_dir))
+        for name in os.listdir(parent):
+            if name.startswith(TRASH_PREFIX):
+                self.removers.append(_spawn_remover(os.path.join(parent, name)))
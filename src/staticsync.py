@@ -0,0 +1,200 @@
+import os
+import shutil
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows; reflink mode then falls back to copying
+    fcntl = None
+
+try:
+    from assets import AssetMap, fingerprinted_name
+    from manifest import BuildManifest, MANIFEST_FILENAME, hash_file, remove_stale_output
+    from precompress import remove_gzip_sibling
+except ImportError:
+    from .assets import AssetMap, fingerprinted_name
+    from .manifest import BuildManifest, MANIFEST_FILENAME, hash_file, remove_stale_output
+    from .precompress import remove_gzip_sibling
+
+
+LINK_MODES = ("copy", "hardlink", "reflink")
+
+# ioctl request number for cloning a whole file on Linux (btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+
+class SyncStats:
+    """Counters reported at the end of a static file sync."""
+
+    def __init__(self):
+        self.transferred = 0
+        self.transferred_bytes = 0
+        self.unchanged = 0
+        self.removed = 0
+        # AssetMap of the fingerprinted names, when files are fingerprinted
+        self.assets = None
+
+    def __repr__(self):
+        return (
+            f"SyncStats(transferred={self.transferred}, transferred_bytes={self.transferred_bytes}, "
+            f"unchanged={self.unchanged}, removed={self.removed})"
+        )
+
+    def summary(self):
+        summary = (
+            f"Static files: {self.transferred} transferred ({self.transferred_bytes} bytes), "
+            f"{self.unchanged} unchanged, {self.removed} removed"
+        )
+        if self.assets is not None:
+            summary += f", {len(self.assets)} fingerprinted"
+        return summary
+
+
+def is_file_current(source_path, dest_path, checksum=False):
+    """
+    Check whether dest_path already holds the same file as source_path.
+
+    Files are compared by size and modification time, which copies made by
+    this module preserve. With checksum=True the contents are hashed
+    instead of trusting the modification time.
+    """
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    source_stat = os.stat(source_path)
+    if source_stat.st_size != dest_stat.st_size:
+        return False
+    if checksum:
+        return hash_file(source_path) == hash_file(dest_path)
+    return source_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+
+def fingerprint_static_file(source_path, rel_path, previous=None, checksum=False):
+    """
+    Manifest entry naming the fingerprinted output of a static file.
+
+    The content hash of a file whose size and modification time match the
+    previous entry is reused rather than computed again; with
+    checksum=True every file is hashed.
+    """
+    source_stat = os.stat(source_path)
+    if (previous is not None and not checksum and previous.get("size") == source_stat.st_size
+            and previous.get("mtime_ns") == source_stat.st_mtime_ns):
+        return previous
+    return {
+        "size": source_stat.st_size,
+        "mtime_ns": source_stat.st_mtime_ns,
+        "output": fingerprinted_name(rel_path, hash_file(source_path)),
+    }
+
+
+def _reflink(source_path, dest_path):
+    if fcntl is None:
+        raise OSError("reflink is not supported on this platform")
+    with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copystat(source_path, dest_path)
+
+
+def transfer_file(source_path, dest_path, link_mode="copy"):
+    """
+    Put a copy (or hard link / reflink) of source_path at dest_path.
+
+    The file is staged under a temporary name and moved into place with
+    os.replace, so readers never see a partial file and an existing
+    destination that shares an inode with something else is never
+    written through. Link modes fall back to a plain copy when the
+    filesystem can't link or clone.
+    """
+    tmp_path = os.path.join(os.path.dirname(dest_path), f".{os.path.basename(dest_path)}.tmp")
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+
+    try:
+        if link_mode == "hardlink":
+            os.link(source_path, tmp_path)
+        elif link_mode == "reflink":
+            _reflink(source_path, tmp_path)
+        else:
+            shutil.copy2(source_path, tmp_path)
+    except OSError:
+        if link_mode == "copy":
+            raise
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        shutil.copy2(source_path, tmp_path)
+
+    os.replace(tmp_path, dest_path)
+
+
+def sync_static_files(static_dir, public_dir, checksum=False, link_mode="copy", precompress=None,
+                      fingerprint=False):
+    """
+    Bring public_dir's copy of the static tree up to date with static_dir.
+
+    Only new or changed files are transferred, and files synced by a
+    previous run whose source has since been deleted are removed. The list
+    of synced files is kept in the build manifest so generated pages in
+    public_dir are never mistaken for stale static files. With a
+    Precompressor, every synced file is handed to it for a gzip sibling;
+    without one, a transferred file loses any sibling it had.
+
+    With fingerprint=True each file is written as name.<contenthash>.ext
+    instead, so its URL changes whenever its contents do, and the returned
+    stats carry the AssetMap for resolving URLs to the new names. A file
+    left behind under an old fingerprint is removed like any stale file.
+
+    Returns:
+        SyncStats with the files and bytes transferred
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Invalid link mode: {link_mode}")
+
+    stats = SyncStats()
+    os.makedirs(public_dir, exist_ok=True)
+    manifest = BuildManifest.load(os.path.join(public_dir, MANIFEST_FILENAME))
+    synced = []
+    fingerprints = {}
+
+    for root, dirs, files in os.walk(static_dir):
+        dirs.sort()
+        rel_dir = os.path.relpath(root, static_dir)
+        dest_subdir = os.path.normpath(os.path.join(public_dir, rel_dir))
+        os.makedirs(dest_subdir, exist_ok=True)
+
+        for file in sorted(files):
+            source_path = os.path.join(root, file)
+            output = os.path.relpath(source_path, static_dir).replace(os.sep, '/')
+            if fingerprint:
+                entry = fingerprint_static_file(source_path, output, manifest.assets.get(output), checksum)
+                fingerprints[output] = entry
+                output = entry["output"]
+            dest_path = os.path.join(public_dir, output)
+            synced.append(output)
+
+            if is_file_current(source_path, dest_path, checksum):
+                stats.unchanged += 1
+            else:
+                transfer_file(source_path, dest_path, link_mode)
+                print(f"Copied file: {source_path} -> {dest_path}")
+                stats.transferred += 1
+                stats.transferred_bytes += os.path.getsize(source_path)
+                if precompress is None:
+                    remove_gzip_sibling(dest_path)
+            if precompress is not None:
+                precompress.submit(dest_path)
+
+    current = set(synced)
+    for output in manifest.static:
+        if output not in current:
+            print(f"Removing stale static file {output}")
+            remove_stale_output(public_dir, output)
+            stats.removed += 1
+
+    manifest.static = synced
+    manifest.assets = fingerprints
+    manifest.save()
+    if fingerprint:
+        stats.assets = AssetMap.from_outputs({source: entry["output"] for source, entry in fingerprints.items()})
+    return stats
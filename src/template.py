@@ -0,0 +1,76 @@
+import re
+
+try:
+    from urls import UrlResolver
+except ImportError:
+    from .urls import UrlResolver
+
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+URL_ATTRIBUTE_PATTERN = re.compile(r'(?<![\w-])((?:href|src)=")([^"]*)"')
+
+
+def resolve_attribute_urls(html, resolver):
+    """Resolve the URL of every href/src attribute, for the basepath and fingerprinted assets."""
+    return URL_ATTRIBUTE_PATTERN.sub(lambda match: f'{match.group(1)}{resolver.resolve(match.group(2))}"', html)
+
+
+class Template:
+    """
+    A page template compiled into static segments and placeholder slots.
+
+    The template text is scanned once: everything between placeholders
+    such as {{ Title }} becomes a pre-built segment (with the template's
+    own URLs already resolved for the basepath and any fingerprinted
+    assets), so rendering a page is a single pass over the segments.
+    """
+
+    def __init__(self, segments, slots):
+        # segments always has exactly one more entry than slots
+        self.segments = segments
+        self.slots = slots
+
+    @classmethod
+    def compile(cls, text, basepath="/", resolver=None):
+        if resolver is None:
+            resolver = UrlResolver(basepath)
+        segments = []
+        slots = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            segments.append(resolve_attribute_urls(text[position:match.start()], resolver))
+            slots.append(match.group(1))
+            position = match.end()
+        segments.append(resolve_attribute_urls(text[position:], resolver))
+        return cls(segments, slots)
+
+    def iter_render(self, values):
+        """
+        Yield the rendered page piece by piece. values maps a slot name to
+        either a string or an iterable of string chunks, which is streamed
+        through as-is. Placeholders without a value are left untouched.
+        """
+        yield self.segments[0]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            value = values.get(slot, f"{{{{ {slot} }}}}")
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+            yield segment
+
+    def render(self, values):
+        return "".join(self.iter_render(values))
+
+    def render_to(self, writer, values):
+        """Stream the rendered page into a file-like object with a write() method."""
+        for chunk in self.iter_render(values):
+            writer.write(chunk)
+
+    def __repr__(self):
+        return f"Template(slots: {self.slots})"
+
+
+def load_template(template_path, basepath="/", resolver=None):
+    with open(template_path, 'r', encoding='utf-8') as f:
+        return Template.compile(f.read(), basepath, resolver)
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+from assets import AssetMap, HEADERS_FILENAME, fingerprinted_name, render_headers_file, write_headers_file
+from sitetest import SiteTestCase
+from staticsync import sync_static_files
+
+HASH = "0123456789abcdef"
+
+
+class TestAssetMap(unittest.TestCase):
+    def test_fingerprinted_name(self):
+        self.assertEqual(fingerprinted_name("images/a.png", HASH), "images/a.0123456789ab.png")
+        self.assertEqual(fingerprinted_name("archive.tar.gz", HASH), "archive.tar.0123456789ab.gz")
+        self.assertEqual(fingerprinted_name("LICENSE", HASH), "LICENSE.0123456789ab")
+
+    def test_from_outputs_maps_root_relative_urls(self):
+        assets = AssetMap.from_outputs({"index.css": "index.0123456789ab.css"})
+        self.assertEqual(assets.get("/index.css"), "/index.0123456789ab.css")
+        self.assertIsNone(assets.get("/other.css"))
+
+    def test_digest_follows_contents(self):
+        self.assertEqual(AssetMap({"/a": "/a.1"}).digest, AssetMap({"/a": "/a.1"}).digest)
+        self.assertNotEqual(AssetMap({"/a": "/a.1"}).digest, AssetMap({"/a": "/a.2"}).digest)
+
+    def test_headers_file_marks_fingerprinted_paths_immutable(self):
+        assets = AssetMap({"/index.css": "/index.1.css", "/a.png": "/a.2.png"})
+        self.assertEqual(
+            render_headers_file(assets, "/site/"),
+            "/site/a.2.png\n  Cache-Control: public, max-age=31536000, immutable\n"
+            "/site/index.1.css\n  Cache-Control: public, max-age=31536000, immutable\n",
+        )
+        self.assertEqual(render_headers_file(AssetMap()), "")
+
+    def test_unchanged_headers_file_is_not_rewritten(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            assets = AssetMap({"/index.css": "/index.1.css"})
+            self.assertTrue(write_headers_file(tmp, assets))
+            self.assertFalse(write_headers_file(tmp, assets))
+            self.assertTrue(os.path.exists(os.path.join(tmp, HEADERS_FILENAME)))
+
+
+class TestFingerprintedBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.template, '<link href="/index.css">{{ Content }}')
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n![logo](/images/logo.png) [css](/index.css?v=1)")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "logo.png"), "png-bytes")
+
+    def build(self):
+        with self.quietly():
+            static = sync_static_files(self.static, self.dest, fingerprint=True)
+        return static, super().build(basepath="/site/", assets=static.assets)
+
+    def test_static_files_get_fingerprinted_names(self):
+        static, _ = self.build()
+        css = static.assets.get("/index.css")
+        logo = static.assets.get("/images/logo.png")
+        self.assertRegex(css, r"^/index\.[0-9a-f]{12}\.css$")
+        self.assertEqual(self.files(), sorted(["index.html", css[1:], logo[1:]]))
+        self.assertEqual(self.read(css[1:]), "body {}")
+
+    def test_template_and_markdown_urls_resolve_through_the_map(self):
+        static, _ = self.build()
+        css = static.assets.get("/index.css")
+        logo = static.assets.get("/images/logo.png")
+        self.assertEqual(
+            self.read("index.html"),
+            f'<link href="/site{css}"><div><h1>Home</h1>'
+            f'<p><img src="/site{logo}" alt="logo"> <a href="/site{css}?v=1">css</a></p></div>',
+        )
+
+    def test_changed_asset_replaces_old_name_and_rebuilds_pages(self):
+        old, _ = self.build()
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        new, pages = self.build()
+        self.assertNotEqual(new.assets.get("/index.css"), old.assets.get("/index.css"))
+        self.assertEqual(new.removed, 1)
+        self.assertEqual(pages.rebuilt, 1)
+        self.assertIn(new.assets.get("/index.css"), self.read("index.html"))
+
+    def test_unchanged_assets_keep_pages_current(self):
+        self.build()
+        static, pages = self.build()
+        self.assertEqual((static.unchanged, pages.skipped), (2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
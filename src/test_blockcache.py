@@ -0,0 +1,122 @@
+import io
+import os
+import sys
+import unittest
+
+from blockcache import ENTRY_OVERHEAD, BlockCache, block_key
+from sitetest import SiteTestCase
+from textnode import BlockType, generate_pages_recursive, iter_markdown_html, markdown_to_html_node, render_block
+
+
+def entry_cost(html):
+    return sys.getsizeof(html) + ENTRY_OVERHEAD
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_get_and_put(self):
+        cache = BlockCache()
+        key = block_key("hello", BlockType.PARAGRAPH)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "<p>hello</p>")
+        self.assertEqual(cache.get(key), "<p>hello</p>")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_key_includes_block_type(self):
+        self.assertNotEqual(
+            block_key("# a", BlockType.HEADING),
+            block_key("# a", BlockType.PARAGRAPH),
+        )
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(max_bytes=entry_cost("<p>a</p>") * 2)
+        cache.put("a", "<p>a</p>")
+        cache.put("b", "<p>b</p>")
+        cache.get("a")
+        cache.put("c", "<p>c</p>")
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertEqual(cache.evictions, 1)
+        self.assertLessEqual(cache.size, cache.max_bytes)
+
+    def test_oversized_fragment_is_not_cached(self):
+        cache = BlockCache(max_bytes=10)
+        cache.put("a", "<p>too big for the budget</p>")
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size, 0)
+
+    def test_replacing_an_entry_keeps_size_accurate(self):
+        cache = BlockCache()
+        cache.put("a", "<p>a</p>")
+        cache.put("a", "<p>aaaa</p>")
+        self.assertEqual(cache.size, entry_cost("<p>aaaa</p>"))
+
+    def test_summary(self):
+        cache = BlockCache()
+        cache.get("missing")
+        self.assertEqual(cache.summary(), "Blocks: 0 cached, 1 rendered (0% hit rate), 0 evicted")
+
+    def test_size_function_and_label(self):
+        cache = BlockCache(max_bytes=10, size_of=len, label="Words")
+        cache.put("a", "abcd")
+        cache.put("b", "efghij")
+        cache.put("a", "ab")
+        self.assertEqual((list(cache.entries), cache.size), (["b", "a"], 8))
+        cache.put("c", "klm")
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertTrue(cache.summary().startswith("Words: "))
+
+
+class TestCachedRendering(unittest.TestCase):
+    def test_render_block_uses_cache(self):
+        cache = BlockCache()
+        first = render_block("Some **bold**", BlockType.PARAGRAPH, cache)
+        second = render_block("Some **bold**", BlockType.PARAGRAPH, cache)
+        self.assertEqual(first, "<p>Some <b>bold</b></p>")
+        self.assertEqual(second, first)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_edit_rerenders_only_changed_block(self):
+        cache = BlockCache()
+        markdown = "# Title\n\nFirst paragraph\n\nSecond paragraph\n\n- a\n- b"
+        "".join(iter_markdown_html(io.StringIO(markdown), cache))
+        edited = markdown.replace("Second", "Edited")
+        html = "".join(iter_markdown_html(io.StringIO(edited), cache))
+        self.assertEqual(html, markdown_to_html_node(edited).to_html())
+        self.assertEqual((cache.hits, cache.misses), (3, 5))
+
+
+class TestBuildWithBlockCache(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(4):
+            self.write(os.path.join(self.content, f"page{i}.md"), f"# Page {i}\n\n[< Back Home](/)\n\nBody {i}")
+        self.write(self.template, "{{ Content }}")
+
+    def test_shared_block_is_rendered_once(self):
+        stats = self.build(block_cache=BlockCache())
+        # Title and body differ per page; the back link is shared
+        self.assertEqual((stats.block_hits, stats.block_misses), (3, 9))
+
+    def test_build_without_a_cache(self):
+        with self.quietly() as out:
+            stats = generate_pages_recursive(self.content, self.template, self.dest, "/")
+        self.assertEqual((stats.block_hits, stats.block_misses), (0, 0))
+        self.assertNotIn("Blocks:", out.getvalue())
+
+    def test_cache_is_basepath_independent(self):
+        cache = BlockCache()
+        self.build(os.path.join(self.root, "root"), "/", block_cache=cache)
+        stats = self.build(os.path.join(self.root, "site"), "/site/", block_cache=cache)
+        self.assertEqual(stats.block_misses, 9)
+        self.assertEqual(
+            self.read(self.root, "site", "page0.html"),
+            '<div><h1>Page 0</h1><p><a href="/site/">< Back Home</a></p><p>Body 0</p></div>',
+        )
+        self.assertIn('href="/"', self.read(self.root, "root", "page0.html"))
+
+    def test_parallel_build_reports_worker_counters(self):
+        stats = self.build(jobs=2, block_cache=BlockCache())
+        self.assertEqual(stats.block_hits + stats.block_misses, 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
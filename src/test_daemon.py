@@ -0,0 +1,80 @@
+import os
+import socket
+import threading
+import unittest
+
+from daemon import BuildDaemon, DaemonServer, remove_stale_socket, send_request
+from livesite import LiveSite
+from sitetest import SiteTestCase
+
+
+class TestBuildDaemon(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome\n")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nPosts\n")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        site = LiveSite(self.content, self.static, self.template, self.dest)
+        site.load()
+        self.daemon = BuildDaemon(site)
+
+    def test_build_one_path(self):
+        source = os.path.join(self.content, "blog", "index.md")
+        self.edit(source, "# Blog\n\nNew post\n")
+        response = self.daemon.handle(f"build {source}\n")
+        self.assertTrue(response["ok"])
+        self.assertEqual(response["changes"], ["Rebuilt page blog/index.md"])
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "blog", "index.html")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_build_rescans_everything(self):
+        self.edit(os.path.join(self.content, "index.md"), "# Home\n\nHello\n")
+        self.assertEqual(self.daemon.handle("build")["changes"], ["Rebuilt page index.md"])
+        self.assertEqual(self.daemon.handle("build")["changes"], [])
+        self.assertEqual(self.daemon.handle("stats")["builds"], 2)
+
+    def test_failed_page_is_not_ok(self):
+        self.edit(os.path.join(self.content, "index.md"), "no title\n")
+        response = self.daemon.handle("build")
+        self.assertFalse(response["ok"])
+        self.assertIn("Failed to render index.md", response["changes"][0])
+
+    def test_bad_requests(self):
+        self.assertIn("not under", self.daemon.handle(f"build {self.root}/elsewhere.md")["error"])
+        self.assertIn("unknown request", self.daemon.handle("deploy")["error"])
+        self.assertEqual(self.daemon.builds, 0)
+
+    def test_requests_over_the_socket(self):
+        socket_path = os.path.join(self.root, "daemon.sock")
+        server = DaemonServer(socket_path, self.daemon)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            self.assertEqual(send_request(socket_path, "stats", timeout=5)["pages"], 2)
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.settimeout(5)
+                client.connect(socket_path)
+                with client.makefile('rwb') as f:
+                    f.write(b"build\nstats\n")
+                    f.flush()
+                    self.assertIn(b'"changes": []', f.readline())
+                    self.assertIn(b'"builds": 1', f.readline())
+            with self.assertRaises(FileExistsError):
+                remove_stale_socket(socket_path)
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertFalse(os.path.exists(socket_path))
+
+    def test_stale_socket_is_replaced(self):
+        socket_path = os.path.join(self.root, "daemon.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as left_over:
+            left_over.bind(socket_path)
+        remove_stale_socket(socket_path)
+        self.assertFalse(os.path.exists(socket_path))
+        self.write(socket_path, "not a socket")
+        with self.assertRaises(FileExistsError):
+            remove_stale_socket(socket_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,265 @@
+import http.client
+import json
+import os
+import threading
+import unittest
+from unittest import mock
+from urllib.parse import quote
+
+from devserver import (DevRequestHandler, DevServer, DevSite, LiveReload, PageCache, RenderedPage, diff_blocks,
+                       etag_matches)
+from sitetest import SiteTestCase
+from textnode import generate_page
+
+
+class TestPageCache(unittest.TestCase):
+    def test_changed_stamp_is_a_miss(self):
+        cache = PageCache()
+        cache.put("a.md", RenderedPage((1, 10), b"<p>a</p>"))
+        self.assertIsNotNone(cache.get("a.md", (1, 10)))
+        self.assertIsNone(cache.get("a.md", (2, 10)))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_least_recently_used_page_is_evicted(self):
+        cache = PageCache(max_bytes=2 * (1000 + 300))
+        for key in ("a", "b"):
+            cache.put(key, RenderedPage((1, 1), b"x" * 1000))
+        cache.get("a", (1, 1))
+        cache.put("c", RenderedPage((1, 1), b"x" * 1000))
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertEqual(cache.evictions, 1)
+
+    def test_etag_matching(self):
+        self.assertTrue(etag_matches('"x"', '"x"'))
+        self.assertTrue(etag_matches('"y", W/"x"', '"x"'))
+        self.assertTrue(etag_matches('*', '"x"'))
+        self.assertFalse(etag_matches(None, '"x"'))
+        self.assertFalse(etag_matches('"y"', '"x"'))
+
+
+class TestDiffBlocks(unittest.TestCase):
+    def test_only_changed_blocks_are_sent(self):
+        old = ["<h1>T</h1>", "<p>a</p>", "<p>b</p>", "<p>c</p>"]
+        self.assertEqual(diff_blocks(old, old), [])
+        self.assertEqual(diff_blocks(old, ["<h1>T</h1>", "<p>a</p>", "<p>B</p>", "<p>c</p>"]),
+                         [(2, 3, ["<p>B</p>"])])
+        self.assertEqual(diff_blocks(old, ["<h1>T</h1>", "<p>c</p>", "<p>new</p>"]),
+                         [(1, 3, []), (4, 4, ["<p>new</p>"])])
+
+
+class DevSiteTestCase(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.template, '<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[Blog](/blog/)")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nPosts")
+        self.write(os.path.join(self.content, "about.md"), "# About\n\nUs")
+        self.write(os.path.join(self.static, "index.css"), "body { color: red; }")
+        self.site = DevSite(self.content, self.static, self.template, "/site/")
+
+
+class TestDevSite(DevSiteTestCase):
+    def test_locate(self):
+        cases = {
+            "/site/": ("page", os.path.join(self.content, "", "index.md")),
+            "/site/blog/": ("page", os.path.join(self.content, "blog/", "index.md")),
+            "/site/about.html": ("page", os.path.join(self.content, "about.md")),
+            "/site/index.css": ("static", os.path.join(self.static, "index.css")),
+            "/site/blog": ("redirect", "/site/blog/"),
+            "/site": ("redirect", "/site/"),
+            "/site/missing/": None,
+            "/site/../template.html": None,
+            "/elsewhere/": None,
+        }
+        for url_path, expected in cases.items():
+            with self.subTest(url_path=url_path):
+                self.assertEqual(self.site.locate(url_path), expected)
+
+    def test_locate_stays_inside_the_trees(self):
+        secret = os.path.join(self.root, "secret.md")
+        self.write(secret, "# Secret")
+        os.symlink(secret, os.path.join(self.static, "link.md"))
+        os.symlink(self.root, os.path.join(self.content, "outside"))
+        for url_path in (f"/site/{secret}", f"/site//{secret}", f"/site/{secret[:-3]}.html",
+                         "/site/link.md", "/site/outside/secret.html", "/site/blog//"):
+            with self.subTest(url_path=url_path):
+                self.assertIsNone(self.site.locate(url_path))
+
+    def test_render_matches_a_build(self):
+        source = os.path.join(self.content, "index.md")
+        with self.quietly():
+            generate_page(source, self.template, os.path.join(self.dest, "index.html"), "/site/")
+        self.assertEqual(self.site.render(source).body, self.outputs()["index.html"])
+
+    def test_edited_source_and_template_render_again(self):
+        source = os.path.join(self.content, "blog", "index.md")
+        first = self.site.render(source)
+        self.assertIs(self.site.render(source), first)
+
+        self.edit(source, "# Blog\n\nNew post")
+        second = self.site.render(source)
+        self.assertIn(b"New post", second.body)
+        self.assertNotEqual(second.etag, first.etag)
+
+        self.edit(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertTrue(self.site.render(source).body.startswith(b"<h1>Blog</h1>"))
+
+
+class TestLiveReload(DevSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.site.live_reload = True
+        self.source = os.path.join(self.content, "index.md")
+        self.live = LiveReload(self.site)
+
+    def subscribe(self):
+        return self.live.subscribe(self.source, self.site.render(self.source).version)
+
+    def test_page_carries_the_script_after_its_content(self):
+        page = self.site.render(self.source)
+        self.assertIn(b'</p></div><script>', page.body)
+        self.assertIn(f"&version={page.version}".encode('utf-8'), page.body)
+        self.assertEqual(page.blocks, ["<h1>Home</h1>", '<p><a href="/site/blog/">Blog</a></p>'])
+
+    def test_edit_sends_only_the_changed_block(self):
+        subscriber = self.subscribe()
+        self.assertEqual(self.live.poll(), [])
+        self.edit(self.source, "# Home\n\n[Blog](/blog/)\n\nMore")
+        self.assertEqual(len(self.live.poll()), 1)
+        self.assertEqual(subscriber.events.get_nowait(), {"ops": [(2, 2, ["<p>More</p>"])]})
+        self.assertEqual(self.live.poll(), [])
+
+    def test_template_change_reloads(self):
+        subscriber = self.subscribe()
+        self.edit(self.template, "<main>{{ Content }}</main>")
+        self.live.poll()
+        self.assertEqual(subscriber.events.get_nowait(), {"reload": True})
+        self.assertEqual(self.live.subscribers, [])
+
+    def test_template_change_reloads_after_a_render_in_between(self):
+        subscriber = self.subscribe()
+        self.edit(self.template, "<main>{{ Content }}</main>")
+        self.site.render(self.source)
+        self.live.poll()
+        self.assertEqual(subscriber.events.get_nowait(), {"reload": True})
+        self.assertEqual(self.live.subscribers, [])
+
+    def test_new_title_and_stale_version_reload(self):
+        subscriber = self.subscribe()
+        self.edit(self.source, "# Welcome\n\n[Blog](/blog/)")
+        self.live.poll()
+        self.assertEqual(subscriber.events.get_nowait(), {"reload": True})
+        late = self.live.subscribe(self.source, "an older version")
+        self.assertEqual(late.events.get_nowait(), {"reload": True})
+
+
+class TestDevServer(DevSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for method in (mock.patch.object(DevRequestHandler, "log_message"),
+                       mock.patch.object(LiveReload, "report")):
+            method.start()
+            self.addCleanup(method.stop)
+        self.server = DevServer(("127.0.0.1", 0), self.site)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def request(self, path, method="GET", headers=None):
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.server_port, timeout=5)
+        try:
+            connection.request(method, path, headers=headers or {})
+            response = connection.getresponse()
+            return response.status, dict(response.getheaders()), response.read()
+        finally:
+            connection.close()
+
+    def test_page_revalidates_with_etag(self):
+        status, headers, body = self.request("/site/")
+        self.assertEqual(status, 200)
+        self.assertIn(b'href="/site/blog/"', body)
+        self.assertIn(b'href="/site/index.css"', body)
+        status, _, body = self.request("/site/", headers={"If-None-Match": headers["ETag"]})
+        self.assertEqual((status, body), (304, b""))
+
+    def test_absolute_paths_are_not_served(self):
+        secret = os.path.join(self.root, "secret.txt")
+        self.write(secret, "secret")
+        # An encoded slash and a doubled one both decode to "/site//..."
+        for path in (f"/site/{quote(secret, safe='')}", f"/site/{secret}"):
+            with self.subTest(path=path):
+                status, _, body = self.request(path)
+                self.assertEqual(status, 404)
+                self.assertNotIn(b"secret", body)
+
+    def test_static_file(self):
+        status, headers, body = self.request("/site/index.css")
+        self.assertEqual((status, body), (200, b"body { color: red; }"))
+        self.assertEqual(headers["Content-Type"], "text/css")
+        status, _, _ = self.request("/site/index.css", headers={"If-None-Match": headers["ETag"]})
+        self.assertEqual(status, 304)
+
+    def test_head_redirect_and_missing(self):
+        status, headers, body = self.request("/site/about.html", method="HEAD")
+        self.assertEqual((status, body), (200, b""))
+        self.assertGreater(int(headers["Content-Length"]), 0)
+        status, headers, _ = self.request("/site/blog")
+        self.assertEqual((status, headers["Location"]), (301, "/site/blog/"))
+        self.assertEqual(self.request("/site/nope/")[0], 404)
+
+    def test_page_without_title_is_a_server_error(self):
+        self.write(os.path.join(self.content, "broken", "index.md"), "no title here")
+        status, _, body = self.request("/site/broken/")
+        self.assertEqual(status, 500)
+        self.assertIn(b"ValueError", body)
+
+    def serve_live_reload(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.site.live_reload = True
+        self.server = DevServer(("127.0.0.1", 0), self.site, interval=0.01)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def open_event_stream(self, pathname, source):
+        """Connect to a page's event stream the way the live reload script does."""
+        self.serve_live_reload()
+        version = self.site.render(source).version
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.server_port, timeout=5)
+        self.addCleanup(connection.close)
+        # encodeURIComponent(location.pathname)
+        connection.request("GET", f"/site/_livereload?page={quote(pathname, safe='')}&version={version}")
+        response = connection.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Type"), "text/event-stream")
+        return response
+
+    def test_event_stream_pushes_edits(self):
+        source = os.path.join(self.content, "blog", "index.md")
+        response = self.open_event_stream("/site/blog/", source)
+        self.edit(source, "# Blog\n\nEdited")
+        line = response.fp.readline()
+        self.assertEqual(json.loads(line.removeprefix(b"data: ")), {"ops": [[1, 2, ["<p>Edited</p>"]]]})
+
+    def test_event_stream_for_a_page_outside_content(self):
+        self.write(os.path.join(self.root, "secret", "index.md"), "# Secret")
+        self.serve_live_reload()
+        page = quote(f"/site/{self.root}/secret/", safe="")
+        status, _, _ = self.request(f"/site/_livereload?page={page}&version=x")
+        self.assertEqual(status, 404)
+
+    def test_event_stream_for_non_ascii_page(self):
+        source = os.path.join(self.content, "café au lait", "index.md")
+        self.write(source, "# Café\n\nMenu")
+        response = self.open_event_stream(quote("/site/café au lait/"), source)
+        self.edit(source, "# Café\n\nClosed")
+        line = response.fp.readline()
+        self.assertEqual(json.loads(line.removeprefix(b"data: ")), {"ops": [[1, 2, ["<p>Closed</p>"]]]})
+
+
+if __name__ == "__main__":
+    unittest.main()
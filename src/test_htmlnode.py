@@ -1,7 +1,9 @@
 
+import io
 import unittest
 from htmlnode import HTMLNode, LeafNode, ParentNode, text_node_to_html_node
 from textnode import TextNode, TextType
+from urls import UrlResolver
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -43,6 +45,34 @@ class TestHTMLNode(unittest.TestCase):
         # Placeholder for repr test
         self.assertIsInstance(repr(HTMLNode("div", "test")), str)
 
+    def test_eq_and_hash(self):
+        node1 = ParentNode("p", [LeafNode("a", "x", {"href": "/a", "title": "t"})])
+        node2 = ParentNode("p", [LeafNode("a", "x", {"title": "t", "href": "/a"})])
+        self.assertEqual(node1, node2)
+        self.assertEqual(hash(node1), hash(node2))
+
+    def test_not_equal_different_children(self):
+        node1 = ParentNode("p", [LeafNode(None, "x")])
+        node2 = ParentNode("p", [LeafNode(None, "y")])
+        self.assertNotEqual(node1, node2)
+        self.assertNotEqual(ParentNode("p", []), ParentNode("p", [LeafNode(None, "x")]))
+
+    def test_not_equal_different_class(self):
+        self.assertNotEqual(HTMLNode("b", "x"), LeafNode("b", "x"))
+
+    def test_eq_deep_tree(self):
+        def build():
+            node = LeafNode(None, "x")
+            for _ in range(5000):
+                node = ParentNode("span", [node])
+            return node
+        self.assertEqual(build(), build())
+        self.assertEqual(hash(build()), hash(build()))
+
+    def test_slots(self):
+        self.assertFalse(hasattr(LeafNode("b", "x"), "__dict__"))
+        self.assertFalse(hasattr(ParentNode("p", []), "__dict__"))
+
 
 class TestLeafNode(unittest.TestCase):
     def test_leaf_to_html_p(self):
@@ -179,6 +209,51 @@ class TestParentNode(unittest.TestCase):
         self.assertIn("div", repr_str)
 
 
+class TestStreamingRender(unittest.TestCase):
+    def build_tree(self):
+        return ParentNode("div", [
+            ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")]),
+            ParentNode("ul", [ParentNode("li", [LeafNode("a", "link", {"href": "/x"})])]),
+        ])
+
+    def test_iter_html_joins_to_to_html(self):
+        node = self.build_tree()
+        self.assertEqual("".join(node.iter_html()), node.to_html())
+
+    def test_iter_html_yields_chunks(self):
+        chunks = list(ParentNode("p", [LeafNode(None, "a"), LeafNode("b", "c")]).iter_html())
+        self.assertEqual(chunks, ["<p>", "a", "<b>c</b>", "</p>"])
+
+    def test_leaf_iter_html(self):
+        self.assertEqual(list(LeafNode("i", "x").iter_html()), ["<i>x</i>"])
+
+    def test_render_to_writes_into_buffer(self):
+        node = self.build_tree()
+        buffer = io.StringIO()
+        node.render_to(buffer)
+        self.assertEqual(buffer.getvalue(), node.to_html())
+
+    def test_deep_tree_beyond_recursion_limit(self):
+        depth = 10000
+        node = LeafNode(None, "x")
+        for _ in range(depth):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertEqual(html, "<span>" * depth + "x" + "</span>" * depth)
+
+    def test_siblings_after_nested_parent(self):
+        node = ParentNode("div", [
+            ParentNode("p", [ParentNode("b", [LeafNode(None, "a")])]),
+            LeafNode(None, "b"),
+            ParentNode("p", []),
+        ])
+        self.assertEqual(node.to_html(), "<div><p><b>a</b></p>b<p></p></div>")
+
+    def test_iter_html_raises_like_to_html(self):
+        with self.assertRaises(ValueError):
+            list(ParentNode("div", [ParentNode(None, [])]).iter_html())
+
+
 class TestTextNodeToHTMLNode(unittest.TestCase):
     def test_text(self):
         node = TextNode("This is a text node", TextType.TEXT)
@@ -214,6 +289,20 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         self.assertEqual(html_node.value, "Click here")
         self.assertEqual(html_node.props, {"href": "https://example.com"})
 
+    def test_link_with_children(self):
+        node = TextNode(
+            "**Click** here",
+            TextType.LINK,
+            "https://example.com",
+            [TextNode("Click", TextType.BOLD), TextNode(" here", TextType.TEXT)],
+        )
+        html_node = text_node_to_html_node(node)
+        self.assertEqual(html_node.tag, "a")
+        self.assertEqual(
+            html_node.to_html(),
+            '<a href="https://example.com"><b>Click</b> here</a>',
+        )
+
     def test_image(self):
         node = TextNode("Alt text", TextType.IMAGE, "https://example.com/image.jpg")
         html_node = text_node_to_html_node(node)
@@ -221,6 +310,13 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         self.assertEqual(html_node.value, "")
         self.assertEqual(html_node.props, {"src": "https://example.com/image.jpg", "alt": "Alt text"})
 
+    def test_resolver_points_root_urls_at_basepath(self):
+        resolver = UrlResolver("/site/")
+        link = TextNode("Home", TextType.LINK, "/", [TextNode("Home", TextType.TEXT)])
+        image = TextNode("Logo", TextType.IMAGE, "/images/logo.png")
+        self.assertEqual(text_node_to_html_node(link, resolver).to_html(), '<a href="/site/">Home</a>')
+        self.assertEqual(text_node_to_html_node(image, resolver).props["src"], "/site/images/logo.png")
+
     def test_invalid_text_type(self):
         node = TextNode("Invalid", "invalid_type")
         with self.assertRaises(ValueError) as context:
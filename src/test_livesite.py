@@ -0,0 +1,167 @@
+import os
+import sys
+import time
+import unittest
+
+from fswatch import InotifyWatcher, make_watcher
+from livesite import LiveSite, scan_tree
+from sitetest import SiteTestCase
+from staticsync import sync_static_files
+
+
+class TestLiveSite(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[Blog](/blog)\n")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nPosts\n")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.site = LiveSite(self.content, self.static, self.template, self.dest, "/site/")
+        self.site.load()
+
+    def test_load_writes_nothing(self):
+        self.assertFalse(os.path.exists(self.dest))
+        self.assertEqual(sorted(self.site.pages), ["blog/index.md", "index.md"])
+
+    def test_no_changes(self):
+        self.assertEqual(self.site.poll(), [])
+
+    def test_page_edit_rebuilds_only_that_page(self):
+        self.edit(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nNew post\n")
+        self.assertEqual(self.site.poll(), ["Rebuilt page blog/index.md"])
+        self.assertEqual(self.read("blog", "index.html"), "<title>Blog</title><div><h1>Blog</h1><p>New post</p></div>")
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_fingerprinted_asset_change_rewrites_pages(self):
+        with self.quietly():
+            assets = sync_static_files(self.static, self.dest, fingerprint=True).assets
+        site = LiveSite(self.content, self.static, self.template, self.dest, "/site/", assets=assets)
+        site.load()
+        self.edit(self.template, '<link href="/index.css">{{ Content }}')
+        site.poll()
+        self.edit(os.path.join(self.static, "index.css"), "body { color: red }")
+        with self.quietly():
+            changes = site.poll()
+        self.assertEqual(changes, ["Synced static files (1 transferred, 1 removed)",
+                                   "Re-rendered 2 pages for asset change"])
+        css = site.assets.get("/index.css")
+        self.assertNotEqual(css, assets.get("/index.css"))
+        self.assertIn(f'href="/site{css}"', self.read("index.html"))
+        self.assertIn(css, self.read("_headers"))
+
+    def test_fingerprinted_asset_change_is_precompressed(self):
+        with self.quietly():
+            assets = sync_static_files(self.static, self.dest, fingerprint=True).assets
+        site = LiveSite(self.content, self.static, self.template, self.dest, "/site/", precompress=True,
+                        assets=assets)
+        site.load()
+        self.edit(os.path.join(self.static, "index.css"), "body { color: red }")
+        with self.quietly():
+            site.poll()
+        css = site.assets.get("/index.css")
+        self.assertTrue(os.path.exists(os.path.join(self.dest, css.lstrip("/") + ".gz")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html.gz")))
+
+    def test_template_change_rerenders_every_page(self):
+        self.edit(self.template, '<link href="/index.css">{{ Content }}')
+        self.assertEqual(self.site.poll(), ["Re-rendered 2 pages for template change"])
+        self.assertEqual(
+            self.read("index.html"),
+            '<link href="/site/index.css"><div><h1>Home</h1><p><a href="/site/blog">Blog</a></p></div>',
+        )
+
+    def test_identical_output_is_not_written_again(self):
+        source = os.path.join(self.content, "blog", "index.md")
+        self.edit(source, "# Blog\n\nPosts\n\n")
+        self.site.poll()
+        # The output's hash is known, so it isn't even read back
+        self.edit(os.path.join(self.dest, "blog", "index.html"), "replaced")
+        self.edit(source, "# Blog\n\nPosts\n")
+        self.assertEqual(self.site.poll(), ["Rebuilt page blog/index.md"])
+        self.assertEqual(self.read("blog", "index.html"), "replaced")
+
+    def test_deleted_page_output_is_removed(self):
+        self.edit(os.path.join(self.content, "blog", "index.md"), "# Blog\n")
+        self.site.poll()
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        self.assertEqual(self.site.poll(), ["Removed page blog/index.md"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+
+    def test_failed_page_is_reported_and_others_still_build(self):
+        self.edit(os.path.join(self.content, "index.md"), "no title here\n")
+        self.edit(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nFixed\n")
+        changes = self.site.poll()
+        self.assertEqual(changes[0], "Rebuilt page blog/index.md")
+        self.assertTrue(changes[1].startswith("Failed to render index.md"))
+        self.assertEqual(len(changes), 2)
+
+    def test_static_changes_are_synced(self):
+        self.edit(os.path.join(self.static, "images", "a.png"), "png")
+        self.assertEqual(self.site.poll(), ["Synced static file images/a.png"])
+        self.assertEqual(self.read("images", "a.png"), "png")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        self.assertEqual(self.site.poll(), ["Removed static file images/a.png"])
+
+    def test_changed_paths_limit_what_is_checked(self):
+        blog = os.path.join(self.content, "blog", "index.md")
+        self.edit(blog, "# Blog\n\nEdited\n")
+        self.edit(os.path.join(self.content, "index.md"), "# Home\n\nEdited\n")
+        self.assertEqual(self.site.poll({blog}), ["Rebuilt page blog/index.md"])
+
+    def test_changed_paths_with_deleted_directory(self):
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        os.rmdir(os.path.join(self.content, "blog"))
+        changes = self.site.poll({os.path.join(self.content, "blog")})
+        self.assertEqual(changes, ["Removed page blog/index.md"])
+
+    def test_changed_paths_with_template(self):
+        self.edit(self.template, "{{ Content }}")
+        changes = self.site.poll({self.template})
+        self.assertEqual(changes, ["Re-rendered 2 pages for template change"])
+
+    def test_scan_tree_suffix(self):
+        self.edit(os.path.join(self.content, "notes.txt"), "x")
+        self.assertEqual(sorted(scan_tree(self.content, ".md")), ["blog/index.md", "index.md"])
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux-only")
+class TestInotifyWatcher(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tree = os.path.join(self.root, "tree")
+        os.makedirs(self.tree)
+        self.file = self.template
+        with open(self.file, 'w') as f:
+            f.write("x")
+        self.watcher = make_watcher([self.tree], [self.file])
+        if not isinstance(self.watcher, InotifyWatcher):
+            self.skipTest("inotify is not available")
+
+    def tearDown(self):
+        self.watcher.close()
+
+    def wait(self):
+        changed = set()
+        deadline = time.monotonic() + 2
+        while not changed and time.monotonic() < deadline:
+            changed = self.watcher.wait(0.1)
+        return {os.path.normpath(path) for path in changed}
+
+    def test_new_directory_is_watched(self):
+        os.makedirs(os.path.join(self.tree, "a"))
+        self.wait()
+        page = os.path.join(self.tree, "a", "index.md")
+        with open(page, 'w') as f:
+            f.write("# A")
+        self.assertIn(page, self.wait())
+
+    def test_single_file_watch_ignores_siblings(self):
+        with open(os.path.join(self.root, "other.txt"), 'w') as f:
+            f.write("y")
+        with open(self.file, 'w') as f:
+            f.write("z")
+        self.assertEqual(self.wait(), {self.file})
+
+
+if __name__ == "__main__":
+    unittest.main()
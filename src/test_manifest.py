@@ -0,0 +1,176 @@
+import os
+import unittest
+
+from blockcache import BlockCache
+from manifest import BuildManifest, MANIFEST_FILENAME, hash_file, remove_stale_output
+from sitetest import SiteTestCase
+from textnode import PageBuildError, generate_pages_for_targets
+
+
+TEMPLATE = "<html><title>{{ Title }}</title><body>{{ Content }}</body></html>"
+
+
+class TestBuildManifest(SiteTestCase):
+
+    def test_load_missing_returns_empty(self):
+        manifest = BuildManifest.load(os.path.join(self.root, "missing.json"))
+        self.assertEqual(manifest.settings, {})
+        self.assertEqual(manifest.pages, {})
+
+    def test_load_corrupt_returns_empty(self):
+        path = os.path.join(self.root, MANIFEST_FILENAME)
+        with open(path, 'w') as f:
+            f.write("{not json")
+        manifest = BuildManifest.load(path)
+        self.assertEqual(manifest.pages, {})
+
+    def test_save_and_load_round_trip(self):
+        path = os.path.join(self.root, MANIFEST_FILENAME)
+        manifest = BuildManifest(path, {"basepath": "/"}, {"a.md": {"source_hash": "x", "output": "a.html"}})
+        manifest.save()
+        loaded = BuildManifest.load(path)
+        self.assertEqual(loaded.settings, {"basepath": "/"})
+        self.assertEqual(loaded.pages, {"a.md": {"source_hash": "x", "output": "a.html"}})
+
+    def test_is_page_current_requires_output(self):
+        dest = os.path.join(self.root, "a.html")
+        manifest = BuildManifest(None, {}, {"a.md": {"source_hash": "x", "output": "a.html"}})
+        self.assertFalse(manifest.is_page_current("a.md", "x", dest))
+        open(dest, 'w').close()
+        self.assertTrue(manifest.is_page_current("a.md", "x", dest))
+        self.assertFalse(manifest.is_page_current("a.md", "y", dest))
+
+    def test_hash_file(self):
+        path = os.path.join(self.root, "f.txt")
+        with open(path, 'wb') as f:
+            f.write(b"abc")
+        self.assertEqual(
+            hash_file(path),
+            "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad",
+        )
+
+    def test_remove_stale_output_prunes_empty_dirs(self):
+        os.makedirs(os.path.join(self.root, "blog", "old"))
+        with open(os.path.join(self.root, "blog", "old", "index.html"), 'w') as f:
+            f.write("x")
+        remove_stale_output(self.root, "blog/old/index.html")
+        self.assertFalse(os.path.exists(os.path.join(self.root, "blog")))
+        self.assertTrue(os.path.isdir(self.root))
+
+
+class TestIncrementalBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.template, TEMPLATE)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nPosts")
+
+    def test_second_build_skips_everything(self):
+        first = self.build()
+        second = self.build()
+        self.assertEqual((first.rebuilt, first.skipped), (2, 0))
+        self.assertEqual((second.rebuilt, second.skipped), (0, 2))
+
+    def test_changed_source_rebuilds_only_that_page(self):
+        self.build()
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nNew post")
+        stats = self.build()
+        self.assertEqual((stats.rebuilt, stats.skipped), (1, 1))
+        self.assertIn("New post", self.read("blog", "index.html"))
+
+    def test_template_change_rebuilds_all(self):
+        self.build()
+        self.write(self.template, TEMPLATE.replace("<body>", "<body class=\"x\">"))
+        stats = self.build()
+        self.assertEqual(stats.rebuilt, 2)
+
+    def test_identical_output_is_not_rewritten(self):
+        self.build()
+        index = os.path.join(self.dest, "index.html")
+        os.utime(index, (1, 1))
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nNew post")
+        stats = self.build(force=True)
+        self.assertEqual((stats.rebuilt, stats.unchanged), (2, 1))
+        self.assertEqual(os.stat(index).st_mtime, 1)
+
+    def test_basepath_change_rebuilds_all(self):
+        self.build()
+        stats = self.build(basepath="/site/")
+        self.assertEqual(stats.rebuilt, 2)
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        stats = self.build()
+        self.assertEqual(stats.removed, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_missing_output_is_rebuilt(self):
+        self.build()
+        os.remove(os.path.join(self.dest, "index.html"))
+        stats = self.build()
+        self.assertEqual((stats.rebuilt, stats.skipped), (1, 1))
+
+    def test_parallel_build_matches_serial(self):
+        for i in range(6):
+            self.write(os.path.join(self.content, f"page{i}.md"), f"# Page {i}\n\n[home](/index)")
+        self.build(basepath="/site/")
+        serial = self.outputs()
+        stats = self.build(basepath="/site/", force=True, jobs=3)
+        self.assertEqual(stats.rebuilt, 8)
+        self.assertEqual(self.outputs(), serial)
+
+    def build_targets(self, targets, **kwargs):
+        with self.quietly():
+            return generate_pages_for_targets(self.content, self.template, targets, **kwargs)
+
+    def test_multi_target_build_matches_separate_builds(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[Blog](/blog/) and ![logo](/logo.png)")
+        self.build(basepath="/site/")
+        separate = self.outputs()
+        preview = os.path.join(self.root, "preview")
+        for kwargs in ({}, {"jobs": 2}, {"io_threads": 2}):
+            with self.subTest(**kwargs):
+                stats = self.build_targets([(self.dest, "/site/"), (preview, "/")], force=True, **kwargs)
+                self.assertEqual([target.rebuilt for target in stats], [2, 2])
+                self.assertEqual(self.outputs(), separate)
+                with open(os.path.join(preview, "index.html"), encoding='utf-8') as f:
+                    self.assertIn('<a href="/blog/">Blog</a> and <img src="/logo.png" alt="logo">', f.read())
+
+    def test_targets_are_rendered_once_and_skipped_independently(self):
+        preview = os.path.join(self.root, "preview")
+        targets = [(self.dest, "/site/"), (preview, "/")]
+        stats = self.build_targets(targets, block_cache=BlockCache())
+        # Blocks are rendered once per page, not once per target
+        self.assertEqual(stats[0].block_misses, 4)
+        os.remove(os.path.join(preview, "index.html"))
+        stats = self.build_targets(targets)
+        self.assertEqual([(target.rebuilt, target.skipped) for target in stats], [(0, 2), (1, 1)])
+
+    def test_parallel_build_reports_failing_source(self):
+        bad_path = os.path.join(self.content, "blog", "index.md")
+        self.write(bad_path, "# Blog\n\nUnclosed **bold")
+        with self.assertRaises(PageBuildError) as context:
+            self.build(jobs=2)
+        self.assertEqual(context.exception.source_path, bad_path)
+        self.assertIn(bad_path, str(context.exception))
+
+    def test_failing_page_keeps_previous_output(self):
+        self.build()
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nUnclosed **bold")
+        with self.assertRaises(PageBuildError):
+            self.build()
+        self.assertIn("Posts", self.read("blog", "index.html"))
+        self.assertEqual(sorted(os.listdir(os.path.join(self.dest, "blog"))), ["index.html"])
+
+    def test_failing_page_leaves_no_partial_output(self):
+        # The error is in the second block, after the first has been streamed out
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nUnclosed **bold")
+        with self.assertRaises(PageBuildError):
+            self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
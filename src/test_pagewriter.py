@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from pagewriter import PageWriter
+
+
+class TestPageWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "page.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, *chunks):
+        output = PageWriter(self.path)
+        for chunk in chunks:
+            output.write(chunk)
+        return output.commit()
+
+    def read(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def test_new_page_is_written(self):
+        self.assertTrue(self.write("<p>", "héllo", "</p>"))
+        self.assertEqual(self.read(), "<p>héllo</p>")
+
+    def test_creates_missing_directories(self):
+        self.path = os.path.join(self.tmp.name, "blog", "post", "index.html")
+        self.assertTrue(self.write("<p>post</p>"))
+        self.assertEqual(self.read(), "<p>post</p>")
+
+    def test_identical_page_is_not_rewritten(self):
+        self.write("<p>same</p>")
+        os.utime(self.path, (1, 1))
+        self.assertFalse(self.write("<p>", "same", "</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime, 1)
+
+    def test_change_after_matching_prefix(self):
+        self.write("<p>one</p><p>two</p>")
+        self.assertTrue(self.write("<p>one</p>", "<p>three</p>"))
+        self.assertEqual(self.read(), "<p>one</p><p>three</p>")
+
+    def test_shorter_and_longer_pages(self):
+        self.write("<p>one</p><p>two</p>")
+        self.assertTrue(self.write("<p>one</p>"))
+        self.assertEqual(self.read(), "<p>one</p>")
+        self.assertTrue(self.write("<p>one</p>", "<p>two</p>"))
+        self.assertEqual(self.read(), "<p>one</p><p>two</p>")
+
+    def test_output_is_replaced_not_rewritten_in_place(self):
+        self.write("<p>old</p>")
+        with open(self.path, 'rb') as reader:
+            self.write("<p>new</p>")
+            # A reader holding the old file still sees the complete old page
+            self.assertEqual(reader.read(), b"<p>old</p>")
+        self.assertEqual(self.read(), "<p>new</p>")
+
+    def test_abort_keeps_existing_output(self):
+        self.write("<p>old</p>")
+        output = PageWriter(self.path)
+        output.write("<p>partial")
+        output.abort()
+        self.assertEqual(self.read(), "<p>old</p>")
+        self.assertEqual(os.listdir(self.tmp.name), ["page.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
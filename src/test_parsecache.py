@@ -0,0 +1,118 @@
+import os
+import unittest
+
+from parsecache import ParseCache
+from sitetest import SiteTestCase
+
+
+HASH = "ab" * 32
+
+
+class TestParseCache(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, ".boottracker-cache")
+        self.cache = ParseCache(self.path, version="1")
+
+    def store(self, cache, source_hash, title, *chunks):
+        writer = cache.writer(source_hash, title)
+        for chunk in chunks:
+            writer.write(chunk)
+        writer.commit()
+
+    def test_round_trip(self):
+        self.store(self.cache, HASH, "Title", "<div>", "<p>body</p>", "</div>")
+        self.assertEqual(self.cache.get(HASH), ("Title", "<div><p>body</p></div>"))
+        self.assertEqual(self.cache.counters(), (1, 0, 1))
+
+    def test_missing_entry_is_a_miss(self):
+        self.assertIsNone(self.cache.get(HASH))
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_corrupt_entry_is_a_miss(self):
+        self.store(self.cache, HASH, "Title", "<div></div>")
+        with open(self.cache.entry_path(HASH), 'wb') as f:
+            f.write(b"not zlib")
+        self.assertIsNone(self.cache.get(HASH))
+
+    def test_abort_leaves_nothing_behind(self):
+        writer = self.cache.writer(HASH, "Title")
+        writer.write("<div>")
+        writer.abort()
+        self.assertIsNone(self.cache.get(HASH))
+        self.assertEqual(self.cache.stats()["bytes"], 0)
+
+    def test_concurrent_writers_of_one_entry(self):
+        first = self.cache.writer(HASH, "Title")
+        second = ParseCache(self.path, version="1").writer(HASH, "Title")
+        first.write("<div>a</div>")
+        second.write("<div>a</div>")
+        second.commit()
+        first.commit()
+        self.assertEqual(self.cache.get(HASH), ("Title", "<div>a</div>"))
+        self.assertEqual(self.cache.stats()["entries"], 1)
+
+    def test_version_is_part_of_the_key(self):
+        self.store(self.cache, HASH, "Title", "<div></div>")
+        self.assertIsNone(ParseCache(self.path, version="2").get(HASH))
+
+    def test_prune_drops_other_versions(self):
+        self.store(ParseCache(self.path, version="0"), HASH, "Old", "<div></div>")
+        self.store(self.cache, HASH, "New", "<div></div>")
+        self.cache.prune()
+        self.assertEqual(os.listdir(self.path), ["v1"])
+
+    def test_prune_evicts_least_recently_used(self):
+        hashes = [f"{i:02x}" * 32 for i in range(3)]
+        for i, source_hash in enumerate(hashes):
+            self.store(self.cache, source_hash, "T", "<p>x</p>" * 50)
+            os.utime(self.cache.entry_path(source_hash), (i, i))
+        entry_size = os.path.getsize(self.cache.entry_path(hashes[0]))
+        self.cache.max_bytes = entry_size * 2
+        self.cache.prune()
+        self.assertFalse(os.path.exists(self.cache.entry_path(hashes[0])))
+        self.assertTrue(os.path.exists(self.cache.entry_path(hashes[2])))
+
+    def test_clear_and_stats(self):
+        self.store(self.cache, HASH, "Title", "<div></div>")
+        self.assertEqual(self.cache.stats()["entries"], 1)
+        self.cache.clear()
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+
+class TestBuildWithParseCache(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[Blog](/blog)")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\n![img](/a.png)")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.cache = ParseCache(os.path.join(self.root, "cache"))
+
+    def test_rebuild_for_new_basepath_hits_cache(self):
+        self.build(os.path.join(self.root, "a"), "/", parse_cache=self.cache)
+        self.assertEqual(self.cache.counters(), (0, 2, 2))
+        self.build(os.path.join(self.root, "b"), "/site/", parse_cache=self.cache)
+        self.assertEqual(self.cache.hits, 2)
+        uncached = os.path.join(self.root, "c")
+        self.build(uncached, "/site/")
+        self.assertEqual(self.read(self.root, "b", "blog", "index.html"),
+                         self.read(uncached, "blog", "index.html"))
+        self.assertIn('src="/site/a.png"', self.read(uncached, "blog", "index.html"))
+        self.assertIn('src="/a.png"', self.read(self.root, "a", "blog", "index.html"))
+
+    def test_changed_source_misses(self):
+        self.build(os.path.join(self.root, "a"), parse_cache=self.cache)
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nEdited")
+        self.build(os.path.join(self.root, "b"), parse_cache=self.cache)
+        self.assertEqual(self.cache.counters(), (1, 3, 3))
+        self.assertIn("<p>Edited</p>", self.read(self.root, "b", "blog", "index.html"))
+
+    def test_entries_written_by_workers_are_shared(self):
+        self.build(os.path.join(self.root, "a"), parse_cache=self.cache, jobs=2)
+        self.assertEqual(self.cache.writes, 2)
+        self.build(os.path.join(self.root, "b"), parse_cache=self.cache)
+        self.assertEqual(self.cache.hits, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
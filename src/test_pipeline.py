@@ -0,0 +1,121 @@
+import asyncio
+import json
+import os
+import unittest
+
+from parsecache import ParseCache
+from pipeline import MeasuredQueue, PipelineStats
+from sitetest import SiteTestCase
+from textnode import PageBuildError, generate_pages_recursive
+from timings import BuildTimings
+
+
+class TestMeasuredQueue(unittest.TestCase):
+    def test_records_depth_and_full_queue_stalls(self):
+        async def run():
+            queue = MeasuredQueue("write", 1)
+
+            async def consume():
+                await asyncio.sleep(0.01)
+                return [await queue.get(), await queue.get()]
+
+            consumer = asyncio.create_task(consume())
+            await queue.put("a")
+            await queue.put("b")
+            return queue, await consumer
+
+        queue, items = asyncio.run(run())
+        self.assertEqual(items, ["a", "b"])
+        stats = queue.stats()
+        self.assertEqual((stats["items"], stats["max_depth"], stats["capacity"]), (2, 1, 1))
+        self.assertGreater(stats["put_stall"], 0)
+
+    def test_waiting_for_in_flight_work_counts_as_get_stall(self):
+        async def run():
+            queue = MeasuredQueue("read", 4)
+            await queue.put(asyncio.ensure_future(asyncio.sleep(0.01, result="page")))
+            await queue.put(None)
+            return queue, await queue.get_result(), await queue.get_result()
+
+        queue, first, last = asyncio.run(run())
+        self.assertEqual((first, last), ("page", None))
+        self.assertGreater(queue.get_stall, 0)
+
+    def test_summary(self):
+        async def run():
+            queue = MeasuredQueue("read", 4)
+            await queue.put("a")
+            return PipelineStats([queue], 2)
+
+        self.assertEqual(
+            asyncio.run(run()).summary(),
+            "Pipeline: read queue 1.0/4 avg, 0.00s full, 0.00s empty",
+        )
+
+
+class TestPipelinedBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(12):
+            path = os.path.join(self.content, f"section{i % 3}", f"page{i}.md")
+            self.write(path, f"# Page {i}\n\n[Home](/)\n\n- item {i}\n- shared item")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+
+    def build(self, name, **kwargs):
+        dest = os.path.join(self.root, name)
+        with self.quietly() as out:
+            stats = generate_pages_recursive(self.content, self.template, dest, "/site/", **kwargs)
+        return stats, out.getvalue()
+
+    def read_outputs(self, name):
+        return self.outputs(os.path.join(self.root, name))
+
+    def test_pipelined_build_matches_streaming_build(self):
+        self.build("streamed")
+        stats, log = self.build("pipelined", io_threads=3, queue_size=2)
+        self.assertEqual(self.read_outputs("pipelined"), self.read_outputs("streamed"))
+        self.assertEqual(stats.pipeline.queues["read"]["items"], 13)
+        self.assertLessEqual(stats.pipeline.queues["write"]["max_depth"], 2)
+        self.assertIn("Pipeline: read queue", log)
+
+    def test_log_is_in_page_order(self):
+        _, streamed = self.build("streamed")
+        _, pipelined = self.build("pipelined", io_threads=4)
+        self.assertEqual(self.sources_in_log(pipelined), self.sources_in_log(streamed))
+
+    def sources_in_log(self, log):
+        return [line.split()[3] for line in log.splitlines() if line.startswith("Generating page from")]
+
+    def test_unchanged_pages_are_counted(self):
+        self.build("pipelined", io_threads=2)
+        stats, _ = self.build("pipelined", io_threads=2, force=True)
+        self.assertEqual((stats.rebuilt, stats.unchanged), (12, 12))
+
+    def test_parse_cache_counters(self):
+        cache = ParseCache(os.path.join(self.root, "cache"))
+        self.build("first", io_threads=2, parse_cache=cache)
+        self.assertEqual(cache.counters(), (0, 12, 12))
+        self.build("second", io_threads=2, parse_cache=cache)
+        self.assertEqual(cache.counters(), (12, 12, 12))
+        self.assertEqual(self.read_outputs("first"), self.read_outputs("second"))
+
+    def test_failing_page_stops_the_build(self):
+        self.write(os.path.join(self.content, "section1", "page4.md"), "# Page 4\n\nUnclosed **bold")
+        with self.assertRaises(PageBuildError) as raised:
+            self.build("pipelined", io_threads=2)
+        self.assertIn("page4.md", str(raised.exception))
+
+    def test_timings_report_includes_pipeline(self):
+        timings = BuildTimings()
+        self.build("pipelined", io_threads=2, timings=timings)
+        path = os.path.join(self.root, "timings.json")
+        timings.write(path)
+        with open(path, encoding='utf-8') as f:
+            report = json.load(f)
+        self.assertEqual(report["page_count"], 12)
+        self.assertEqual(sorted(report["pipeline"]["queues"]), ["read", "write"])
+        self.assertIn("write", report["page_stages"])
+
+
+if __name__ == "__main__":
+    unittest.main()
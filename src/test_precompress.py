@@ -0,0 +1,112 @@
+import gzip
+import os
+import unittest
+
+from manifest import remove_stale_output
+from precompress import Precompressor, gzip_sibling, is_gzip_current
+from sitetest import SiteTestCase
+from staticsync import sync_static_files
+from textnode import generate_pages_recursive
+
+
+class TestGzipSibling(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "index.html")
+        self.write(self.path, "<p>hello</p>" * 100)
+
+    def test_round_trip(self):
+        size_in, size_out = gzip_sibling(self.path)
+        with gzip.open(self.path + ".gz", 'rt', encoding='utf-8') as f:
+            self.assertEqual(f.read(), "<p>hello</p>" * 100)
+        self.assertEqual((size_in, size_out), (1200, os.path.getsize(self.path + ".gz")))
+        self.assertEqual(sorted(os.listdir(self.root)), ["index.html", "index.html.gz"])
+
+    def test_output_is_reproducible(self):
+        gzip_sibling(self.path)
+        with open(self.path + ".gz", 'rb') as f:
+            first = f.read()
+        os.remove(self.path + ".gz")
+        gzip_sibling(self.path)
+        with open(self.path + ".gz", 'rb') as f:
+            self.assertEqual(f.read(), first)
+
+    def test_unchanged_file_is_skipped(self):
+        gzip_sibling(self.path)
+        self.assertTrue(is_gzip_current(self.path, self.path + ".gz"))
+        self.assertIsNone(gzip_sibling(self.path))
+
+    def test_rewritten_file_is_compressed_again(self):
+        gzip_sibling(self.path)
+        self.write(self.path, "<p>changed</p>")
+        os.utime(self.path, ns=(1, 1))
+        self.assertIsNotNone(gzip_sibling(self.path))
+        with gzip.open(self.path + ".gz", 'rt', encoding='utf-8') as f:
+            self.assertEqual(f.read(), "<p>changed</p>")
+
+    def test_stale_output_takes_its_sibling(self):
+        gzip_sibling(self.path)
+        remove_stale_output(self.root, "index.html")
+        self.assertEqual(os.listdir(self.root), [])
+
+
+class TestPrecompressor(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nPosts")
+        self.write(os.path.join(self.static, "index.css"), "body { color: red; }")
+        self.write(os.path.join(self.static, "logo.png"), "not really a png")
+
+    def build(self, **kwargs):
+        precompress = Precompressor()
+        with self.quietly():
+            sync_static_files(self.static, self.dest, precompress=precompress)
+        super().build(precompress=precompress, **kwargs)
+        return precompress.close()
+
+    def gzipped(self):
+        return [name for name in self.files() if name.endswith(".gz")]
+
+    def test_build_writes_siblings_for_text_outputs(self):
+        stats = self.build()
+        self.assertEqual(self.gzipped(), ["blog/index.html.gz", "index.css.gz", "index.html.gz"])
+        self.assertEqual((stats.compressed, stats.unchanged), (3, 0))
+        self.assertLess(stats.ratio, 1.5)
+        self.assertIn("Precompressed: 3 gzipped", stats.summary())
+
+    def test_unchanged_outputs_are_not_compressed_again(self):
+        self.build()
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nNew post")
+        stats = self.build()
+        self.assertEqual((stats.compressed, stats.unchanged), (1, 2))
+
+    def test_skipped_pages_get_missing_siblings(self):
+        self.build()
+        os.remove(os.path.join(self.dest, "index.html.gz"))
+        stats = self.build()
+        self.assertEqual(stats.compressed, 1)
+        self.assertIn("index.html.gz", self.gzipped())
+
+    def test_build_without_precompressor_drops_rewritten_siblings(self):
+        for n, kwargs in enumerate(({}, {"io_threads": 2})):
+            with self.subTest(**kwargs):
+                self.build()
+                self.write(os.path.join(self.content, "blog", "index.md"), f"# Blog\n\nPost {n}")
+                self.write(os.path.join(self.static, "index.css"), f"body {{ z-index: {n}; }}")
+                with self.quietly():
+                    sync_static_files(self.static, self.dest)
+                    generate_pages_recursive(self.content, self.template, self.dest, **kwargs)
+                # The skipped page's sibling still matches it
+                self.assertEqual(self.gzipped(), ["index.html.gz"])
+
+    def test_pipelined_and_parallel_builds_compress_every_page(self):
+        for kwargs in ({"io_threads": 2}, {"jobs": 2}):
+            with self.subTest(**kwargs):
+                self.build(force=True, **kwargs)
+                self.assertEqual(len(self.gzipped()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
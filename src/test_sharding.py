@@ -0,0 +1,123 @@
+import os
+import unittest
+
+from manifest import BuildManifest, MANIFEST_FILENAME
+from sharding import MergeError, Shard, balance, find_shard_dirs, merge_shards, shard_dir
+from sitetest import SiteTestCase
+from staticsync import sync_static_files
+
+
+class TestShard(unittest.TestCase):
+    KEYS = [f"blog/post-{n}/index.md" for n in range(200)] + ["index.md"]
+
+    def test_parse(self):
+        shard = Shard.parse("2/4")
+        self.assertEqual((shard.index, shard.count, str(shard)), (2, 4, "2/4"))
+        for value in ("2", "0/4", "5/4", "a/b", "1/0"):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    Shard.parse(value)
+
+    def test_every_page_has_exactly_one_shard(self):
+        shards = [Shard(index, 3) for index in (1, 2, 3)]
+        owners = [[shard.index for shard in shards if shard.owns(key)] for key in self.KEYS]
+        self.assertTrue(all(len(owner) == 1 for owner in owners))
+        self.assertEqual({owner[0] for owner in owners}, {1, 2, 3})
+        # The split depends only on the path, not on the rest of the tree
+        self.assertEqual(Shard(2, 3).owns("blog/post-7/index.md"), 2 in owners[7])
+
+    def test_balance_by_weight(self):
+        weights = {"a.md": 5.0, "b.md": 3.0, "c.md": 2.0, "d.md": 1.0, "e.md": 1.0}
+        assignment = balance(sorted(weights), 2, weights)
+        loads = [sum(weights[key] for key, index in assignment.items() if index == shard) for shard in (0, 1)]
+        self.assertEqual(sorted(loads), [6.0, 6.0])
+        self.assertEqual(balance(list(reversed(sorted(weights))), 2, weights), assignment)
+
+    def test_unweighted_pages_count_as_the_median(self):
+        assignment = balance(["a.md", "b.md", "new.md"], 2, {"a.md": 4.0, "b.md": 1.0})
+        self.assertEqual(assignment["a.md"], 0)
+        self.assertEqual(assignment["new.md"], assignment["b.md"])
+
+    def test_balanced_shards_partition_the_tree(self):
+        weights = {key: float(len(key) % 7) for key in self.KEYS[::2]}
+        owned = []
+        for index in (1, 2, 3):
+            shard = Shard(index, 3, weights)
+            shard.plan(self.KEYS)
+            owned.append({key for key in self.KEYS if shard.owns(key)})
+        self.assertEqual(sum(len(keys) for keys in owned), len(self.KEYS))
+        self.assertEqual(set().union(*owned), set(self.KEYS))
+
+
+class TestMergeShards(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.template, '<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        for n in range(12):
+            self.write(os.path.join(self.content, "blog", f"post-{n}", "index.md"), f"# Post {n}\n\nText {n}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[Blog](/blog/)")
+
+    def build(self, dest, shard=None):
+        with self.quietly():
+            sync_static_files(self.static, dest)
+        return super().build(dest, "/site/", shard=shard)
+
+    def build_shards(self, count):
+        dirs = [shard_dir(self.dest, index, count) for index in range(1, count + 1)]
+        for index, directory in enumerate(dirs, 1):
+            self.build(directory, Shard(index, count))
+        return dirs
+
+    def test_merge_matches_an_unsharded_build(self):
+        dirs = self.build_shards(3)
+        self.assertEqual(find_shard_dirs(self.dest), dirs)
+        merged = os.path.join(self.root, "merged")
+        self.assertEqual(merge_shards(dirs, merged, dir_path_content=self.content), (13, 1))
+        self.build(self.dest)
+        self.assertEqual(self.outputs(merged, suffix=""), self.outputs(self.dest, suffix=""))
+        manifest = BuildManifest.load(os.path.join(merged, MANIFEST_FILENAME))
+        self.assertEqual(len(manifest.pages), 13)
+        self.assertIsNone(manifest.shard)
+
+    def test_missing_shard(self):
+        dirs = self.build_shards(3)
+        with self.assertRaises(MergeError) as raised:
+            merge_shards(dirs[:2], os.path.join(self.root, "merged"), dir_path_content=self.content)
+        problems = raised.exception.problems
+        self.assertIn("shard 3/3 is missing", problems)
+        self.assertTrue(problems[-1].endswith("pages were built by no shard: " + ", ".join(
+            sorted(key for key in BuildManifest.load(os.path.join(dirs[2], MANIFEST_FILENAME)).pages))))
+
+    def test_page_built_twice(self):
+        dirs = self.build_shards(2)
+        # A stale shard from a different split overlaps the others
+        self.build(shard_dir(self.dest, 1, 3), Shard(1, 3))
+        with self.assertRaises(MergeError) as raised:
+            merge_shards(dirs + [shard_dir(self.dest, 1, 3)], os.path.join(self.root, "merged"))
+        self.assertTrue(any("was built twice" in problem for problem in raised.exception.problems))
+        self.assertTrue(any("3-way split" in problem for problem in raised.exception.problems))
+
+    def test_shards_from_different_inputs(self):
+        first = shard_dir(self.dest, 1, 2)
+        self.build(first, Shard(1, 2))
+        self.write(self.template, "{{ Content }}")
+        self.write(os.path.join(self.content, "new", "index.md"), "# New")
+        second = shard_dir(self.dest, 2, 2)
+        self.build(second, Shard(2, 2))
+        with self.assertRaises(MergeError) as raised:
+            merge_shards([first, second], os.path.join(self.root, "merged"))
+        problems = "\n".join(raised.exception.problems)
+        self.assertIn("different content tree", problems)
+        self.assertIn("different settings", problems)
+
+    def test_unsharded_rebuild_forgets_the_shard(self):
+        self.build(self.dest, Shard(1, 2))
+        self.build(self.dest)
+        manifest = BuildManifest.load(os.path.join(self.dest, MANIFEST_FILENAME))
+        self.assertIsNone(manifest.shard)
+        self.assertEqual(len(manifest.pages), 13)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import unittest
+from unittest import mock
+
+import staging
+from pagewriter import PageWriter
+from sitetest import SiteTestCase
+from staging import StagedOutput, exchange_paths, remove_tree_in_background
+from textnode import PageBuildError, generate_pages_recursive
+
+
+class TestStaging(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.staged = StagedOutput(self.dest)
+
+    def tearDown(self):
+        self.staged.wait()
+
+    def build(self, text, clean=False):
+        build_dir = self.staged.prepare(clean)
+        output = PageWriter(os.path.join(build_dir, "index.html"))
+        output.write(text)
+        output.commit()
+        kept_previous = self.staged.publish()
+        self.staged.wait()
+        return kept_previous
+
+    def test_first_build_publishes_staging(self):
+        self.assertFalse(self.build("one"))
+        self.assertEqual(self.read("index.html"), "one")
+        self.assertEqual(sorted(os.listdir(self.root)), ["docs"])
+
+    def test_live_tree_is_untouched_until_publish(self):
+        self.build("one")
+        output = PageWriter(os.path.join(self.staged.prepare(), "index.html"))
+        output.write("two")
+        output.commit()
+        self.assertEqual(self.read("index.html"), "one")
+
+    def test_staging_shares_unchanged_files_with_live_tree(self):
+        self.write(os.path.join(self.dest, "blog", "post.html"), "post")
+        build_dir = self.staged.prepare()
+        self.assertTrue(os.path.samefile(os.path.join(self.dest, "blog", "post.html"),
+                                         os.path.join(build_dir, "blog", "post.html")))
+
+    def test_publish_keeps_previous_build_for_rollback(self):
+        self.build("one")
+        self.assertTrue(self.build("two"))
+        self.assertEqual(self.read("index.html"), "two")
+        self.assertEqual(self.read(os.path.join(self.staged.previous_dir, "index.html")), "one")
+        self.staged.rollback()
+        self.assertEqual(self.read("index.html"), "one")
+        self.staged.rollback()
+        self.assertEqual(self.read("index.html"), "two")
+
+    def test_old_rollback_copy_is_removed(self):
+        self.build("one")
+        self.build("two")
+        self.build("three")
+        self.assertEqual(self.read(os.path.join(self.staged.previous_dir, "index.html")), "two")
+        self.assertEqual(sorted(os.listdir(self.root)), ["docs", "docs.prev"])
+
+    def test_failed_build_is_not_continued(self):
+        self.build("one")
+        output = PageWriter(os.path.join(self.staged.prepare(), "index.html"))
+        output.write("half built")
+        output.commit()
+        # The build failed before publishing; the next one starts from the live tree
+        build_dir = self.staged.prepare()
+        self.assertEqual(self.read(os.path.join(build_dir, "index.html")), "one")
+
+    def test_reverted_page_after_failed_build(self):
+        contact = os.path.join(self.content, "contact", "index.md")
+        broken = os.path.join(self.content, "zz", "index.md")
+        self.write(self.template, "{{ Content }}")
+        self.write(contact, "# Contact\n\nMail us")
+
+        def build():
+            build_dir = self.staged.prepare()
+            with self.quietly():
+                generate_pages_recursive(self.content, self.template, build_dir)
+            self.staged.publish()
+            self.staged.wait()
+
+        build()
+        published = self.read("contact", "index.html")
+        self.write(contact, "# Contact\n\nMail us\n\nOr don't")
+        self.write(broken, "no title")
+        with self.assertRaises(PageBuildError):
+            build()
+        self.write(contact, "# Contact\n\nMail us")
+        os.remove(broken)
+        build()
+        self.assertEqual(self.read("contact", "index.html"), published)
+
+    def test_clean_build_starts_empty(self):
+        self.write(os.path.join(self.dest, "stale.html"), "stale")
+        self.assertEqual(os.listdir(self.staged.prepare(clean=True)), [])
+
+    def test_rollback_without_previous_build(self):
+        self.build("one")
+        with self.assertRaises(FileNotFoundError):
+            self.staged.rollback()
+
+    def test_exchange_without_renameat2(self):
+        self.write(os.path.join(self.root, "a", "f"), "a")
+        self.write(os.path.join(self.root, "b", "f"), "b")
+        with mock.patch.object(staging, "_renameat2", None):
+            exchange_paths(os.path.join(self.root, "a"), os.path.join(self.root, "b"))
+        self.assertEqual(self.read(os.path.join(self.root, "a", "f")), "b")
+        self.assertEqual(sorted(os.listdir(self.root)), ["a", "b"])
+
+    def test_remove_tree_in_background(self):
+        path = os.path.join(self.root, "old")
+        self.write(os.path.join(path, "f"), "x")
+        remover = remove_tree_in_background(path)
+        # The tree is out of the way before the removal finishes
+        self.assertFalse(os.path.exists(path))
+        remover.wait()
+        self.assertEqual(os.listdir(self.root), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
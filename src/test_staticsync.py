@@ -0,0 +1,87 @@
+import os
+import unittest
+
+from sitetest import SiteTestCase
+from staticsync import is_file_current, sync_static_files, transfer_file
+
+
+class TestStaticSync(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png-bytes")
+
+    def sync(self, **kwargs):
+        with self.quietly():
+            return sync_static_files(self.static, self.dest, **kwargs)
+
+    def test_first_sync_copies_everything(self):
+        stats = self.sync()
+        self.assertEqual(stats.transferred, 2)
+        self.assertEqual(stats.transferred_bytes, len("body {}") + len("png-bytes"))
+        self.assertEqual(self.read("images", "a.png"), "png-bytes")
+
+    def test_second_sync_transfers_nothing(self):
+        self.sync()
+        stats = self.sync()
+        self.assertEqual((stats.transferred, stats.unchanged), (0, 2))
+
+    def test_changed_file_is_transferred(self):
+        self.sync()
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        stats = self.sync()
+        self.assertEqual((stats.transferred, stats.unchanged), (1, 1))
+        self.assertEqual(self.read("index.css"), "body { color: red }")
+
+    def test_checksum_ignores_touched_file(self):
+        self.sync()
+        source = os.path.join(self.static, "index.css")
+        os.utime(source, ns=(0, 0))
+        self.assertEqual(self.sync(checksum=True).transferred, 0)
+        self.assertEqual(self.sync().transferred, 1)
+
+    def test_deleted_source_is_removed(self):
+        self.sync()
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        stats = self.sync()
+        self.assertEqual(stats.removed, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+
+    def test_unrelated_outputs_are_kept(self):
+        self.sync()
+        page = os.path.join(self.dest, "index.html")
+        self.write(page, "<html></html>")
+        self.sync()
+        self.assertTrue(os.path.exists(page))
+
+    def test_hardlink_mode(self):
+        self.sync(link_mode="hardlink")
+        source = os.stat(os.path.join(self.static, "index.css"))
+        dest = os.stat(os.path.join(self.dest, "index.css"))
+        self.assertEqual(source.st_ino, dest.st_ino)
+
+    def test_reflink_mode_falls_back_to_copy(self):
+        stats = self.sync(link_mode="reflink")
+        self.assertEqual(stats.transferred, 2)
+        self.assertEqual(self.read("index.css"), "body {}")
+
+    def test_invalid_link_mode(self):
+        with self.assertRaises(ValueError):
+            self.sync(link_mode="symlink")
+
+    def test_transfer_replaces_instead_of_writing_through(self):
+        dest = os.path.join(self.root, "dest.css")
+        other = os.path.join(self.root, "other.css")
+        self.write(dest, "old")
+        os.link(dest, other)
+        transfer_file(os.path.join(self.static, "index.css"), dest)
+        self.assertEqual(self.read(dest), "body {}")
+        self.assertEqual(self.read(other), "old")
+
+    def test_is_file_current_missing_dest(self):
+        source = os.path.join(self.static, "index.css")
+        self.assertFalse(is_file_current(source, os.path.join(self.dest, "missing.css")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import io
+import unittest
+
+from assets import AssetMap
+from template import Template, resolve_attribute_urls
+from urls import UrlResolver
+
+
+class TestResolveAttributeUrls(unittest.TestCase):
+    def test_root_basepath_is_unchanged(self):
+        html = '<a href="/x"><img src="/y.png">'
+        self.assertEqual(resolve_attribute_urls(html, UrlResolver("/")), html)
+
+    def test_rewrites_href_and_src(self):
+        html = '<a href="/x"><img src="/y.png"><a href="https://boot.dev"><script src="//cdn.example.com/a.js">'
+        self.assertEqual(
+            resolve_attribute_urls(html, UrlResolver("/site/")),
+            '<a href="/site/x"><img src="/site/y.png"><a href="https://boot.dev">'
+            '<script src="//cdn.example.com/a.js">',
+        )
+
+    def test_other_attributes_are_unchanged(self):
+        html = '<a data-href="/x" title="/y">'
+        self.assertEqual(resolve_attribute_urls(html, UrlResolver("/site/")), html)
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile_splits_segments_and_slots(self):
+        template = Template.compile("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(template.segments, ["<title>", "</title><main>", "</main>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_render(self):
+        template = Template.compile("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(
+            template.render({"Title": "Hi", "Content": "<p>Body</p>"}),
+            "<title>Hi</title><main><p>Body</p></main>",
+        )
+
+    def test_repeated_placeholder(self):
+        template = Template.compile("{{ Title }} | {{ Title }}")
+        self.assertEqual(template.render({"Title": "A"}), "A | A")
+
+    def test_unknown_placeholder_is_left_alone(self):
+        template = Template.compile("<p>{{ Author }}</p>{{ Content }}")
+        self.assertEqual(template.render({"Content": "x"}), "<p>{{ Author }}</p>x")
+
+    def test_no_placeholders(self):
+        template = Template.compile("<p>static</p>")
+        self.assertEqual(template.slots, [])
+        self.assertEqual(template.render({}), "<p>static</p>")
+
+    def test_basepath_rewritten_at_compile_time(self):
+        template = Template.compile('<link href="/index.css">{{ Content }}', "/site/")
+        self.assertEqual(template.segments[0], '<link href="/site/index.css">')
+        # Values are inserted verbatim; the template never rescans them
+        self.assertEqual(
+            template.render({"Content": '<a href="/x">'}),
+            '<link href="/site/index.css"><a href="/x">',
+        )
+
+    def test_fingerprinted_assets_resolved_at_compile_time(self):
+        assets = AssetMap({"/index.css": "/index.0123456789ab.css"})
+        template = Template.compile('<link href="/index.css">{{ Content }}', resolver=UrlResolver("/site/", assets))
+        self.assertEqual(template.segments[0], '<link href="/site/index.0123456789ab.css">')
+
+    def test_iterable_value_is_streamed(self):
+        template = Template.compile("<main>{{ Content }}</main>")
+        buffer = io.StringIO()
+        template.render_to(buffer, {"Content": iter(["<p>", "a", "</p>"])})
+        self.assertEqual(buffer.getvalue(), "<main><p>a</p></main>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
+import io
 import unittest
 
-from textnode import TextNode, TextType, BlockType, split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks, block_to_block_type, text_to_children, markdown_to_html_node, extract_title, generate_page
+from textnode import TextNode, TextType, BlockType, split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks, block_to_block_type, text_to_children, markdown_to_html_node, extract_title, generate_page, iter_blocks, iter_markdown_html, extract_title_from_lines
+from urls import DEFERRED_RESOLVER, UrlResolver
 
 
 class TestTextNode(unittest.TestCase):
@@ -29,6 +31,23 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("Text", TextType.LINK, url="http://a.com")
         self.assertEqual(node1, node2)
 
+    def test_hash_matches_eq(self):
+        node1 = TextNode("Text", TextType.LINK, url="http://a.com")
+        node2 = TextNode("Text", TextType.LINK, url="http://a.com")
+        self.assertEqual(hash(node1), hash(node2))
+        self.assertEqual(len({node1, node2}), 1)
+
+    def test_usable_as_cache_key(self):
+        cache = {TextNode("a", TextType.BOLD): "<b>a</b>"}
+        self.assertEqual(cache[TextNode("a", TextType.BOLD)], "<b>a</b>")
+
+    def test_not_equal_other_type(self):
+        self.assertNotEqual(TextNode("a", TextType.TEXT), "a")
+
+    def test_slots(self):
+        node = TextNode("a", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 
 class TestSplitNodesDelimiter(unittest.TestCase):
     def test_split_code_delimiter(self):
@@ -781,6 +800,80 @@ class TestTextToTextnodes(unittest.TestCase):
         ]
         self.assertEqual(nodes, expected)
 
+    def test_text_to_textnodes_unclosed_delimiter_raises(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("This is **unclosed bold")
+        with self.assertRaises(ValueError):
+            text_to_textnodes("A lone _ underscore")
+
+    def test_text_to_textnodes_link_url_with_underscores(self):
+        text = "See [the docs](https://example.com/some_page_here) now"
+        nodes = text_to_textnodes(text)
+        expected = [
+            TextNode("See ", TextType.TEXT),
+            TextNode("the docs", TextType.LINK, "https://example.com/some_page_here"),
+            TextNode(" now", TextType.TEXT),
+        ]
+        self.assertEqual(nodes, expected)
+
+    def test_text_to_textnodes_code_is_literal(self):
+        text = "Use `a*b*c` here"
+        nodes = text_to_textnodes(text)
+        expected = [
+            TextNode("Use ", TextType.TEXT),
+            TextNode("a*b*c", TextType.CODE),
+            TextNode(" here", TextType.TEXT),
+        ]
+        self.assertEqual(nodes, expected)
+
+    def test_text_to_textnodes_bold_inside_link(self):
+        text = "Read [**the** docs](/docs) first"
+        nodes = text_to_textnodes(text)
+        expected = [
+            TextNode("Read ", TextType.TEXT),
+            TextNode(
+                "**the** docs",
+                TextType.LINK,
+                "/docs",
+                [TextNode("the", TextType.BOLD), TextNode(" docs", TextType.TEXT)],
+            ),
+            TextNode(" first", TextType.TEXT),
+        ]
+        self.assertEqual(nodes, expected)
+
+    def test_text_to_textnodes_delimiter_closing_after_link(self):
+        self.assertEqual(
+            text_to_textnodes("[*)]()x)*"),
+            [TextNode("[", TextType.TEXT), TextNode(")]()x)", TextType.ITALIC)],
+        )
+        self.assertEqual(
+            text_to_textnodes("/[`](/[`) "),
+            [
+                TextNode("/[", TextType.TEXT),
+                TextNode("](/[", TextType.CODE),
+                TextNode(") ", TextType.TEXT),
+            ],
+        )
+        self.assertEqual(
+            text_to_textnodes("[x](*)x_*(!]"),
+            [
+                TextNode("[x](", TextType.TEXT),
+                TextNode(")x_", TextType.ITALIC),
+                TextNode("(!]", TextType.TEXT),
+            ],
+        )
+        self.assertEqual(
+            text_to_textnodes("![a*](x)y*"),
+            [TextNode("![a", TextType.TEXT), TextNode("](x)y", TextType.ITALIC)],
+        )
+
+    def test_text_to_textnodes_many_links(self):
+        text = " ".join(f"[link {i}](/page/{i})" for i in range(500))
+        nodes = text_to_textnodes(text)
+        links = [node for node in nodes if node.text_type == TextType.LINK]
+        self.assertEqual(len(links), 500)
+        self.assertEqual(links[-1], TextNode("link 499", TextType.LINK, "/page/499"))
+
 
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -856,6 +949,60 @@ Final paragraph
             ],
         )
 
+    def test_markdown_to_blocks_fence_keeps_blank_lines(self):
+        md = "Intro\n\n```\nfirst()\n\n\nsecond()\n```\n\nOutro"
+        blocks = markdown_to_blocks(md)
+        self.assertEqual(blocks, ["Intro", "```\nfirst()\n\n\nsecond()\n```", "Outro"])
+
+    def test_markdown_to_blocks_one_line_fence(self):
+        md = "```code```\n\nNext"
+        self.assertEqual(markdown_to_blocks(md), ["```code```", "Next"])
+
+    def test_markdown_to_blocks_unclosed_fence_splits_at_blank_lines(self):
+        md = "```\ncode\n\nmore text"
+        self.assertEqual(markdown_to_blocks(md), ["```\ncode", "more text"])
+
+
+class TestStreamingBlocks(unittest.TestCase):
+    def test_iter_blocks_from_file_handle(self):
+        f = io.StringIO("# Title\n\n- a\n- b\n\n```\nx\n\ny\n```\n")
+        self.assertEqual(
+            list(iter_blocks(f)),
+            [
+                ("# Title", BlockType.HEADING),
+                ("- a\n- b", BlockType.UNORDERED_LIST),
+                ("```\nx\n\ny\n```", BlockType.CODE),
+            ],
+        )
+
+    def test_iter_blocks_is_lazy(self):
+        def lines():
+            yield "First block\n"
+            yield "\n"
+            raise AssertionError("read past the first block")
+
+        self.assertEqual(next(iter_blocks(lines())), ("First block", BlockType.PARAGRAPH))
+
+    def test_iter_markdown_html_matches_markdown_to_html_node(self):
+        md = "# Title\n\nSome **bold** [link](/x)\n\n> quote\n\n1. one\n2. two\n\n```\ncode\n```"
+        streamed = "".join(iter_markdown_html(io.StringIO(md)))
+        self.assertEqual(streamed, markdown_to_html_node(md).to_html())
+
+    def test_fenced_code_with_blank_lines_renders_as_one_block(self):
+        md = "```\na\n\nb\n```"
+        self.assertEqual(
+            "".join(iter_markdown_html(io.StringIO(md))),
+            "<div><pre><code>a\n\nb\n</code></pre></div>",
+        )
+
+    def test_extract_title_from_lines_stops_at_first_h1(self):
+        def lines():
+            yield "intro\n"
+            yield "# The Title\n"
+            raise AssertionError("read past the title")
+
+        self.assertEqual(extract_title_from_lines(lines()), "The Title")
+
 
 class TestBlockToBlockType(unittest.TestCase):
     def test_heading_h1(self):
@@ -1145,6 +1292,31 @@ This paragraph has **bold**, *italic*, `code`, [link](https://example.com), and
             "<div><h1>This is a <b>bold</b> heading</h1></div>",
         )
 
+    def test_link_with_formatted_label(self):
+        md = "Go to [the `main` page](/main)."
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            '<div><p>Go to <a href="/main">the <code>main</code> page</a>.</p></div>',
+        )
+
+    def test_resolver_only_touches_link_and_image_urls(self):
+        md = 'See [home](/) and ![logo](/logo.png)\n\n```\n<a href="/raw">code</a>\n```'
+        node = markdown_to_html_node(md, resolver=UrlResolver("/site/"))
+        self.assertEqual(
+            node.to_html(),
+            '<div><p>See <a href="/site/">home</a> and <img src="/site/logo.png" alt="logo"></p>'
+            '<pre><code><a href="/raw">code</a>\n</code></pre></div>',
+        )
+
+    def test_nul_in_source_cannot_forge_deferred_urls(self):
+        md = 'Text with \x00/x\x00 and [home](/)'
+        html = "".join(iter_markdown_html(md.split('\n'), resolver=DEFERRED_RESOLVER))
+        self.assertEqual(
+            UrlResolver("/site/").specialize(html),
+            '<div><p>Text with \ufffd/x\ufffd and <a href="/site/">home</a></p></div>',
+        )
+
 
 class TestExtractTitle(unittest.TestCase):
     def test_extract_title_basic(self):
@@ -0,0 +1,89 @@
+import json
+import os
+import unittest
+
+from sitetest import SiteTestCase
+from textnode import markdown_to_html_node, text_to_children
+from timings import NULL_TIMER, BuildTimings, StageTimer, percentile, summarize, timed
+
+
+class TestTimings(unittest.TestCase):
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 90), 7)
+
+    def test_summarize(self):
+        summary = summarize([3.0, 1.0, 2.0])
+        self.assertEqual(summary["count"], 3)
+        self.assertEqual(summary["total"], 6.0)
+        self.assertEqual(summary["max"], 3.0)
+        self.assertEqual(summary["p50"], 2.0)
+
+    def test_summarize_empty(self):
+        self.assertEqual(summarize([]), {"count": 0})
+
+    def test_stage_accumulates(self):
+        timer = StageTimer()
+        for _ in range(3):
+            with timer.stage("inline"):
+                pass
+        timer.add("inline", 1.0)
+        self.assertGreaterEqual(timer.stages["inline"], 1.0)
+
+    def test_timed_is_identity_when_off(self):
+        self.assertIs(timed(NULL_TIMER, "inline", text_to_children), text_to_children)
+
+    def test_markdown_to_html_node_stages(self):
+        timer = StageTimer()
+        markdown = "# Title\n\nSome **bold** text\n\n- a\n- b"
+        node = markdown_to_html_node(markdown, timer)
+        self.assertEqual(node, markdown_to_html_node(markdown))
+        self.assertEqual(sorted(timer.stages), ["block_type", "blocks", "inline"])
+
+    def test_report_slowest(self):
+        timings = BuildTimings()
+        timings.add_page("a.md", {"read": 0.1}, 0.1)
+        timings.add_page("b.md", {"read": 0.3}, 0.3)
+        timings.add_page("c.md", {"read": 0.2}, 0.2)
+        report = timings.report(slowest=2)
+        self.assertEqual([page["source"] for page in report["slowest"]], ["b.md", "c.md"])
+        self.assertEqual(report["page_stages"]["read"]["count"], 3)
+
+
+class TestBuildTimings(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for rel_path, markdown in (("index.md", "# Home\n\n[Blog](/blog)"), ("blog/index.md", "# Blog\n\n`x`")):
+            self.write(os.path.join(self.content, rel_path), markdown)
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+
+    def build(self, dest, **kwargs):
+        return super().build(dest, "/site/", **kwargs)
+
+    def test_timed_build_matches_untimed(self):
+        plain = os.path.join(self.root, "plain")
+        timed_dest = os.path.join(self.root, "timed")
+        timings = BuildTimings()
+        self.build(plain)
+        self.build(timed_dest, timings=timings)
+        self.assertEqual(self.outputs(plain), self.outputs(timed_dest))
+        self.assertEqual(len(timings.pages), 2)
+        self.assertIn("scan", timings.stages)
+        self.assertIn("pages", timings.stages)
+
+    def test_report_is_json(self):
+        timings = BuildTimings()
+        self.build(self.dest, timings=timings)
+        report_path = os.path.join(self.root, "report.json")
+        timings.write(report_path)
+        with open(report_path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        self.assertEqual(report["page_count"], 2)
+        for stage in ("read", "blocks", "block_type", "inline", "render", "template", "write"):
+            self.assertIn(stage, report["page_stages"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from assets import AssetMap
+from urls import DEFERRED_RESOLVER, UrlResolver
+
+
+class TestUrlResolver(unittest.TestCase):
+    def test_root_relative_urls_get_basepath(self):
+        resolver = UrlResolver("/site/")
+        self.assertEqual(resolver.resolve("/"), "/site/")
+        self.assertEqual(resolver.resolve("/blog/post"), "/site/blog/post")
+
+    def test_other_urls_are_unchanged(self):
+        resolver = UrlResolver("/site/")
+        for url in ("https://example.com/", "//cdn.example.com/a.js", "images/a.png", "#top", ""):
+            self.assertEqual(resolver.resolve(url), url)
+
+    def test_root_basepath_is_a_no_op(self):
+        self.assertEqual(UrlResolver().resolve("/blog"), "/blog")
+
+    def test_resolved_urls_are_remembered(self):
+        resolver = UrlResolver("/site/")
+        resolver.resolve("/a")
+        resolver.resolve("/a")
+        self.assertEqual(resolver.resolved, {"/a": "/site/a"})
+
+    def test_fingerprinted_assets_are_looked_up_before_the_basepath(self):
+        resolver = UrlResolver("/site/", AssetMap({"/index.css": "/index.1.css"}))
+        self.assertEqual(resolver.resolve("/index.css"), "/site/index.1.css")
+        self.assertEqual(resolver.resolve("/index.css#top"), "/site/index.1.css#top")
+        self.assertEqual(resolver.resolve("/other.css"), "/site/other.css")
+        self.assertEqual(resolver.resolve("index.css"), "index.css")
+        self.assertNotEqual(resolver.key, UrlResolver("/site/").key)
+
+
+class TestDeferredResolver(unittest.TestCase):
+    def test_only_root_relative_urls_are_marked(self):
+        self.assertEqual(DEFERRED_RESOLVER.resolve("/blog"), "\x00/blog\x00")
+        for url in ("https://example.com/", "//cdn.example.com/a.js", "images/a.png", "#top", ""):
+            self.assertEqual(DEFERRED_RESOLVER.resolve(url), url)
+
+    def test_specialize_resolves_marked_urls_per_basepath(self):
+        html = f'<a href="{DEFERRED_RESOLVER.resolve("/")}">home</a><img src="{DEFERRED_RESOLVER.resolve("/a.png")}">'
+        self.assertEqual(UrlResolver("/site/").specialize(html), '<a href="/site/">home</a><img src="/site/a.png">')
+        self.assertEqual(UrlResolver().specialize(html), '<a href="/">home</a><img src="/a.png">')
+
+    def test_specialize_without_marks_is_a_no_op(self):
+        html = '<p>href="/x"</p>'
+        self.assertIs(UrlResolver("/site/").specialize(html), html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,35 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from enum import Enum
+from functools import partial
+import asyncio
+import hashlib
+import io
+import multiprocessing
 import re
 import os
+import time
+
+try:
+    from blockcache import BlockCache, block_key
+    from pagewriter import PageWriter
+    from pipeline import DEFAULT_QUEUE_SIZE, MeasuredQueue, PipelineStats
+    from precompress import remove_gzip_sibling
+    from template import Template
+    from timings import NULL_TIMER, StageTimer, timed
+    from urls import DEFERRED_RESOLVER, URL_MARKER, UrlResolver
+except ImportError:
+    from .blockcache import BlockCache, block_key
+    from .pagewriter import PageWriter
+    from .pipeline import DEFAULT_QUEUE_SIZE, MeasuredQueue, PipelineStats
+    from .precompress import remove_gzip_sibling
+    from .template import Template
+    from .timings import NULL_TIMER, StageTimer, timed
+    from .urls import DEFERRED_RESOLVER, URL_MARKER, UrlResolver
+
+# Bump whenever a change to the generator alters the HTML it produces, so
+# incremental builds know to regenerate every page.
+GENERATOR_VERSION = "6"
+
 
 class TextType(Enum):
     TEXT = "text"
@@ -20,20 +49,45 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
 
 
+class PageBuildError(Exception):
+    """Raised when generating a single page fails; carries the offending source path."""
+
+    def __init__(self, source_path, message):
+        super().__init__(source_path, message)
+        self.source_path = source_path
+        self.message = message
+
+    def __str__(self):
+        return f"failed to generate page from {self.source_path}: {self.message}"
+
+
 class TextNode:
-    def __init__(self, text, text_type, url=None):
+    __slots__ = ("text", "text_type", "url", "children")
+
+    def __init__(self, text, text_type, url=None, children=None):
         self.text = text
         self.text_type = text_type
         self.url = url
+        # Parsed inline content of a link label, when it has any formatting
+        self.children = children
 
     def __eq__(self, other):
+        if not isinstance(other, TextNode):
+            return NotImplemented
         return (
             self.text == other.text
             and self.text_type == other.text_type
             and self.url == other.url
+            and self.children == other.children
         )
 
+    def __hash__(self):
+        children = tuple(self.children) if self.children is not None else None
+        return hash((self.text, self.text_type, self.url, children))
+
     def __repr__(self):
+        if self.children is not None:
+            return f"TextNode({self.text}, {self.text_type}, {self.url}, children: {self.children})"
         return f"TextNode({self.text}, {self.text_type}, {self.url})"
 
 
@@ -143,46 +197,164 @@ def split_nodes_link(old_nodes):
     return new_nodes
 
 
+# One alternation covering every inline construct. At any position the
+# first alternative that matches wins, so "**" is tried before "*", and a
+# delimiter that is never closed falls through to the "unclosed" group.
+INLINE_PATTERN = re.compile(
+    r"(?=[*_`!\[])"  # cheap guard so plain text is skipped quickly
+    r"(?:\*\*(?P<bold>.*?)\*\*"
+    r"|\*(?!\*)(?P<italic_star>.*?)\*"
+    r"|_(?P<italic_underscore>.*?)_"
+    r"|`(?P<code>.*?)`"
+    r"|!\[(?P<alt>[^\[\]]*)\]\((?P<src>[^\(\)]*)\)"
+    r"|\[(?P<label>[^\[\]]*)\]\((?P<href>[^\(\)]*)\)"
+    r"|(?P<unclosed>\*\*|[*_`]))",
+    re.DOTALL,
+)
+
+INLINE_DELIMITER_TYPES = {
+    "bold": TextType.BOLD,
+    "italic_star": TextType.ITALIC,
+    "italic_underscore": TextType.ITALIC,
+    "code": TextType.CODE,
+}
+
+
 def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    """
+    Split inline markdown into TextNodes in a single left-to-right scan.
+
+    Bold, italic and code spans take their content literally. Links and
+    images are recognised wherever they start, and a link label is parsed
+    again for bold/italic/code, so "[**docs**](/docs)" yields a LINK node
+    whose children hold the formatted label. A delimiter inside a link or
+    image that only closes after it still pairs up as it would without
+    the link ("[*)]()x)*" is "[" then italic ")]()x)"), in which case the
+    brackets stay plain text. Raises ValueError when a delimiter is never
+    closed.
+    """
+    nodes = []
+    append = nodes.append
+    text_start = 0
+    pos = 0
+    # Links and images holding a delimiter, newest last, as
+    # (start, end, len(nodes) and text_start before them), so the scan can
+    # back up and read them as plain text if that delimiter is left open
+    candidates = []
+    rejected = set()
+
+    while True:
+        match = INLINE_PATTERN.search(text, pos)
+        if match is None:
+            break
+        kind = match.lastgroup
+        start, end = match.span()
+        pos = end
+
+        if kind == "unclosed":
+            if not candidates:
+                raise ValueError("Invalid markdown, formatted section not closed")
+            # Prefer the newest one holding this delimiter; failing that, a
+            # delimiter freed from the newest may be what swallows it
+            delimiter = match.group(kind)
+            index = len(candidates) - 1
+            while index > 0 and delimiter not in text[candidates[index][0]:candidates[index][1]]:
+                index -= 1
+            if delimiter not in text[candidates[index][0]:candidates[index][1]]:
+                index = len(candidates) - 1
+            start, _, node_count, text_start = candidates[index]
+            del candidates[index:]
+            del nodes[node_count:]
+            rejected.add(start)
+            # Past "[" or "![", which are now plain text
+            pos = start + (2 if text[start] == "!" else 1)
+            continue
+
+        if kind in ("href", "src"):
+            if start in rejected:
+                pos = start + (2 if kind == "src" else 1)
+                continue
+            if kind == "href":
+                label = match.group("label")
+                children = None
+                if INLINE_PATTERN.search(label):
+                    try:
+                        children = text_to_textnodes(label)
+                    except ValueError:
+                        # The label's delimiter closes in the text after it
+                        pos = start + 1
+                        continue
+                    # Only keep a parsed label when it actually has formatting
+                    if all(child.text_type == TextType.TEXT for child in children):
+                        children = None
+                node = TextNode(label, TextType.LINK, match.group("href"), children)
+            else:
+                node = TextNode(match.group("alt"), TextType.IMAGE, match.group("src"))
+            span = match.group()
+            if "*" in span or "_" in span or "`" in span:
+                candidates.append((start, end, len(nodes), text_start))
+            if start > text_start:
+                append(TextNode(text[text_start:start], TextType.TEXT))
+            append(node)
+        else:
+            if start > text_start:
+                append(TextNode(text[text_start:start], TextType.TEXT))
+            content = match.group(kind)
+            if content:
+                append(TextNode(content, INLINE_DELIMITER_TYPES[kind]))
+        text_start = end
+
+    if len(text) > text_start:
+        append(TextNode(text[text_start:], TextType.TEXT))
     return nodes
 
 
 def markdown_to_blocks(markdown):
-    lines = markdown.split('\n')
-    blocks = []
+    return list(iter_block_text(markdown.split('\n')))
+
+
+def iter_block_text(lines, fences=True):
+    """
+    Group lines into blocks separated by blank lines, yielding each block
+    as soon as it ends. lines may be any iterable of strings, such as an
+    open file, so only the current block is ever held in memory.
+
+    A block that opens with a ``` fence runs until the closing fence, so
+    blank lines inside code blocks don't split them. An unclosed fence
+    falls back to splitting at blank lines, as does fences=False.
+    """
     current_block = []
-    
+    append = current_block.append
+    in_fence = False
+
     for line in lines:
         stripped_line = line.strip()
-        
-        # If we encounter an empty line and we have content in current_block
-        if not stripped_line and current_block:
-            # Join the current block and add it to blocks
-            blocks.append('\n'.join(current_block))
-            current_block = []
+
+        if in_fence:
+            append(line.rstrip('\n'))
+            if stripped_line.endswith('```'):
+                in_fence = False
         elif stripped_line:
-            # Add non-empty line to current block
-            current_block.append(line)
-    
-    # Don't forget the last block if there's content
-    if current_block:
-        blocks.append('\n'.join(current_block))
-    
-    # Clean up blocks (remove leading/trailing whitespace)
-    result = []
-    for block in blocks:
-        stripped_block = block.strip()
-        if stripped_block:
-            result.append(stripped_block)
-    
-    return result
+            if fences and not current_block and stripped_line.startswith('```'):
+                # A one-line fence such as ```code``` opens and closes at once
+                in_fence = len(stripped_line) < 6 or not stripped_line.endswith('```')
+            append(line.rstrip('\n'))
+        elif current_block:
+            # A blank line ends the current block
+            yield '\n'.join(current_block).strip()
+            current_block.clear()
+
+    if in_fence:
+        # Never closed: treat the fence's lines as ordinary text
+        yield from iter_block_text(current_block, fences=False)
+    elif current_block:
+        yield '\n'.join(current_block).strip()
+
+
+def iter_blocks(lines):
+    """Yield (block, BlockType) pairs from an iterable of lines; see iter_block_text."""
+    for block in iter_block_text(lines):
+        yield block, block_to_block_type(block)
 
 
 def block_to_block_type(block):
@@ -219,26 +391,25 @@ def block_to_block_type(block):
     return BlockType.PARAGRAPH
 
 
-def text_to_children(text):
-    try:
-        from htmlnode import text_node_to_html_node
-    except ImportError:
-        from .htmlnode import text_node_to_html_node
-    
+def text_to_children(text, resolver=None):
     text_nodes = text_to_textnodes(text)
     children = []
     
     for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
+        html_node = text_node_to_html_node(text_node, resolver)
         children.append(html_node)
     
     return children
 
 
 def extract_title(markdown):
-    lines = markdown.split('\n')
-    
+    return extract_title_from_lines(markdown.split('\n'))
+
+
+def extract_title_from_lines(lines):
+    """extract_title over an iterable of lines; stops reading at the first h1."""
     for line in lines:
+        line = line.rstrip('\n')
         stripped_line = line.strip()
         
         # Check if line starts with exactly "# " (h1) and not "## " (h2+)
@@ -251,172 +422,816 @@ def extract_title(markdown):
     raise ValueError("No h1 header found in markdown")
 
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
+class BuildTarget:
+    """
+    One output of a build: the directory pages are written to, the
+    basepath it is served from and the template compiled for it.
+
+    Pages are rendered once with their root-relative URLs left marked
+    (see urls.DeferredResolver); each target's resolver then specializes
+    that HTML for its basepath and fingerprinted assets, which is a split
+    and a join.
+    """
+
+    __slots__ = ("dest_dir", "basepath", "template", "resolver")
+
+    def __init__(self, dest_dir, basepath, template_text, assets=None):
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.resolver = UrlResolver(basepath, assets)
+        self.template = Template.compile(template_text, resolver=self.resolver)
+
+    def render(self, title, body):
+        """The whole page for a rendered body."""
+        return self.template.render({'Title': title, 'Content': self.resolver.specialize(body)})
+
+    def __repr__(self):
+        return f"BuildTarget(dest_dir={self.dest_dir!r}, basepath={self.basepath!r})"
+
+
+def generate_page(from_path, template_path, dest_path, basepath="/", assets=None):
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    
-    # Read the markdown file
-    with open(from_path, 'r', encoding='utf-8') as f:
-        markdown_content = f.read()
-    
-    # Read the template file
     with open(template_path, 'r', encoding='utf-8') as f:
-        template_content = f.read()
-    
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
-    
-    # Extract the title
-    title = extract_title(markdown_content)
-    
-    # Replace placeholders in template
-    final_html = template_content.replace('{{ Title }}', title)
-    final_html = final_html.replace('{{ Content }}', html_content)
-    
-    # Replace href="/ and src="/ with basepath
-    final_html = final_html.replace('href="/', f'href="{basepath}')
-    final_html = final_html.replace('src="/', f'src="{basepath}')
-    
-    # Create destination directory if it doesn't exist
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir and not os.path.exists(dest_dir):
-        os.makedirs(dest_dir)
-    
-    # Write the final HTML to the destination file
-    with open(dest_path, 'w', encoding='utf-8') as f:
-        f.write(final_html)
+        target = BuildTarget(os.path.dirname(dest_path), basepath, f.read(), assets)
+    _build_page(from_path, ((target, dest_path),))
+
+
+def _build_page(from_path, outputs, timer=NULL_TIMER, cache=None, parse_cache=None, source_hash=None):
+    """
+    Build one page for each of its (target, dest_path) outputs, rendering
+    it only once. Returns a tuple with, per output, False if it was already
+    up to date on disk.
+    """
+    if parse_cache is None or source_hash is None:
+        parse_cache = source_hash = None
+
+    if timer.enabled:
+        return _build_page_timed(from_path, outputs, timer, cache, parse_cache, source_hash)
+
+    if parse_cache is not None:
+        cached = parse_cache.get(source_hash)
+        if cached is not None:
+            return _write_outputs(outputs, *cached)
+
+    # The title comes first in the page, so find it with a quick pass that
+    # stops at the first h1 before streaming the body
+    with open(from_path, 'r', encoding='utf-8') as f:
+        title = extract_title_from_lines(f)
 
+    writer = parse_cache.writer(source_hash, title) if parse_cache is not None else None
 
-def markdown_to_html_node(markdown):
     try:
-        from htmlnode import ParentNode, text_node_to_html_node
-    except ImportError:
-        from .htmlnode import ParentNode, text_node_to_html_node
-    
-    blocks = markdown_to_blocks(markdown)
-    block_nodes = []
-    
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        
-        if block_type == BlockType.PARAGRAPH:
-            # Replace newlines with spaces in paragraphs
-            paragraph_text = block.replace('\n', ' ')
-            children = text_to_children(paragraph_text)
-            block_nodes.append(ParentNode("p", children))
-            
-        elif block_type == BlockType.HEADING:
-            # Count the number of # characters
-            level = 0
-            for char in block:
-                if char == '#':
-                    level += 1
-                else:
-                    break
-            
-            # Extract heading text after "# "
-            heading_text = block[level+1:]  # Skip the # characters and space
-            children = text_to_children(heading_text)
-            block_nodes.append(ParentNode(f"h{level}", children))
-            
-        elif block_type == BlockType.CODE:
-            # Extract code content by finding first and last ``` positions
-            first_newline = block.find('\n')
-            last_backticks = block.rfind('```')
-            
-            if first_newline != -1 and last_backticks > first_newline:
-                # Extract everything between the first newline and the last ```
-                code_content = block[first_newline + 1:last_backticks]
+        with open(from_path, 'r', encoding='utf-8') as f:
+            chunks = iter_markdown_html(f, cache, DEFERRED_RESOLVER)
+            if writer is not None:
+                chunks = _tee_chunks(chunks, writer)
+            if len(outputs) == 1:
+                # The markdown is read line by line and each block is
+                # rendered, specialized and written as soon as it ends, so
+                # only one block is in memory at a time. The compiled
+                # template already has its own URLs resolved.
+                (target, dest_path), = outputs
+                values = {'Title': title, 'Content': map(target.resolver.specialize, chunks)}
+                written = (write_page(target.template, values, dest_path),)
             else:
-                code_content = ""
-            
-            # Create text node without inline parsing
-            code_text_node = TextNode(code_content, TextType.TEXT)
-            code_html_node = text_node_to_html_node(code_text_node)
-            
-            # Wrap in pre > code
-            code_parent = ParentNode("code", [code_html_node])
-            block_nodes.append(ParentNode("pre", [code_parent]))
-            
-        elif block_type == BlockType.QUOTE:
-            # Extract quote content (remove ">" from each line)
-            lines = block.split('\n')
-            quote_lines = []
-            for line in lines:
-                if line.startswith('> '):
-                    quote_lines.append(line[2:])  # Remove "> "
-                elif line.startswith('>'):
-                    quote_lines.append(line[1:])  # Remove ">"
-                else:
-                    quote_lines.append(line)  # Keep as is
-            quote_text = '\n'.join(quote_lines)
-            
-            children = text_to_children(quote_text)
-            block_nodes.append(ParentNode("blockquote", children))
-            
-        elif block_type == BlockType.UNORDERED_LIST:
-            # Extract list items (remove "- " from each line)
-            lines = block.split('\n')
-            list_items = []
-            for line in lines:
-                item_text = line[2:]  # Remove "- "
-                item_children = text_to_children(item_text)
-                list_items.append(ParentNode("li", item_children))
-            
-            block_nodes.append(ParentNode("ul", list_items))
-            
-        elif block_type == BlockType.ORDERED_LIST:
-            # Extract list items (remove "1. ", "2. ", etc. from each line)
-            lines = block.split('\n')
-            list_items = []
-            for line in lines:
-                # Find the first space after the number and period
-                dot_index = line.find('. ')
-                item_text = line[dot_index + 2:]  # Remove "1. " etc.
-                item_children = text_to_children(item_text)
-                list_items.append(ParentNode("li", item_children))
-            
-            block_nodes.append(ParentNode("ol", list_items))
+                written = _write_outputs(outputs, title, "".join(chunks))
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    if writer is not None:
+        writer.commit()
+    return written
+
+
+def _write_outputs(outputs, title, body):
+    """Write a rendered page to every output; returns which ones changed."""
+    return tuple(
+        write_page(target.template, {'Title': title, 'Content': target.resolver.specialize(body)}, dest_path)
+        for target, dest_path in outputs
+    )
+
+
+def _tee_chunks(chunks, writer):
+    for chunk in chunks:
+        writer.write(chunk)
+        yield chunk
+
+
+def _build_page_timed(from_path, outputs, timer, cache=None, parse_cache=None, source_hash=None):
+    """_build_page with every stage run to completion, so each can be timed on its own."""
+    title, body = render_source(from_path, cache, parse_cache, source_hash, timer)
+    written = []
+    for target, dest_path in outputs:
+        page = _fill_template(target, title, body, timer)
+        with timer.stage("write"):
+            written.append(_write_whole_page(page, dest_path))
+    return tuple(written)
+
+
+def read_source(from_path, parse_cache=None, source_hash=None, timer=NULL_TIMER):
+    """
+    Read a markdown file to be rendered, unless the parse cache already
+    has the page: looked up by source_hash when the caller knows it (a hit
+    then doesn't read the file at all), by the hash of the bytes read
+    otherwise. The lookup leaves the cache's counters alone, so this can
+    run on I/O threads.
+
+    Returns (markdown or None, cached (title, body) or None, source_hash).
+    """
+    if parse_cache is not None and source_hash is not None:
+        with timer.stage("parse_cache"):
+            cached = parse_cache.lookup(source_hash)
+        if cached is not None:
+            return None, cached, source_hash
+    with timer.stage("read"):
+        with open(from_path, 'rb') as f:
+            data = f.read()
+    if parse_cache is not None and source_hash is None:
+        source_hash = hashlib.sha256(data).hexdigest()
+        with timer.stage("parse_cache"):
+            cached = parse_cache.lookup(source_hash)
+        if cached is not None:
+            return None, cached, source_hash
+    # Decode the way open() in text mode would, newlines included
+    return io.StringIO(data.decode('utf-8'), newline=None).read(), None, source_hash
+
+
+def render_source(from_path, cache=None, parse_cache=None, source_hash=None, timer=NULL_TIMER):
+    """
+    A markdown file's title and basepath-independent body HTML, from the
+    parse cache when it has the page and stored in it otherwise.
+    """
+    markdown, cached, source_hash = read_source(from_path, parse_cache, source_hash, timer)
+    if parse_cache is not None:
+        parse_cache.add_counters((1, 0, 0) if cached is not None else (0, 1, 0))
+    if cached is not None:
+        return cached
+    title, body = _render_body(markdown, cache, timer)
+    if parse_cache is not None:
+        with timer.stage("parse_cache"):
+            if parse_cache.store(source_hash, title, body):
+                parse_cache.add_counters((0, 0, 1))
+    return title, body
+
+
+def _render_body(markdown, cache=None, timer=NULL_TIMER):
+    """Render a page's whole markdown text to its title and basepath-independent body HTML."""
+    if not timer.enabled:
+        lines = markdown.split('\n')
+        return extract_title_from_lines(lines), "".join(iter_markdown_html(lines, cache, DEFERRED_RESOLVER))
+
+    classify_block = timed(timer, "block_type", block_to_block_type)
+    inline_children = timed(timer, "inline", text_to_children)
+    with timer.stage("blocks"):
+        blocks = markdown_to_blocks(markdown)
+    with timer.stage("title"):
+        title = extract_title(markdown)
+    fragments = [
+        render_block(block, classify_block(block), cache, inline_children, timer, DEFERRED_RESOLVER)
+        for block in blocks
+    ]
+    with timer.stage("render"):
+        body = f"<div>{''.join(fragments)}</div>"
+    return title, body
+
+
+def _fill_template(target, title, body, timer=NULL_TIMER):
+    with timer.stage("template"):
+        return target.render(title, body)
+
+
+def _write_whole_page(page, dest_path):
+    output = PageWriter(dest_path)
+    try:
+        output.write(page)
+    except BaseException:
+        output.abort()
+        raise
+    return output.commit()
+
+
+def write_page(template, values, dest_path):
+    """
+    Render the compiled template with the given slot values into dest_path.
+    Returns False when the existing output already had exactly this
+    content, in which case the file isn't touched. Streamed values may
+    still fail part way through; the existing output is then left as it
+    was rather than replaced by a partial page.
+    """
+    output = PageWriter(dest_path)
+    try:
+        template.render_to(output, values)
+    except BaseException:
+        output.abort()
+        raise
+    return output.commit()
+
+
+def markdown_to_html_node(markdown, timer=NULL_TIMER, resolver=None):
+    # With timings off these are the plain functions, so there's no overhead
+    classify_block = timed(timer, "block_type", block_to_block_type)
+    inline_children = timed(timer, "inline", text_to_children)
+
+    with timer.stage("blocks"):
+        blocks = markdown_to_blocks(markdown)
+    block_nodes = [
+        block_to_html_node(block, classify_block(block), inline_children, resolver)
+        for block in blocks
+    ]
     
     # Wrap all block nodes in a div
     return ParentNode("div", block_nodes)
 
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
+def iter_markdown_html(lines, cache=None, resolver=None):
+    """
+    Stream the HTML for markdown read line by line: the same output as
+    markdown_to_html_node(...).to_html(), produced one block at a time.
+    With a BlockCache, blocks rendered before are not parsed again.
+    """
+    yield "<div>"
+    for block, block_type in iter_blocks(lines):
+        yield render_block(block, block_type, cache, resolver=resolver)
+    yield "</div>"
+
+
+def render_block(block, block_type, cache=None, inline=text_to_children, timer=NULL_TIMER, resolver=None):
+    """HTML for one block, taken from the cache when the same block was rendered before."""
+    if URL_MARKER in block:
+        # NUL marks deferred URLs, so it can't pass through from the source;
+        # browsers show it as U+FFFD anyway
+        block = block.replace(URL_MARKER, "\ufffd")
+    if cache is not None:
+        key = block_key(block, block_type, resolver.key if resolver is not None else None)
+        html = cache.get(key)
+        if html is not None:
+            return html
+    node = block_to_html_node(block, block_type, inline, resolver)
+    with timer.stage("render"):
+        html = node.to_html()
+    if cache is not None:
+        cache.put(key, html)
+    return html
+
+
+def block_to_html_node(block, block_type, inline=text_to_children, resolver=None):
+    """
+    Build the HTML node for one block. inline parses the block's inline
+    text, resolving link and image URLs with the resolver.
+    """
+    if block_type == BlockType.PARAGRAPH:
+        # Replace newlines with spaces in paragraphs
+        paragraph_text = block.replace('\n', ' ')
+        children = inline(paragraph_text, resolver)
+        return ParentNode("p", children)
+        
+    elif block_type == BlockType.HEADING:
+        # Count the number of # characters
+        level = 0
+        for char in block:
+            if char == '#':
+                level += 1
+            else:
+                break
+        
+        # Extract heading text after "# "
+        heading_text = block[level+1:]  # Skip the # characters and space
+        children = inline(heading_text, resolver)
+        return ParentNode(f"h{level}", children)
+        
+    elif block_type == BlockType.CODE:
+        # Extract code content by finding first and last ``` positions
+        first_newline = block.find('\n')
+        last_backticks = block.rfind('```')
+        
+        if first_newline != -1 and last_backticks > first_newline:
+            # Extract everything between the first newline and the last ```
+            code_content = block[first_newline + 1:last_backticks]
+        else:
+            code_content = ""
+        
+        # Create text node without inline parsing
+        code_text_node = TextNode(code_content, TextType.TEXT)
+        code_html_node = text_node_to_html_node(code_text_node)
+        
+        # Wrap in pre > code
+        code_parent = ParentNode("code", [code_html_node])
+        return ParentNode("pre", [code_parent])
+        
+    elif block_type == BlockType.QUOTE:
+        # Extract quote content (remove ">" from each line)
+        lines = block.split('\n')
+        quote_lines = []
+        for line in lines:
+            if line.startswith('> '):
+                quote_lines.append(line[2:])  # Remove "> "
+            elif line.startswith('>'):
+                quote_lines.append(line[1:])  # Remove ">"
+            else:
+                quote_lines.append(line)  # Keep as is
+        quote_text = '\n'.join(quote_lines)
+        
+        children = inline(quote_text, resolver)
+        return ParentNode("blockquote", children)
+        
+    elif block_type == BlockType.UNORDERED_LIST:
+        # Extract list items (remove "- " from each line)
+        lines = block.split('\n')
+        list_items = []
+        for line in lines:
+            item_text = line[2:]  # Remove "- "
+            item_children = inline(item_text, resolver)
+            list_items.append(ParentNode("li", item_children))
+        
+        return ParentNode("ul", list_items)
+        
+    elif block_type == BlockType.ORDERED_LIST:
+        # Extract list items (remove "1. ", "2. ", etc. from each line)
+        lines = block.split('\n')
+        list_items = []
+        for line in lines:
+            # Find the first space after the number and period
+            dot_index = line.find('. ')
+            item_text = line[dot_index + 2:]  # Remove "1. " etc.
+            item_children = inline(item_text, resolver)
+            list_items.append(ParentNode("li", item_children))
+        
+        return ParentNode("ol", list_items)
+
+
+# Each worker process keeps its own block cache for the pages it builds
+_worker_cache = None
+
+
+def _init_worker_cache(max_bytes):
+    global _worker_cache
+    _worker_cache = BlockCache(max_bytes) if max_bytes else None
+
+
+def _counter_deltas(after, before):
+    return tuple(a - b for a, b in zip(after, before))
+
+
+def _build_page_job(page, targets, collect_timings=False, cache=None, parse_cache=None):
+    """
+    Process pool entry point: build one page, tagging any failure with its
+    source path. page is (from_path, outputs, source_hash), where outputs
+    are (target index, dest_path) pairs. Without a block cache, the
+    worker's own cache is used.
+
+    Returns (written, timings, block cache counters, parse cache counters):
+    written says per output whether it changed on disk, timings is
+    (stage seconds, total seconds) with collect_timings and None
+    otherwise; the counters are what this page added to each cache's.
+    """
+    from_path, page_outputs, source_hash = page
+    outputs = [(targets[index], dest_path) for index, dest_path in page_outputs]
+    if cache is None:
+        cache = _worker_cache
+    timer = StageTimer() if collect_timings else NULL_TIMER
+    block_before = cache.counters() if cache is not None else (0, 0, 0)
+    parse_before = parse_cache.counters() if parse_cache is not None else (0, 0, 0)
+    start = time.perf_counter()
+    try:
+        written = _build_page(from_path, outputs, timer, cache, parse_cache, source_hash)
+    except Exception as e:
+        raise PageBuildError(from_path, f"{type(e).__name__}: {e}") from None
+    page_timings = (timer.stages, time.perf_counter() - start) if collect_timings else None
+    block_counters = _counter_deltas(cache.counters(), block_before) if cache is not None else None
+    parse_counters = _counter_deltas(parse_cache.counters(), parse_before) if parse_cache is not None else None
+    return written, page_timings, block_counters, parse_counters
+
+
+def _log_page(from_path, page_outputs, template_path):
+    dest_paths = ", ".join(dest_path for _, dest_path in page_outputs)
+    print(f"Generating page from {from_path} to {dest_paths} using {template_path}")
+
+
+def _count_unchanged(unchanged, page_outputs, written):
+    for (index, _), was_written in zip(page_outputs, written):
+        if not was_written:
+            unchanged[index] += 1
+
+
+def _submit_outputs(precompress, page_outputs):
+    for _, dest_path in page_outputs:
+        _submit_output(precompress, dest_path)
+
+
+def _submit_output(precompress, dest_path):
+    if precompress is not None:
+        precompress.submit(dest_path)
+    else:
+        remove_gzip_sibling(dest_path)
+
+
+def _build_pages(pages, targets, template_path, jobs_count, timings=NULL_TIMER, cache=None,
+                 parse_cache=None, io_threads=0, queue_size=DEFAULT_QUEUE_SIZE, precompress=None):
+    """
+    Build the given (from_path, outputs, source_hash) pages for the
+    targets; see _build_page_job.
+
+    With jobs_count > 1 the pages are rendered in a process pool. Results
+    are consumed in submission order, so the log is identical to a serial
+    build no matter which worker finishes first. Workers get block caches
+    of their own, and their cache counters are added to the parent's.
+
+    With a single job and io_threads > 0 the pages go through the
+    read -> render -> write pipeline instead, whose queue statistics are
+    returned.
+
+    Every output is handed to the Precompressor, if any, once it is on
+    disk; without one, its old gzip sibling is removed instead.
+
+    Returns (per target, the number of pages whose output on disk was
+    already identical and so was left untouched; PipelineStats or None).
+    """
+    unchanged = [0] * len(targets)
+    if (jobs_count <= 1 or len(pages) <= 1) and io_threads > 0 and pages:
+        return _build_pages_pipelined(pages, targets, template_path, timings, cache, parse_cache,
+                                      io_threads, queue_size, precompress)
+    if jobs_count <= 1 or len(pages) <= 1:
+        build_page = partial(_build_page_job, targets=targets, collect_timings=timings.enabled,
+                             cache=cache, parse_cache=parse_cache)
+        for page in pages:
+            from_path, page_outputs, _ = page
+            _log_page(from_path, page_outputs, template_path)
+            written, page_timings, _, _ = build_page(page)
+            _count_unchanged(unchanged, page_outputs, written)
+            _submit_outputs(precompress, page_outputs)
+            if page_timings:
+                timings.add_page(from_path, *page_timings)
+        return unchanged, None
+
+    build_page = partial(_build_page_job, targets=targets, collect_timings=timings.enabled,
+                         parse_cache=parse_cache)
+    workers = min(jobs_count, len(pages))
+    chunksize = max(1, len(pages) // (workers * 4))
+    # Forking while the Precompressor's threads run could copy a lock some
+    # thread holds into the workers, so start them from a fork server then
+    mp_context = multiprocessing.get_context("forkserver") if precompress is not None else None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context, initializer=_init_worker_cache,
+                             initargs=(cache.max_bytes if cache is not None else 0,)) as executor:
+        results = executor.map(build_page, pages, chunksize=chunksize)
+        try:
+            for from_path, page_outputs, _ in pages:
+                _log_page(from_path, page_outputs, template_path)
+                written, page_timings, block_counters, parse_counters = next(results)
+                _count_unchanged(unchanged, page_outputs, written)
+                _submit_outputs(precompress, page_outputs)
+                if page_timings:
+                    timings.add_page(from_path, *page_timings)
+                if cache is not None and block_counters:
+                    cache.add_counters(block_counters)
+                if parse_cache is not None:
+                    parse_cache.add_counters(parse_counters)
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+    return unchanged, None
+
+
+def _read_page_source(from_path, parse_cache=None, source_hash=None):
+    """
+    I/O thread half of the read stage: the cached (title, body) when the
+    parse cache has the page, its markdown otherwise. Returns
+    (markdown, cached, stage seconds).
+    """
+    timer = StageTimer()
+    markdown, cached, _ = read_source(from_path, parse_cache, source_hash, timer)
+    return markdown, cached, timer.stages
+
+
+def _write_page_output(page, dest_path, parse_cache=None, source_hash=None, entry=None):
+    """
+    I/O thread half of the write stage: write the page and, for a page that
+    missed the parse cache, its cache entry. Returns
+    (written, stored, stage seconds).
+    """
+    start = time.perf_counter()
+    written = _write_whole_page(page, dest_path)
+    stages = {"write": time.perf_counter() - start}
+    stored = False
+    if entry is not None:
+        start = time.perf_counter()
+        stored = parse_cache.store(source_hash, *entry)
+        stages["parse_cache"] = time.perf_counter() - start
+    return written, stored, stages
+
+
+async def _run_page_pipeline(pages, targets, template_path, timings, cache, parse_cache, io_threads, queue_size,
+                             precompress=None):
+    loop = asyncio.get_running_loop()
+    reads = MeasuredQueue("read", queue_size)
+    writes = MeasuredQueue("write", queue_size)
+    # Per page, whether each output was written and the page's timer,
+    # filled in as its outputs finish
+    written = [None] * len(pages)
+    page_timers = [None] * len(pages)
+
+    async def read_stage(executor):
+        # Reads start as soon as there is room in the queue and are consumed
+        # in page order, so the log matches a serial build
+        for index in range(len(pages)):
+            await reads.put(asyncio.ensure_future(read_page(executor, index)))
+        await reads.put(None)
+
+    async def read_page(executor, index):
+        from_path, _, source_hash = pages[index]
+        try:
+            result = await loop.run_in_executor(executor, _read_page_source, from_path, parse_cache, source_hash)
+        except Exception as e:
+            raise PageBuildError(from_path, f"{type(e).__name__}: {e}") from None
+        return index, result
+
+    async def render_stage():
+        # Rendering is CPU-bound and runs on the event loop thread while
+        # the I/O threads read ahead and write behind it
+        while (item := await reads.get_result()) is not None:
+            index, (markdown, cached, stages) = item
+            from_path, page_outputs, source_hash = pages[index]
+            _log_page(from_path, page_outputs, template_path)
+            timer = StageTimer() if timings.enabled else NULL_TIMER
+            entry = None
+            try:
+                if cached is not None:
+                    title, body = cached
+                else:
+                    title, body = _render_body(markdown, cache, timer)
+                    if parse_cache is not None:
+                        entry = (title, body)
+                rendered = [_fill_template(targets[target], title, body, timer) for target, _ in page_outputs]
+            except Exception as e:
+                raise PageBuildError(from_path, f"{type(e).__name__}: {e}") from None
+            if parse_cache is not None:
+                parse_cache.add_counters((1, 0, 0) if cached is not None else (0, 1, 0))
+            if timings.enabled:
+                for name, seconds in stages.items():
+                    timer.add(name, seconds)
+            written[index] = [None] * len(page_outputs)
+            page_timers[index] = timer
+            # The parse cache entry goes with the first output
+            for position, page in enumerate(rendered):
+                await writes.put((index, position, page, entry if position == 0 else None))
+            # Let the other stages hand finished I/O to the threads and
+            # start more before rendering the next page
+            await asyncio.sleep(0)
+        for _ in range(io_threads):
+            await writes.put(None)
+
+    async def write_stage(executor):
+        while (item := await writes.get()) is not None:
+            index, position, page, entry = item
+            from_path, page_outputs, source_hash = pages[index]
+            dest_path = page_outputs[position][1]
+            try:
+                page_written, stored, stages = await loop.run_in_executor(
+                    executor, _write_page_output, page, dest_path, parse_cache, source_hash, entry)
+            except Exception as e:
+                raise PageBuildError(from_path, f"{type(e).__name__}: {e}") from None
+            if stored:
+                parse_cache.add_counters((0, 0, 1))
+            _submit_output(precompress, dest_path)
+            if timings.enabled:
+                for name, seconds in stages.items():
+                    page_timers[index].add(name, seconds)
+            written[index][position] = page_written
+
+    with ThreadPoolExecutor(max_workers=io_threads) as executor:
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(read_stage(executor))
+                group.create_task(render_stage())
+                for _ in range(io_threads):
+                    group.create_task(write_stage(executor))
+        except* Exception as errors:
+            # One failing page stops the pipeline; report it like a serial build would
+            raise errors.exceptions[0] from None
+
+    if timings.enabled:
+        for (from_path, _, _), timer in zip(pages, page_timers):
+            timings.add_page(from_path, timer.stages, sum(timer.stages.values()))
+    unchanged = [0] * len(targets)
+    for (_, page_outputs, _), page_written in zip(pages, written):
+        _count_unchanged(unchanged, page_outputs, page_written)
+    return unchanged, PipelineStats((reads, writes), io_threads)
+
+
+def _build_pages_pipelined(pages, targets, template_path, timings=NULL_TIMER, cache=None,
+                           parse_cache=None, io_threads=1, queue_size=DEFAULT_QUEUE_SIZE, precompress=None):
+    """
+    Build the given (from_path, outputs, source_hash) pages in one
+    process as a read -> render -> write pipeline.
+
+    Sources are read and pages written by io_threads threads, so slow or
+    network disks overlap with rendering instead of adding to it. The
+    stages are joined by queues of at most queue_size items, which caps
+    how many rendered pages are held in memory at once. Each output of a
+    page is a separate item in the write queue.
+
+    Returns (pages left unchanged on disk per target, PipelineStats).
     """
-    Recursively crawl the content directory and generate HTML pages for all markdown files.
+    return asyncio.run(_run_page_pipeline(pages, targets, template_path, timings, cache, parse_cache,
+                                          io_threads, queue_size, precompress))
+
+
+def generate_pages_for_targets(dir_path_content, template_path, targets, force=False, jobs=1,
+                               timings=NULL_TIMER, block_cache=None, parse_cache=None, io_threads=0,
+                               queue_size=DEFAULT_QUEUE_SIZE, precompress=None, assets=None, shard=None):
+    """
+    Recursively crawl the content directory and generate HTML pages for all
+    markdown files, once for every (dest_dir, basepath) target.
+
+    Each page is parsed and rendered once, with its root-relative URLs left
+    marked, and then specialized for the basepath of every target it is
+    out of date in. Building for "/" and "/boottracker/" together costs one
+    render per page rather than two.
+
+    Pages are built incrementally: a manifest in each destination directory
+    records the hash of every source file along with the template hash,
+    basepath and generator version. Pages whose inputs are unchanged are
+    skipped, and outputs whose source file was deleted are removed.
     
     Args:
         dir_path_content: Path to the content directory
         template_path: Path to the HTML template file
-        dest_dir_path: Path to the destination directory for generated HTML files
-        basepath: Base path for the site (defaults to "/")
+        targets: (dest_dir, basepath) pairs: where to write the generated
+            HTML files, and the base path that copy of the site is served from
+        force: Rebuild every page even if the manifest says it is current
+        jobs: Number of worker processes used to render pages (1 renders serially)
+        timings: BuildTimings that collects per-stage and per-page durations
+        block_cache: BlockCache of rendered blocks, kept across builds by
+            long-running callers; every block is rendered when omitted
+        parse_cache: ParseCache of rendered page bodies on disk, reused for
+            pages that need regenerating even though their markdown didn't
+            change; pruned to its size cap after the build
+        io_threads: With one job, read sources and write pages in this many
+            threads, pipelined with rendering (0 streams each page straight
+            to disk instead)
+        queue_size: Most pages buffered between two pipeline stages
+        precompress: Precompressor that writes a gzip sibling for every
+            page, while the build goes on; skipped pages included, so a
+            missing sibling is filled in
+        assets: AssetMap of fingerprinted static files that link, image
+            and template URLs resolve through; a changed map rebuilds
+            every page
+        shard: Shard to build only one slice of the tree; the manifest
+            then lists just its pages, and records the shard for merge
+
+    Returns:
+        A BuildStats per target with the number of pages rebuilt, skipped
+        and removed
+
+    Raises:
+        PageBuildError: if any page fails to generate
     """
-    print(f"Generating pages recursively from {dir_path_content} to {dest_dir_path}")
-    
-    # Create destination directory if it doesn't exist
-    if not os.path.exists(dest_dir_path):
-        os.makedirs(dest_dir_path)
+    try:
+        from manifest import BuildManifest, BuildStats, MANIFEST_FILENAME, hash_file, remove_stale_output
+        from sharding import iter_source_keys
+    except ImportError:
+        from .manifest import BuildManifest, BuildStats, MANIFEST_FILENAME, hash_file, remove_stale_output
+        from .sharding import iter_source_keys
+
+    dest_dirs = [dest_dir for dest_dir, _ in targets]
+    print(f"Generating pages recursively from {dir_path_content} to {', '.join(dest_dirs)}")
+
+    template_hash = hash_file(template_path)
+    with open(template_path, 'r', encoding='utf-8') as f:
+        template_text = f.read()
+    build_targets = []
+    manifests = []
+    forced = []
+    for dest_dir, basepath in targets:
+        # Create destination directory if it doesn't exist
+        if not os.path.exists(dest_dir):
+            os.makedirs(dest_dir)
+        manifest = BuildManifest.load(os.path.join(dest_dir, MANIFEST_FILENAME))
+        settings = {
+            "generator_version": GENERATOR_VERSION,
+            "template_hash": template_hash,
+            "basepath": basepath,
+        }
+        if assets:
+            settings["assets"] = assets.digest
+        # Anything that affects every page invalidates every page
+        forced.append(force or manifest.settings != settings)
+        manifest.settings = settings
+        manifests.append(manifest)
+        # Compile the template once per target for the whole build
+        build_targets.append(BuildTarget(dest_dir, basepath, template_text, assets))
+    shard_record = None
+    if shard is not None:
+        source_keys = sorted(iter_source_keys(dir_path_content))
+        shard_record = shard.plan(source_keys)
+        owned = sum(1 for source_key in source_keys if shard.owns(source_key))
+        print(f"Shard {shard}: building {owned} of {len(source_keys)} pages")
+    for manifest in manifests:
+        manifest.shard = shard_record
+    current_pages = {}
+    pending = []
+    all_stats = [BuildStats() for _ in targets]
+    scan_start = time.perf_counter()
     
-    # Walk through the content directory
+    # Walk through the content directory in a stable order
     for root, dirs, files in os.walk(dir_path_content):
+        dirs.sort()
+
         # Calculate the relative path from content directory
         rel_path = os.path.relpath(root, dir_path_content)
         
-        # Create corresponding directory in destination
-        dest_subdir = os.path.join(dest_dir_path, rel_path)
-        if rel_path != '.' and not os.path.exists(dest_subdir):
-            os.makedirs(dest_subdir)
+        # Create corresponding directories in the destinations; a shard
+        # leaves them to its pages, so merged trees have no empty ones
+        if rel_path != '.' and shard is None:
+            for dest_dir in dest_dirs:
+                dest_subdir = os.path.join(dest_dir, rel_path)
+                if not os.path.exists(dest_subdir):
+                    os.makedirs(dest_subdir)
         
         # Process each file in the current directory
-        for file in files:
+        for file in sorted(files):
             if file.endswith('.md'):
                 # Source markdown file path
                 source_path = os.path.join(root, file)
                 
-                # Destination HTML file path (replace .md with .html)
+                # Output path relative to each destination (replace .md with .html)
                 html_filename = file.replace('.md', '.html')
-                dest_path = os.path.join(dest_subdir, html_filename)
-                
-                # Generate the HTML page
-                generate_page(source_path, template_path, dest_path, basepath)
\ No newline at end of file
+                output_key = os.path.normpath(os.path.join(rel_path, html_filename)).replace(os.sep, '/')
+                source_key = os.path.relpath(source_path, dir_path_content).replace(os.sep, '/')
+                if shard is not None and not shard.owns(source_key):
+                    continue
+                source_hash = hash_file(source_path)
+
+                page_outputs = []
+                for index, dest_dir in enumerate(dest_dirs):
+                    dest_path = os.path.join(dest_dir, output_key)
+                    if not forced[index] and manifests[index].is_page_current(source_key, source_hash, dest_path):
+                        all_stats[index].skipped += 1
+                        if precompress is not None:
+                            precompress.submit(dest_path)
+                    else:
+                        page_outputs.append((index, dest_path))
+                        all_stats[index].rebuilt += 1
+                if page_outputs:
+                    pending.append((source_path, tuple(page_outputs), source_hash))
+                current_pages[source_key] = {"source_hash": source_hash, "output": output_key}
+
+    timings.add("scan", time.perf_counter() - scan_start)
+
+    # Generate the HTML pages that are out of date, each rendered once
+    with timings.stage("pages"):
+        unchanged, pipeline = _build_pages(pending, build_targets, template_path, jobs, timings, block_cache,
+                                           parse_cache, io_threads, queue_size, precompress)
+
+    for dest_dir, manifest, stats, target_unchanged in zip(dest_dirs, manifests, all_stats, unchanged):
+        stats.unchanged = target_unchanged
+        stats.pipeline = pipeline
+        if block_cache is not None:
+            stats.block_hits = block_cache.hits
+            stats.block_misses = block_cache.misses
+
+        # Remove pages whose source markdown no longer exists
+        for source_key, entry in sorted(manifest.pages.items()):
+            if source_key not in current_pages and entry.get("output"):
+                print(f"Removing stale page {entry['output']} (source {source_key} was deleted)")
+                remove_stale_output(dest_dir, entry["output"])
+                stats.removed += 1
+
+        manifest.pages = current_pages
+        manifest.save()
+        if len(dest_dirs) > 1:
+            print(f"{dest_dir}: {stats.summary()}")
+        else:
+            print(stats.summary())
+    if pending:
+        if block_cache is not None:
+            print(block_cache.summary())
+        if pipeline is not None:
+            print(pipeline.summary())
+            if timings.enabled:
+                timings.pipeline = pipeline.report()
+        if parse_cache is not None:
+            print(parse_cache.summary())
+            if parse_cache.writes:
+                parse_cache.prune()
+    return all_stats
+
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/", force=False, jobs=1,
+                             timings=NULL_TIMER, block_cache=None, parse_cache=None, io_threads=0,
+                             queue_size=DEFAULT_QUEUE_SIZE, precompress=None, assets=None, shard=None):
+    """
+    generate_pages_for_targets with a single destination directory and
+    basepath. Returns its BuildStats.
+    """
+    return generate_pages_for_targets(dir_path_content, template_path, [(dest_dir_path, basepath)], force, jobs,
+                                      timings, block_cache, parse_cache, io_threads, queue_size, precompress,
+                                      assets, shard)[0]
+
+
+# htmlnode imports TextType from this module, so it is imported last, once
+# everything it needs from here exists
+try:
+    from htmlnode import ParentNode, text_node_to_html_node
+except ImportError:
+    from .htmlnode import ParentNode, text_node_to_html_node
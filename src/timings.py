@@ -0,0 +1,148 @@
+import json
+import math
+import time
+
+
+REPORT_FORMAT = 1
+PERCENTILES = (50, 90, 99)
+
+
+class _TimedStage:
+    __slots__ = ("stages", "name", "start")
+
+    def __init__(self, stages, name):
+        self.stages = stages
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        self.stages[self.name] = self.stages.get(self.name, 0.0) + elapsed
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class StageTimer:
+    """
+    Accumulates wall-clock seconds per named stage. A stage entered more
+    than once (inline parsing runs once per block) adds up.
+    """
+
+    __slots__ = ("stages",)
+    enabled = True
+
+    def __init__(self):
+        self.stages = {}
+
+    def stage(self, name):
+        return _TimedStage(self.stages, name)
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+
+class _NullTimer:
+    """Stand-in used when timings are off, so instrumented code needs no branches."""
+
+    __slots__ = ()
+    enabled = False
+
+    def stage(self, name):
+        return _NULL_STAGE
+
+    def add(self, name, seconds):
+        pass
+
+    def add_page(self, source, stages, total):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+def timed(timer, name, func):
+    """Wrap func so each call counts toward the named stage; a no-op when timings are off."""
+    if not timer.enabled:
+        return func
+
+    def wrapper(*args):
+        with timer.stage(name):
+            return func(*args)
+    return wrapper
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(values):
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+    summary = {
+        "count": len(values),
+        "total": sum(values),
+        "mean": sum(values) / len(values),
+        "max": values[-1],
+    }
+    for percent in PERCENTILES:
+        summary[f"p{percent}"] = percentile(values, percent)
+    return summary
+
+
+class BuildTimings(StageTimer):
+    """
+    Build-wide stage timings plus the per-page stage breakdowns, which
+    report() turns into aggregates, percentiles and a slowest-pages list.
+    """
+
+    __slots__ = ("pages", "pipeline")
+
+    def __init__(self):
+        super().__init__()
+        self.pages = []
+        # Queue statistics of a pipelined build, reported as-is
+        self.pipeline = None
+
+    def add_page(self, source, stages, total):
+        self.pages.append({"source": source, "total": total, "stages": stages})
+
+    def report(self, slowest=10):
+        page_stages = {}
+        for page in self.pages:
+            for name, seconds in page["stages"].items():
+                page_stages.setdefault(name, []).append(seconds)
+        report = {
+            "format": REPORT_FORMAT,
+            "build": dict(self.stages),
+            "page_count": len(self.pages),
+            "page_total": summarize(page["total"] for page in self.pages),
+            "page_stages": {name: summarize(values) for name, values in sorted(page_stages.items())},
+            "slowest": sorted(self.pages, key=lambda page: page["total"], reverse=True)[:slowest],
+            "pages": self.pages,
+        }
+        if self.pipeline is not None:
+            report["pipeline"] = self.pipeline
+        return report
+
+    def write(self, path, slowest=10):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(slowest), f, indent=2)
+            f.write("\n")
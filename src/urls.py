@@ -0,0 +1,92 @@
+# Wraps each root-relative URL in basepath-independent HTML. NUL can't
+# appear in rendered HTML: render_block replaces it in the markdown.
+URL_MARKER = "\x00"
+
+
+def is_root_relative(url):
+    return url.startswith("/") and not url.startswith("//")
+
+
+class UrlResolver:
+    """
+    Resolves link and image URLs while pages are rendered, so no pass over
+    the finished HTML is needed.
+
+    Root-relative URLs ("/blog/") are pointed at the basepath the site is
+    served from; absolute, protocol-relative ("//host/") and relative URLs
+    are left alone. With an AssetMap, root-relative URLs of fingerprinted
+    static files are pointed at their fingerprinted names first. One
+    resolver lives for one build and remembers every URL it has resolved.
+    """
+
+    __slots__ = ("basepath", "assets", "resolved")
+
+    def __init__(self, basepath="/", assets=None):
+        self.basepath = basepath
+        self.assets = assets if assets else None
+        self.resolved = {}
+
+    @property
+    def key(self):
+        """What resolved URLs depend on, for caches of rendered HTML."""
+        if self.assets is None:
+            return self.basepath
+        return f"{self.basepath}\0{self.assets.digest}"
+
+    def resolve(self, url):
+        resolved = self.resolved.get(url)
+        if resolved is None:
+            resolved = url
+            if is_root_relative(url):
+                if self.assets is not None:
+                    resolved = self._fingerprint(url)
+                if self.basepath != "/":
+                    resolved = self.basepath + resolved[1:]
+            self.resolved[url] = resolved
+        return resolved
+
+    def _fingerprint(self, url):
+        # The query string or fragment, if any, stays on the fingerprinted path
+        end = len(url)
+        for separator in "?#":
+            position = url.find(separator)
+            if position != -1 and position < end:
+                end = position
+        fingerprinted = self.assets.get(url[:end])
+        return url if fingerprinted is None else fingerprinted + url[end:]
+
+    def specialize(self, html):
+        """Resolve the marked URLs of HTML rendered with a DeferredResolver."""
+        if URL_MARKER not in html:
+            return html
+        parts = html.split(URL_MARKER)
+        # Marked URLs are every other part, starting with the second
+        parts[1::2] = [self.resolve(url) for url in parts[1::2]]
+        return "".join(parts)
+
+    def __repr__(self):
+        return f"UrlResolver(basepath={self.basepath!r}, resolved={len(self.resolved)})"
+
+
+class DeferredResolver:
+    """
+    Resolver for HTML that doesn't depend on the basepath: root-relative
+    URLs are left marked, and each UrlResolver then specializes the HTML
+    for its own basepath with a single split and join. A page is rendered
+    (and cached) once in this form, however many basepaths it's built for.
+    """
+
+    __slots__ = ()
+    # Rendered HTML is the same for every basepath
+    key = None
+
+    def resolve(self, url):
+        if is_root_relative(url):
+            return f"{URL_MARKER}{url}{URL_MARKER}"
+        return url
+
+    def __repr__(self):
+        return "DeferredResolver()"
+
+
+DEFERRED_RESOLVER = DeferredResolver()